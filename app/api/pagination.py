@@ -0,0 +1,191 @@
+"""
+Keyset-пагинация: курсор - непрозрачный токен со значениями ключей
+сортировки последней строки страницы.
+
+В отличие от OFFSET, следующая страница начинается строго после курсора:
+глубокие страницы не медленнее первых, а новые вакансии, которые пишет
+опрос, не сдвигают выдачу (нет пропусков и повторов).
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import and_, false, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
+from starlette.datastructures import URL
+
+from app.api.links import build_link, build_url, resource_links
+from app.models.saved_search import SavedSearchMatch
+from app.models.vacancy import Vacancy
+
+CURSOR_HEADER = "X-Next-Cursor"
+
+
+class SortKey(NamedTuple):
+    name: str
+    expr: ColumnElement
+    descending: bool = True
+    nullable: bool = False
+
+
+class Keyset:
+    """
+    Порядок выдачи для keyset-пагинации. Последний ключ должен быть
+    уникальным (обычно первичный ключ), иначе порядок неоднозначен.
+
+    NULL-значения идут там, где их держит обычный B-tree индекс в данной
+    СУБД (SQLite - в конце при DESC, PostgreSQL - в начале), чтобы
+    сортировку обслуживал индекс.
+    """
+
+    def __init__(self, name: str, keys: Sequence[SortKey]):
+        self.name = name
+        self.keys = list(keys)
+
+    @staticmethod
+    def _nulls_first(key: SortKey, dialect: str) -> bool:
+        # SQLite считает NULL меньше любого значения, PostgreSQL - больше
+        return key.descending == (dialect == "postgresql")
+
+    def columns(self) -> List[ColumnElement]:
+        return [key.expr.label(f"_cursor_{key.name}") for key in self.keys]
+
+    def order_by(self, dialect: str) -> List[ColumnElement]:
+        clauses = []
+        for key in self.keys:
+            clause = key.expr.desc() if key.descending else key.expr.asc()
+            if key.nullable:
+                clause = clause.nulls_first() if self._nulls_first(key, dialect) else clause.nulls_last()
+            clauses.append(clause)
+        return clauses
+
+    def _beyond(self, key: SortKey, value: Any, dialect: str) -> ColumnElement:
+        """Строго после значения value по ключу key"""
+        if value is None:
+            # После NULL идут значения, только если NULL стоят в начале
+            if key.nullable and self._nulls_first(key, dialect):
+                return key.expr.is_not(None)
+            return false()
+        beyond = key.expr < value if key.descending else key.expr > value
+        if key.nullable and not self._nulls_first(key, dialect):
+            return or_(beyond, key.expr.is_(None))
+        return beyond
+
+    @staticmethod
+    def _equal(key: SortKey, value: Any) -> ColumnElement:
+        return key.expr.is_(None) if value is None else key.expr == value
+
+    def after(self, values: Sequence[Any], dialect: str) -> ColumnElement:
+        # (k1, k2, k3) > (v1, v2, v3) раскрывается справа налево:
+        # k1 > v1 OR (k1 = v1 AND (k2 > v2 OR (k2 = v2 AND k3 > v3)))
+        pairs = list(zip(self.keys, values))
+        last_key, last_value = pairs[-1]
+        condition = self._beyond(last_key, last_value, dialect)
+        for key, value in reversed(pairs[:-1]):
+            condition = or_(
+                self._beyond(key, value, dialect),
+                and_(self._equal(key, value), condition),
+            )
+        return condition
+
+    def encode(self, values: Sequence[Any]) -> str:
+        payload = {
+            "o": self.name,
+            "k": [
+                {"dt": value.isoformat()} if isinstance(value, datetime) else value
+                for value in values
+            ],
+        }
+        raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode(self, token: str) -> List[Any]:
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            payload = json.loads(raw)
+            if payload["o"] != self.name or len(payload["k"]) != len(self.keys):
+                raise ValueError("cursor belongs to another ordering")
+            return [
+                datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+                for value in payload["k"]
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+# Новые вакансии первыми; индексы ix_vacancies_*_published
+LATEST_VACANCIES = Keyset(
+    "latest",
+    [
+        SortKey("published", Vacancy.published_date, nullable=True),
+        SortKey("id", Vacancy.vacancy_id),
+    ],
+)
+
+# Входящие сохранённого поиска: новые совпадения первыми
+SAVED_SEARCH_INBOX = Keyset(
+    "inbox",
+    [
+        SortKey("seq", SavedSearchMatch.change_seq),
+        SortKey("id", SavedSearchMatch.vacancy_id),
+    ],
+)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    keyset: Keyset,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Страница результатов и курсор следующей (None - страница последняя).
+    Без курсора работает старый OFFSET - для обратной совместимости.
+
+    Для запроса одной сущности возвращаются объекты, для запроса колонок -
+    строки целиком (с лишними колонками _cursor_*).
+    """
+    dialect = db.bind.dialect.name
+    width = len(query.column_descriptions)
+    if cursor:
+        query = query.where(keyset.after(keyset.decode(cursor), dialect))
+    elif offset:
+        query = query.offset(offset)
+    query = (
+        query.add_columns(*keyset.columns())
+        .order_by(*keyset.order_by(dialect))
+        .limit(limit + 1)
+    )
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = keyset.encode(tuple(rows[-1])[width:])
+    if width > 1:
+        return rows, next_cursor
+    return [row[0] for row in rows], next_cursor
+
+
+def _path_with_query(url: URL) -> str:
+    return f"{url.path}?{url.query}" if url.query else url.path
+
+
+def set_page_links(response: Response, request: Optional[Request], next_cursor: Optional[str]) -> None:
+    """Ссылки self / next страницы в заголовке Link (RFC 8288)"""
+    if next_cursor:
+        response.headers[CURSOR_HEADER] = next_cursor
+    if request is None:
+        return
+    extra = []
+    if next_cursor:
+        next_url = request.url.remove_query_params(["cursor", "offset", "skip"])
+        next_url = next_url.include_query_params(cursor=next_cursor)
+        extra.append(build_link("next", build_url(request, _path_with_query(next_url))))
+    links = resource_links(request, _path_with_query(request.url), extra=extra)
+    response.headers["Link"] = ", ".join(f'<{link.href}>; rel="{link.rel}"' for link in links)
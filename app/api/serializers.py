@@ -0,0 +1,111 @@
+"""
+Быстрая сериализация списков вакансий.
+
+Строки запроса (vacancy_crud.list_rows_query) превращаются в JSON-байты
+напрямую, минуя model_validate / model_dump и повторную проверку через
+response_model. Ссылки собираются из префиксов, посчитанных один раз на
+запрос. Форма ответа та же, что у схемы VacancyWithCompany: она остаётся
+в response_model эндпоинтов для документации.
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Container, Dict, Iterable, List, Optional
+
+from fastapi import Request, Response
+
+from app.api.links import build_url
+from app.core.config import settings
+from app.schemas.vacancy import colliding_titles, display_title
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # Как pydantic: UTC записывается с суффиксом Z
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def _float(value: Optional[Decimal]) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+class VacancyListSerializer:
+    """Строки списка вакансий -> JSON; префиксы ссылок считаются один раз"""
+
+    def __init__(self, request: Optional[Request]):
+        collection_path = f"{settings.API_V1_PREFIX}/vacancies"
+        self.item_prefix = build_url(request, collection_path) + "/"
+        self.collection_link = {
+            "rel": "collection",
+            "href": build_url(request, collection_path),
+            "method": "GET",
+        }
+
+    def item(self, row, colliding: Container[str] = ()) -> Dict[str, Any]:
+        vacancy_id = row.vacancy_id
+        company_name = row.company_name
+        return {
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "title": row.title,
+            "description": row.description,
+            "salary_from": _float(row.salary_from),
+            "salary_to": _float(row.salary_to),
+            "currency": row.currency,
+            "location": row.location,
+            "raw_address": row.raw_address,
+            "parsed_address": row.parsed_address,
+            "source_url": row.source_url,
+            "published_date": row.published_date,
+            "is_active": row.is_active,
+            "vacancy_id": vacancy_id,
+            "company_id": row.company_id,
+            "experience_id": row.experience_id,
+            "work_format_id": row.work_format_id,
+            "work_schedule_id": row.work_schedule_id,
+            "company": (
+                {"company_id": row.company_id, "name": company_name}
+                if company_name is not None else None
+            ),
+            "experience": (
+                {"experience_id": row.experience_id, "name": row.experience_name}
+                if row.experience_name is not None else None
+            ),
+            "links": [
+                {"rel": "self", "href": f"{self.item_prefix}{vacancy_id}", "method": "GET"},
+                self.collection_link,
+            ],
+            "display_title": display_title(row.title, company_name, row.title in colliding),
+        }
+
+    def render(self, rows: Iterable[Any]) -> bytes:
+        rows = list(rows)
+        colliding = colliding_titles(row.title for row in rows)
+        return dumps([self.item(row, colliding) for row in rows])
+
+
+def vacancy_list_response(rows: List[Any], request: Optional[Request]) -> Response:
+    """Готовый ответ со списком вакансий; заголовки пагинации ставит вызывающий"""
+    return Response(
+        content=VacancyListSerializer(request).render(rows),
+        media_type=JSON_MEDIA_TYPE,
+    )
@@ -8,6 +8,7 @@ from app.api.v1.endpoints import (
     work_formats,
     work_schedules,
     skills,
+    saved_searches,
 )
 
 api_router = APIRouter()
@@ -18,5 +19,6 @@ api_router.include_router(experiences.router, prefix="/experiences", tags=["expe
 api_router.include_router(work_formats.router, prefix="/work-formats", tags=["work-formats"])
 api_router.include_router(work_schedules.router, prefix="/work-schedules", tags=["work-schedules"])
 api_router.include_router(skills.router, prefix="/skills", tags=["skills"])
+api_router.include_router(saved_searches.router, prefix="/saved-searches", tags=["saved-searches"])
 api_router.include_router(search.router, prefix="/search", tags=["search"])
 api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
\ No newline at end of file
@@ -7,6 +7,7 @@ from app.crud.company import company_crud
 from app.core.database import get_db
 from app.core.config import settings
 from app.api.links import resource_links
+from app.services.reference_cache import reference_cache
 
 router = APIRouter()
 
@@ -22,6 +23,7 @@ async def create_company(
     if existing:
         raise HTTPException(status_code=409, detail="Company already exists")
     company = await company_crud.create(db, obj_in=company_in)
+    reference_cache.invalidate("companies", company.name)
     payload = Company.model_validate(company).model_dump()
     payload["links"] = resource_links(
         request,
@@ -8,6 +8,7 @@ from app.models.experience import Experience as ExperienceModel
 from app.schemas.experience import Experience, ExperienceCreate
 from app.core.config import settings
 from app.api.links import resource_links
+from app.services.reference_cache import reference_cache
 
 router = APIRouter()
 
@@ -29,6 +30,7 @@ async def create_experience(
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    reference_cache.invalidate("experiences", db_obj.name)
     payload = Experience.model_validate(db_obj).model_dump()
     payload["links"] = resource_links(
         request,
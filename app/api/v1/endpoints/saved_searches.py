@@ -0,0 +1,182 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+
+from app.api.deps import get_current_user
+from app.api.links import resource_links, build_link, build_url
+from app.api.pagination import SAVED_SEARCH_INBOX, paginate, set_page_links
+from app.core.config import settings
+from app.core.database import get_db
+from app.crud.saved_search import saved_search_crud
+from app.models.saved_search import SavedSearchMatch
+from app.models.user import User
+from app.schemas.saved_search import (
+    SavedSearch, SavedSearchCreate, SavedSearchUpdate, SavedSearchHit,
+)
+from app.services.webhook_dispatcher import webhook_secret, webhook_target_error
+
+router = APIRouter()
+
+
+def _search_payload(search, unread: int, request: Optional[Request]) -> Dict[str, Any]:
+    payload = SavedSearch.model_validate(search).model_dump()
+    payload["unread"] = unread
+    if search.webhook_url:
+        payload["webhook_secret"] = webhook_secret(search.saved_search_id)
+    self_path = f"{settings.API_V1_PREFIX}/saved-searches/{search.saved_search_id}"
+    payload["links"] = resource_links(
+        request,
+        self_path,
+        f"{settings.API_V1_PREFIX}/saved-searches",
+        extra=[build_link("matches", build_url(request, f"{self_path}/matches"))],
+    )
+    return payload
+
+
+def _hit(match: SavedSearchMatch) -> SavedSearchHit:
+    vacancy = match.vacancy
+    return SavedSearchHit(
+        vacancy_id=match.vacancy_id,
+        seq=match.change_seq,
+        is_read=match.is_read,
+        matched_at=match.matched_at,
+        title=vacancy.title,
+        company=vacancy.company.name if vacancy.company else None,
+        salary_from=vacancy.salary_from,
+        salary_to=vacancy.salary_to,
+        currency=vacancy.currency,
+        location=vacancy.location,
+        published_date=vacancy.published_date,
+        url=vacancy.source_url,
+    )
+
+
+def _check_webhook(search_in) -> None:
+    if search_in.webhook_url is None:
+        return
+    error = webhook_target_error(str(search_in.webhook_url))
+    if error:
+        raise HTTPException(status_code=422, detail=error)
+
+
+async def _get_own(db: AsyncSession, user: User, saved_search_id: int):
+    search = await saved_search_crud.get(db, user_id=user.user_id, saved_search_id=saved_search_id)
+    if not search:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return search
+
+
+@router.post("/", response_model=SavedSearch, status_code=201)
+async def create_saved_search(
+    search_in: SavedSearchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+):
+    """
+    Сохранить поиск. Новые вакансии, подходящие под него, попадают во
+    входящие поиска (и на webhook_url, если он задан) при загрузке.
+    Доставки подписываются: X-Webhook-Signature = "sha256=" + HMAC-SHA256
+    ключом webhook_secret от "<X-Webhook-Timestamp>.<тело>".
+    """
+    _check_webhook(search_in)
+    if await saved_search_crud.count_for_user(db, current_user.user_id) >= settings.SAVED_SEARCH_MAX_PER_USER:
+        raise HTTPException(status_code=409, detail="Too many saved searches")
+    search = await saved_search_crud.create(db, user_id=current_user.user_id, obj_in=search_in)
+    return _search_payload(search, 0, request)
+
+
+@router.get("/", response_model=List[SavedSearch])
+async def read_saved_searches(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+):
+    """Сохранённые поиски текущего пользователя с числом непрочитанных"""
+    searches = await saved_search_crud.get_multi(db, user_id=current_user.user_id)
+    unread = await saved_search_crud.unread_counts(db, [search.saved_search_id for search in searches])
+    return [
+        _search_payload(search, unread.get(search.saved_search_id, 0), request)
+        for search in searches
+    ]
+
+
+@router.get("/{saved_search_id}", response_model=SavedSearch)
+async def read_saved_search(
+    saved_search_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+):
+    """Получить сохранённый поиск по ID"""
+    search = await _get_own(db, current_user, saved_search_id)
+    unread = await saved_search_crud.unread_counts(db, [saved_search_id])
+    return _search_payload(search, unread.get(saved_search_id, 0), request)
+
+
+@router.patch("/{saved_search_id}", response_model=SavedSearch)
+async def update_saved_search(
+    saved_search_id: int,
+    search_in: SavedSearchUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+):
+    """Изменить условия поиска; уже найденные вакансии остаются во входящих"""
+    _check_webhook(search_in)
+    search = await _get_own(db, current_user, saved_search_id)
+    search = await saved_search_crud.update(db, db_obj=search, obj_in=search_in)
+    unread = await saved_search_crud.unread_counts(db, [saved_search_id])
+    return _search_payload(search, unread.get(saved_search_id, 0), request)
+
+
+@router.delete("/{saved_search_id}", status_code=204)
+async def delete_saved_search(
+    saved_search_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Удалить сохранённый поиск вместе с входящими"""
+    search = await _get_own(db, current_user, saved_search_id)
+    await saved_search_crud.remove(db, db_obj=search)
+    return Response(status_code=204)
+
+
+@router.get("/{saved_search_id}/matches", response_model=List[SavedSearchHit])
+async def read_saved_search_matches(
+    saved_search_id: int,
+    unread_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+    http_response: Response = None,
+):
+    """
+    Входящие поиска: вакансии, подошедшие при загрузке, новые первыми.
+    Следующая страница - по курсору из заголовка X-Next-Cursor.
+    """
+    await _get_own(db, current_user, saved_search_id)
+    matches, next_cursor = await paginate(
+        db,
+        saved_search_crud.inbox_query(saved_search_id, unread_only=unread_only),
+        SAVED_SEARCH_INBOX,
+        limit,
+        cursor,
+    )
+    set_page_links(http_response, request, next_cursor)
+    return [_hit(match) for match in matches]
+
+
+@router.post("/{saved_search_id}/matches/read")
+async def mark_saved_search_matches_read(
+    saved_search_id: int,
+    up_to_seq: Optional[int] = Query(None, description="Отметить совпадения до этого номера включительно"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Отметить входящие прочитанными"""
+    await _get_own(db, current_user, saved_search_id)
+    updated = await saved_search_crud.mark_read(db, saved_search_id, up_to_seq=up_to_seq)
+    return {"updated": updated}
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, Literal, Optional
 from app.api.deps import get_db
 from app.crud.vacancy import vacancy_crud
 from app.schemas.vacancy import VacancyWithCompany
-from app.core.config import settings
-from app.api.links import resource_links
+from app.api.pagination import LATEST_VACANCIES, Keyset, SortKey, paginate, set_page_links
+from app.api.serializers import vacancy_list_response
+from app.core import fulltext
+from app.services.skill_index import skill_index
 
 router = APIRouter()
 
@@ -18,35 +19,30 @@ async def search_vacancies(
     salary_max: Optional[float] = None,
     experience_ids: Optional[List[int]] = Query(None),
     skill_ids: Optional[List[int]] = Query(None),
+    skills_mode: Literal["all", "any"] = Query("all", description="all - все навыки, any - любой"),
     remote_only: bool = False,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="Курсор из X-Next-Cursor / Link"),
     db: AsyncSession = Depends(get_db),
-    request: Request = None
+    request: Request = None,
 ):
     """Расширенный поиск вакансий"""
-    from sqlalchemy import select, or_, and_
+    from sqlalchemy import or_, and_
     from app.models.vacancy import Vacancy
     from app.models.company import Company
-    from app.models.vacancy_skill import VacancySkill
     
-    query = (
-        select(Vacancy)
-        .join(Company)
-        .where(Vacancy.is_active == True)
-        .options(selectinload(Vacancy.company))
+    # Только вакансии с компанией, как раньше при INNER JOIN
+    query = vacancy_crud.list_rows_query(
+        Vacancy.is_active == True, Company.company_id.is_not(None)
     )
     
     conditions = []
     
-    # Поиск по тексту
-    if q:
-        search_conditions = [
-            Vacancy.title.ilike(f"%{q}%"),
-            Vacancy.description.ilike(f"%{q}%"),
-            Company.name.ilike(f"%{q}%"),
-        ]
-        conditions.append(or_(*search_conditions))
+    # Поиск по тексту - через полнотекстовый индекс, с сортировкой по релевантности
+    matches = fulltext.search_subquery(q) if q else None
+    if matches is not None:
+        query = query.join(matches, matches.c.vacancy_id == Vacancy.vacancy_id)
     
     # Локация
     if location:
@@ -76,30 +72,18 @@ async def search_vacancies(
     if remote_only:
         conditions.append(Vacancy.work_format_id == 2)  # ID для "Удаленно"
     
-    # Навыки (требуются все указанные навыки)
+    # Навыки - по индексу навык -> вакансии
     if skill_ids:
-        for skill_id in skill_ids:
-            subquery = (
-                select(VacancySkill.vacancy_id)
-                .where(VacancySkill.skill_id == skill_id)
-                .scalar_subquery()
-            )
-            conditions.append(Vacancy.vacancy_id.in_(subquery))
+        await skill_index.ensure_current(db, skill_ids)
+        conditions.append(skill_index.condition(skill_ids, match_all=skills_mode == "all"))
     
     if conditions:
         query = query.where(and_(*conditions))
     
-    query = query.order_by(Vacancy.published_date.desc()).offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    vacancies = result.scalars().all()
-    response: List[VacancyWithCompany] = []
-    for vacancy in vacancies:
-        payload = VacancyWithCompany.model_validate(vacancy).model_dump()
-        payload["links"] = resource_links(
-            request,
-            f"{settings.API_V1_PREFIX}/vacancies/{vacancy.vacancy_id}",
-            f"{settings.API_V1_PREFIX}/vacancies",
-        )
-        response.append(payload)
+    keyset = LATEST_VACANCIES
+    if matches is not None:
+        keyset = Keyset("relevance", [SortKey("rank", matches.c.rank), *LATEST_VACANCIES.keys])
+    rows, next_cursor = await paginate(db, query, keyset, limit, cursor, skip)
+    response = vacancy_list_response(rows, request)
+    set_page_links(response, request, next_cursor)
     return response
\ No newline at end of file
@@ -8,6 +8,8 @@ from app.models.skill import Skill as SkillModel
 from app.schemas.skill import Skill, SkillCreate
 from app.core.config import settings
 from app.api.links import resource_links
+from app.services.reference_cache import reference_cache
+from app.services.skill_matcher import skill_matcher
 
 router = APIRouter()
 
@@ -23,6 +25,8 @@ async def create_skill(
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    reference_cache.invalidate("skills", db_obj.name)
+    skill_matcher.add(db_obj.name)
     payload = Skill.model_validate(db_obj).model_dump()
     payload["links"] = resource_links(
         request,
@@ -7,6 +7,17 @@ from app.models.vacancy import Vacancy
 from app.models.company import Company
 from app.models.skill import Skill
 from app.models.vacancy_skill import VacancySkill
+from app.core.http_client import http_client
+from app.services.count_cache import count_cache
+from app.services.data_version import data_version
+from app.services.ingestion_queue import ingestion_queue
+from app.services.parsers.hh_parser import HHParser
+from app.services.percolator import percolator
+from app.services.parsers.http_cache import get_response_cache
+from app.services.reference_cache import reference_cache
+from app.services.seen_set import seen_set
+from app.services.skill_index import skill_index
+from app.services.webhook_dispatcher import webhook_dispatcher
 
 
 router = APIRouter()
@@ -81,4 +92,31 @@ async def get_dashboard_stats(db: AsyncSession = Depends(get_db)):
         "experience_distribution": [
             {"experience": exp, "count": count} for exp, count in experience_distribution
         ]
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/parsers")
+async def get_parser_stats():
+    """Runtime-метрики парсеров"""
+    cache = get_response_cache()
+    return {
+        "http_client": http_client.snapshot(),
+        "reference_cache": reference_cache.stats(),
+        "seen_set": seen_set.stats(),
+        "skill_index": skill_index.stats(),
+        "count_cache": count_cache.stats(),
+        "change_feed": {
+            "data_version": data_version.value,
+            "waiting_streams": data_version.waiters,
+        },
+        "percolator": percolator.stats(),
+        "webhooks": webhook_dispatcher.stats(),
+        "ingestion_queue": ingestion_queue.stats(),
+        "hh": {
+            "max_in_flight": HHParser.MAX_IN_FLIGHT,
+            "per_host_limit": HHParser.PER_HOST_LIMIT,
+            "detail_latency": HHParser.detail_latency.snapshot(),
+            "response_cache": cache.stats() if cache else None,
+            "rate_limiter": HHParser.rate_limiter.stats(),
+        }
+    }
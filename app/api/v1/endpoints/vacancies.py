@@ -1,22 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import select, func
+import json
+from contextlib import aclosing
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal
 
-from app.schemas.vacancy import Vacancy, VacancyCreate, VacancyWithCompany, VacancyFilter
-from app.schemas.polling import PollingSettings
+from app.schemas.vacancy import (
+    Vacancy, VacancyChanges, VacancyCreate, VacancyWithCompany, VacancyFilter,
+)
+from app.schemas.polling import PollingSettings, PollingJobStatus
 from app.crud.vacancy import vacancy_crud
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
 from app.core.config import settings
 from app.core.polling import load_polling_state, save_polling_state
+from app.core.polling_runner import polling_scheduler
 from app.models.company import Company
 from app.models.experience import Experience
 from app.models.work_format import WorkFormat
 from app.models.work_schedule import WorkSchedule
 from app.models.skill import Skill
-from app.models.vacancy import Vacancy as VacancyModel
+from app.services.count_cache import count_cache
+from app.services.skill_index import skill_index
+from app.services.data_version import data_version
+from app.services.ingestion_queue import ingestion_queue
 from app.services.parsers.hh_parser import HHParser
+from app.services.seen_set import seen_set
 from app.api.links import resource_links, build_link, build_url
+from app.api.pagination import LATEST_VACANCIES, paginate, set_page_links
+from app.api.serializers import vacancy_list_response
 
 router = APIRouter()
 
@@ -104,12 +117,14 @@ async def read_vacancy_updates(
     max_salary: float | None = Query(None),
     currency: str | None = Query(None),
     skill_ids: List[int] | None = Query(None),
+    skills_mode: Literal["all", "any"] = Query("all", description="all - все навыки, any - любой"),
     is_active: bool | None = Query(True),
     since: str | None = Query(None),
+    cursor: str | None = Query(None, description="Курсор из X-Next-Cursor / Link"),
     offset: int = Query(0),
     limit: int = Query(100, le=1000),
     db: AsyncSession = Depends(get_db),
-    request: Request = None
+    request: Request = None,
 ):
     """
     Получить новые вакансии по фильтрам и дате
@@ -125,21 +140,20 @@ async def read_vacancy_updates(
         max_salary=max_salary,
         currency=currency,
         skill_ids=skill_ids,
+        skills_mode=skills_mode,
         is_active=is_active,
         since=since,
+        cursor=cursor,
         offset=offset,
         limit=limit,
     )
-    vacancies = await vacancy_crud.filter(db, filter=filter)
-    response: List[VacancyWithCompany] = []
-    for vacancy in vacancies:
-        payload = VacancyWithCompany.model_validate(vacancy).model_dump()
-        payload["links"] = resource_links(
-            request,
-            f"{settings.API_V1_PREFIX}/vacancies/{vacancy.vacancy_id}",
-            f"{settings.API_V1_PREFIX}/vacancies",
-        )
-        response.append(payload)
+    await skill_index.ensure_current(db, filter.skill_ids)
+    rows, next_cursor = await paginate(
+        db, vacancy_crud.filter_rows_query(filter), LATEST_VACANCIES,
+        filter.limit, filter.cursor, filter.offset,
+    )
+    response = vacancy_list_response(rows, request)
+    set_page_links(response, request, next_cursor)
     return response
 
 
@@ -150,10 +164,22 @@ async def get_polling_settings():
 
 @router.post("/polling-settings", response_model=PollingSettings)
 async def update_polling_settings(settings_in: PollingSettings):
-    saved = save_polling_state(settings_in.model_dump())
+    data = settings_in.model_dump()
+    # Расширение присылает только основной запрос - список queries не трогаем
+    if "queries" not in settings_in.model_fields_set:
+        data["queries"] = load_polling_state().get("queries") or []
+    saved = save_polling_state(data)
     return saved
 
 
+@router.get("/polling-settings/jobs", response_model=List[PollingJobStatus])
+async def get_polling_jobs():
+    """
+    Состояние заданий опроса: расписание и статистика последнего запуска
+    """
+    return polling_scheduler.status()
+
+
 @router.get("/count")
 async def read_vacancy_count(
     title: str | None = Query(None),
@@ -166,6 +192,7 @@ async def read_vacancy_count(
     max_salary: float | None = Query(None),
     currency: str | None = Query(None),
     skill_ids: List[int] | None = Query(None),
+    skills_mode: Literal["all", "any"] = Query("all", description="all - все навыки, any - любой"),
     is_active: bool | None = Query(True),
     since: str | None = Query(None),
     db: AsyncSession = Depends(get_db),
@@ -184,18 +211,91 @@ async def read_vacancy_count(
         max_salary=max_salary,
         currency=currency,
         skill_ids=skill_ids,
+        skills_mode=skills_mode,
         is_active=is_active,
         since=since,
         offset=0,
         limit=1,
     )
 
-    query = select(func.count()).select_from(VacancyModel)
-    conditions = vacancy_crud._build_conditions(filter)
-    if conditions:
-        query = query.where(*conditions)
-    result = await db.execute(query)
-    return {"count": result.scalar() or 0}
+    # Между циклами загрузки ответ берётся из памяти
+    return {"count": await count_cache.get(db, filter)}
+
+
+def _changes_filter(
+    title: str | None = Query(None),
+    location: str | None = Query(None),
+    min_salary: float | None = Query(None),
+    max_salary: float | None = Query(None),
+    skill_ids: List[int] | None = Query(None),
+    skills_mode: Literal["all", "any"] = Query("all"),
+) -> VacancyFilter:
+    return VacancyFilter(
+        title=title,
+        location=location,
+        min_salary=min_salary,
+        max_salary=max_salary,
+        skill_ids=skill_ids,
+        skills_mode=skills_mode,
+    )
+
+
+@router.get("/changes", response_model=VacancyChanges)
+async def read_vacancy_changes(
+    after: int | None = Query(None, description="Курсор из предыдущего ответа"),
+    limit: int = Query(100, ge=1, le=1000),
+    filter: VacancyFilter = Depends(_changes_filter),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Новые и изменённые вакансии после курсора, в порядке изменений.
+    Без `after` возвращается только текущий курсор.
+    """
+    return await vacancy_crud.changes(db, after, filter, limit)
+
+
+@router.get("/changes/stream")
+async def stream_vacancy_changes(
+    request: Request,
+    after: int | None = Query(None, description="Курсор; при переподключении - Last-Event-ID"),
+    filter: VacancyFilter = Depends(_changes_filter),
+):
+    """
+    Лента изменений (Server-Sent Events): событие `changes` после каждой
+    загрузки, затронувшей подходящие вакансии, между ними - keep-alive.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        after = int(last_event_id)
+
+    async def events():
+        cursor = after
+        first = True
+        while True:
+            # Версию запоминаем до выборки, чтобы не пропустить commit между ними
+            version = data_version.value
+            # Сессия только на время выборки: ожидающие клиенты не держат соединений с БД
+            async with AsyncSessionLocal() as db:
+                page = await vacancy_crud.changes(
+                    db, cursor, filter, settings.CHANGES_BATCH_SIZE
+                )
+            if page["changes"] or first:
+                payload = json.dumps(jsonable_encoder(page), ensure_ascii=False)
+                yield f"id: {page['cursor']}\nevent: changes\ndata: {payload}\n\n"
+            first = False
+            cursor = page["cursor"]
+            if page["has_more"]:
+                continue
+            if await request.is_disconnected():
+                return
+            if not await data_version.wait_for_change(version, settings.CHANGES_KEEPALIVE_SECONDS):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{vacancy_id}", response_model=Vacancy)
@@ -238,8 +338,10 @@ async def read_vacancy(
 @router.get("/", response_model=List[VacancyWithCompany])
 async def read_vacancies(
     filter: VacancyFilter = Depends(),
+    # Списки в зависимости-модели FastAPI читает из тела - объявляем явно
+    skill_ids: List[int] | None = Query(None),
     db: AsyncSession = Depends(get_db),
-    request: Request = None
+    request: Request = None,
 ):
     """
     Получить список вакансий с фильтрацией
@@ -251,16 +353,14 @@ async def read_vacancies(
     :param db: Description
     :type db: AsyncSession
     """
-    vacancies = await vacancy_crud.filter(db, filter=filter)
-    response: List[VacancyWithCompany] = []
-    for vacancy in vacancies:
-        payload = VacancyWithCompany.model_validate(vacancy).model_dump()
-        payload["links"] = resource_links(
-            request,
-            f"{settings.API_V1_PREFIX}/vacancies/{vacancy.vacancy_id}",
-            f"{settings.API_V1_PREFIX}/vacancies",
-        )
-        response.append(payload)
+    filter = filter.model_copy(update={"skill_ids": skill_ids})
+    await skill_index.ensure_current(db, filter.skill_ids)
+    rows, next_cursor = await paginate(
+        db, vacancy_crud.filter_rows_query(filter), LATEST_VACANCIES,
+        filter.limit, filter.cursor, filter.offset,
+    )
+    response = vacancy_list_response(rows, request)
+    set_page_links(response, request, next_cursor)
     return response
 
 
@@ -269,8 +369,9 @@ async def read_company_vacancies(
     company_id: int,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description="Курсор из X-Next-Cursor / Link"),
     db: AsyncSession = Depends(get_db),
-    request: Request = None
+    request: Request = None,
 ):
     """
     Получить вакансии компании
@@ -286,28 +387,14 @@ async def read_company_vacancies(
     :param db: Description
     :type db: AsyncSession
     """
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
     from app.models.vacancy import Vacancy
 
-    result = await db.execute(
-        select(Vacancy)
-        .options(selectinload(Vacancy.company))
-        .where(Vacancy.company_id == company_id, Vacancy.is_active == True)
-        .offset(skip)
-        .limit(limit)
-        .order_by(Vacancy.published_date.desc())
+    query = vacancy_crud.list_rows_query(
+        Vacancy.company_id == company_id, Vacancy.is_active == True
     )
-    vacancies = result.scalars().all()
-    response: List[VacancyWithCompany] = []
-    for vacancy in vacancies:
-        payload = VacancyWithCompany.model_validate(vacancy).model_dump()
-        payload["links"] = resource_links(
-            request,
-            f"{settings.API_V1_PREFIX}/vacancies/{vacancy.vacancy_id}",
-            f"{settings.API_V1_PREFIX}/vacancies",
-        )
-        response.append(payload)
+    rows, next_cursor = await paginate(db, query, LATEST_VACANCIES, limit, cursor, skip)
+    response = vacancy_list_response(rows, request)
+    set_page_links(response, request, next_cursor)
     return response
 
 
@@ -317,37 +404,41 @@ async def parse_hh_vacancies(
     limit: int = Query(50, ge=1, le=200),
     area: int = Query(1, description="ID региона hh.ru (1 = Москва)"),
     only_with_salary: bool = Query(False),
-    db: AsyncSession = Depends(get_db),
+    skip_seen: bool = Query(
+        False, description="Не перечитывать уже сохранённые вакансии (их изменения не попадут в БД)"
+    ),
 ):
     """
-    Запустить парсинг hh.ru и сохранить вакансии в БД
+    Запустить парсинг hh.ru и сохранить вакансии в БД.
+
+    По умолчанию сохранённые вакансии загружаются заново и обновляются на
+    месте, если изменились (`updated`) или нет (`unchanged`). `skipped` -
+    только дубли внутри выдачи и вакансии без URL; сохранённые раньше
+    вакансии в него больше не входят. С `skip_seen` такие вакансии не
+    запрашиваются вовсе и считаются в `already_seen`.
     """
+    parsed = 0
+    totals = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
     parser = HHParser()
     async with parser:
-        vacancies_data = await parser.parse_vacancies(
+        # Пока сохраняется пачка, парсер уже грузит следующую
+        batches = parser.iter_batches(
             search_query=q,
             limit=limit,
             area=area,
             only_with_salary=only_with_salary,
+            seen=seen_set if skip_seen and seen_set.loaded else None,
         )
+        async with aclosing(batches) as stream:
+            async for batch in stream:
+                parsed += len(batch)
+                # Запись идёт через общую очередь с одним писателем
+                result = await ingestion_queue.submit(batch)
+                for key in totals:
+                    totals[key] += result[key]
 
-    created = 0
-    skipped = 0
-    for vacancy_data in vacancies_data:
-        source_url = vacancy_data.get("source_url")
-        if not source_url:
-            skipped += 1
-            continue
-        existing = await vacancy_crud.get_by_source_url(db, source_url)
-        if existing:
-            skipped += 1
-            continue
-        await vacancy_crud.create_from_parsed(db, vacancy_data, commit=False)
-        created += 1
-
-    await db.commit()
     return {
-        "parsed": len(vacancies_data),
-        "created": created,
-        "skipped": skipped,
+        "parsed": parsed,
+        **totals,
+        "already_seen": parser.listing_stats["skipped_seen"],
     }
\ No newline at end of file
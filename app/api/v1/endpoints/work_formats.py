@@ -8,6 +8,7 @@ from app.models.work_format import WorkFormat as WorkFormatModel
 from app.schemas.work_format import WorkFormat, WorkFormatCreate
 from app.core.config import settings
 from app.api.links import resource_links
+from app.services.reference_cache import reference_cache
 
 router = APIRouter()
 
@@ -29,6 +30,7 @@ async def create_work_format(
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    reference_cache.invalidate("work_formats", db_obj.name)
     payload = WorkFormat.model_validate(db_obj).model_dump()
     payload["links"] = resource_links(
         request,
@@ -8,6 +8,7 @@ from app.models.work_schedule import WorkSchedule as WorkScheduleModel
 from app.schemas.work_schedule import WorkSchedule, WorkScheduleCreate
 from app.core.config import settings
 from app.api.links import resource_links
+from app.services.reference_cache import reference_cache
 
 router = APIRouter()
 
@@ -29,6 +30,7 @@ async def create_work_schedule(
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    reference_cache.invalidate("work_schedules", db_obj.name)
     payload = WorkSchedule.model_validate(db_obj).model_dump()
     payload["links"] = resource_links(
         request,
@@ -27,11 +27,77 @@ class Settings(BaseSettings):
     HH_API_URL: str = getenv("HH_API_URL", "https://api.hh.ru")
     SUPERJOB_API_KEY: str = getenv("SUPERJOB_API_KEY")
 
+    # Parsers
+    HH_MAX_IN_FLIGHT: int = int(getenv("HH_MAX_IN_FLIGHT", "8"))
+    HH_PER_HOST_LIMIT: int = int(getenv("HH_PER_HOST_LIMIT", "8"))
+    HH_PAGE_PREFETCH: int = int(getenv("HH_PAGE_PREFETCH", "4"))
+    HH_MAX_EMPTY_PAGES: int = int(getenv("HH_MAX_EMPTY_PAGES", "3"))
+    PARSER_BATCH_SIZE: int = int(getenv("PARSER_BATCH_SIZE", "50"))
+    PARSER_BATCH_QUEUE: int = int(getenv("PARSER_BATCH_QUEUE", "2"))
+    PARSER_RATE_LIMIT_RPS: float = float(getenv("PARSER_RATE_LIMIT_RPS", "10"))
+    PARSER_RATE_LIMIT_BURST: int = int(getenv("PARSER_RATE_LIMIT_BURST", "20"))
+    PARSER_MAX_RETRIES: int = int(getenv("PARSER_MAX_RETRIES", "4"))
+    PARSER_BACKOFF_BASE_SECONDS: float = float(getenv("PARSER_BACKOFF_BASE_SECONDS", "0.5"))
+    PARSER_BACKOFF_MAX_SECONDS: float = float(getenv("PARSER_BACKOFF_MAX_SECONDS", "30"))
+
+    # Очередь загрузки в БД с одним писателем
+    INGEST_QUEUE_MAX_ITEMS: int = int(getenv("INGEST_QUEUE_MAX_ITEMS", "1000"))
+    INGEST_BATCH_SIZE: int = int(getenv("INGEST_BATCH_SIZE", "200"))
+    INGEST_BATCH_MAX_DELAY_SECONDS: float = float(getenv("INGEST_BATCH_MAX_DELAY_SECONDS", "0.5"))
+
+    # SSE-лента изменений: интервал keep-alive и размер пачки
+    CHANGES_KEEPALIVE_SECONDS: float = float(getenv("CHANGES_KEEPALIVE_SECONDS", "15"))
+    CHANGES_BATCH_SIZE: int = int(getenv("CHANGES_BATCH_SIZE", "200"))
+
+    # Сохранённые поиски: перколятор новых вакансий и доставка на webhook
+    SAVED_SEARCH_MAX_PER_USER: int = int(getenv("SAVED_SEARCH_MAX_PER_USER", "50"))
+    SAVED_SEARCH_PERCOLATE_BATCH: int = int(getenv("SAVED_SEARCH_PERCOLATE_BATCH", "500"))
+    SAVED_SEARCH_WEBHOOK_BATCH_SIZE: int = int(getenv("SAVED_SEARCH_WEBHOOK_BATCH_SIZE", "100"))
+    SAVED_SEARCH_WEBHOOK_INTERVAL_SECONDS: float = float(getenv("SAVED_SEARCH_WEBHOOK_INTERVAL_SECONDS", "5"))
+    SAVED_SEARCH_WEBHOOK_MAX_ATTEMPTS: int = int(getenv("SAVED_SEARCH_WEBHOOK_MAX_ATTEMPTS", "8"))
+    SAVED_SEARCH_WEBHOOK_CONCURRENCY: int = int(getenv("SAVED_SEARCH_WEBHOOK_CONCURRENCY", "8"))
+    SAVED_SEARCH_WEBHOOK_PER_HOST: int = int(getenv("SAVED_SEARCH_WEBHOOK_PER_HOST", "2"))
+    # Разрешить webhook на внутренние адреса (localhost, частные сети) - только для разработки
+    SAVED_SEARCH_WEBHOOK_ALLOW_PRIVATE: bool = getenv("SAVED_SEARCH_WEBHOOK_ALLOW_PRIVATE", "false").lower() == "true"
+
+    # Кэш /vacancies/count: число разных фильтров в памяти
+    COUNT_CACHE_MAX_ENTRIES: int = int(getenv("COUNT_CACHE_MAX_ENTRIES", "1024"))
+
+    # Индекс навык -> вакансии: больше совпадений фильтруется подзапросом
+    SKILL_INDEX_MAX_IN_IDS: int = int(getenv("SKILL_INDEX_MAX_IN_IDS", "20000"))
+    # Больше изменившихся вакансий за раз - индекс строится заново
+    SKILL_INDEX_MAX_REFRESH: int = int(getenv("SKILL_INDEX_MAX_REFRESH", "50000"))
+
+    # Множество уже загруженных вакансий (bloom-фильтр + LRU)
+    SEEN_SET_CAPACITY: int = int(getenv("SEEN_SET_CAPACITY", "1000000"))
+    SEEN_SET_FP_RATE: float = float(getenv("SEEN_SET_FP_RATE", "0.01"))
+    SEEN_SET_LRU_SIZE: int = int(getenv("SEEN_SET_LRU_SIZE", "200000"))
+
+    # Общий HTTP-клиент парсеров
+    HTTP_POOL_LIMIT: int = int(getenv("HTTP_POOL_LIMIT", "100"))
+    HTTP_POOL_LIMIT_PER_HOST: int = int(getenv("HTTP_POOL_LIMIT_PER_HOST", getenv("HH_PER_HOST_LIMIT", "8")))
+    HTTP_KEEPALIVE_SECONDS: float = float(getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+    HTTP_DNS_TTL_SECONDS: int = int(getenv("HTTP_DNS_TTL_SECONDS", "300"))
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = float(getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+    HTTP_TOTAL_TIMEOUT_SECONDS: float = float(getenv("HTTP_TOTAL_TIMEOUT_SECONDS", "30"))
+    HTTP_USER_AGENT: str = getenv("HTTP_USER_AGENT", "vacancy-insight/1.0")
+
+    # HTTP-кэш ответов hh.ru
+    HH_CACHE_ENABLED: bool = getenv("HH_CACHE_ENABLED", "true").lower() == "true"
+    HH_CACHE_PATH: str = getenv("HH_CACHE_PATH", ".cache/hh_responses.sqlite3")
+    HH_CACHE_TTL_SECONDS: int = int(getenv("HH_CACHE_TTL_SECONDS", "3600"))
+    HH_CACHE_EXPIRE_SECONDS: int = int(getenv("HH_CACHE_EXPIRE_SECONDS", "604800"))
+    HH_CACHE_MAX_BYTES: int = int(getenv("HH_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
     # Cache
     CACHE_MAX_AGE: int = int(getenv("CACHE_MAX_AGE", "60"))
+    REFERENCE_CACHE_MAX_COMPANIES: int = int(getenv("REFERENCE_CACHE_MAX_COMPANIES", "50000"))
+    REFERENCE_CACHE_MAX_SKILLS: int = int(getenv("REFERENCE_CACHE_MAX_SKILLS", "20000"))
 
     # Polling
     POLLING_INTERVAL_SECONDS: int = int(getenv("POLLING_INTERVAL_SECONDS", "60"))
+    POLLING_MAX_CONCURRENCY: int = int(getenv("POLLING_MAX_CONCURRENCY", "4"))
+    POLLING_START_JITTER_SECONDS: float = float(getenv("POLLING_START_JITTER_SECONDS", "10"))
 
     class Config:
         env_file = ".env"
@@ -1,6 +1,9 @@
-from sqlalchemy import create_engine
+import logging
+from typing import Any, Callable, Dict
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 
 from .config import settings
@@ -23,6 +26,45 @@ AsyncSessionLocal = sessionmaker(
 
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
+
+# Изменения структур в памяти, отложенные до commit
+
+# Ключ в Session.info -> обработчик накопленного под ним значения
+_commit_hooks: Dict[str, Callable[[Any], None]] = {}
+
+
+def on_outer_commit(key: str, callback: Callable[[Any], None]) -> None:
+    """
+    После commit внешней транзакции вызвать callback(session.info[key]),
+    если значение под ключом было записано; при rollback оно отбрасывается.
+    Так кэши и индексы в памяти видят только закоммиченные изменения.
+    """
+    _commit_hooks[key] = callback
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_hooks(session: Session) -> None:
+    # Событие приходит и на RELEASE SAVEPOINT - ждём внешний commit
+    if session.in_nested_transaction():
+        return
+    for key, callback in _commit_hooks.items():
+        pending = session.info.pop(key, None)
+        if pending is None:
+            continue
+        try:
+            callback(pending)
+        except Exception:
+            # Данные уже закоммичены - ошибку кэша не отдаём вызывающему
+            logger.exception("After-commit hook %s failed", key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_commit_hooks(session: Session) -> None:
+    for key in _commit_hooks:
+        session.info.pop(key, None)
+
 
 # Зависимость для получения сессии БД
 
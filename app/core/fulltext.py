@@ -0,0 +1,238 @@
+"""
+Полнотекстовый индекс вакансий (название, компания, описание).
+
+SQLite: таблица FTS5 `vacancies_fts` (rowid = vacancy_id), ранжирование bm25.
+Морфологии в SQLite нет: каждое слово запроса ищется как префикс слова
+вакансии ("разработ" найдёт "разработчика"), но "разработчики" не найдёт
+"разработчик" - это лишь приближение к поиску PostgreSQL.
+PostgreSQL: колонка `search_vector` (tsvector, словарь russian) с GIN-индексом,
+ранжирование ts_rank_cd. В обоих случаях индекс обновляют триггеры, поэтому
+он синхронен при любой записи, включая upsert при загрузке.
+
+Полная перестройка индекса:
+
+    python -m app.core.fulltext
+"""
+import asyncio
+import logging
+import re
+from typing import FrozenSet, List, Optional
+
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Subquery
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Веса полей: название важнее компании, компания важнее описания
+TITLE_WEIGHT = 10.0
+COMPANY_WEIGHT = 5.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Ограничение на число слов запроса
+MAX_TERMS = 12
+
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_fts USING fts5(
+        title, company, description,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS vacancies_fts_ai AFTER INSERT ON vacancies BEGIN
+        INSERT INTO vacancies_fts (rowid, title, company, description)
+        VALUES (
+            new.vacancy_id, new.title,
+            (SELECT name FROM companies WHERE company_id = new.company_id),
+            new.description
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS vacancies_fts_ad AFTER DELETE ON vacancies BEGIN
+        DELETE FROM vacancies_fts WHERE rowid = old.vacancy_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS vacancies_fts_au
+    AFTER UPDATE OF title, description, company_id ON vacancies BEGIN
+        DELETE FROM vacancies_fts WHERE rowid = old.vacancy_id;
+        INSERT INTO vacancies_fts (rowid, title, company, description)
+        VALUES (
+            new.vacancy_id, new.title,
+            (SELECT name FROM companies WHERE company_id = new.company_id),
+            new.description
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_fts_au AFTER UPDATE OF name ON companies BEGIN
+        UPDATE vacancies_fts SET company = new.name
+        WHERE rowid IN (SELECT vacancy_id FROM vacancies WHERE company_id = new.company_id);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION vacancies_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(
+                (SELECT name FROM companies WHERE company_id = NEW.company_id), ''
+            )), 'B') ||
+            setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS vacancies_search_vector ON vacancies",
+    """
+    CREATE TRIGGER vacancies_search_vector
+    BEFORE INSERT OR UPDATE OF title, description, company_id ON vacancies
+    FOR EACH ROW EXECUTE FUNCTION vacancies_search_vector()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION companies_search_vector() RETURNS trigger AS $$
+    BEGIN
+        -- Пересчёт через триггер вакансий
+        UPDATE vacancies SET company_id = company_id WHERE company_id = NEW.company_id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS companies_search_vector ON companies",
+    """
+    CREATE TRIGGER companies_search_vector
+    AFTER UPDATE OF name ON companies
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION companies_search_vector()
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_vacancies_search_vector ON vacancies USING GIN (search_vector)",
+]
+
+
+def terms(query: str) -> List[str]:
+    """Слова запроса в нижнем регистре, без повторов"""
+    seen = {}
+    for word in _WORD.findall(query or ""):
+        seen.setdefault(word.lower(), None)
+    return list(seen)[:MAX_TERMS]
+
+
+def tokens(text_value: Optional[str]) -> FrozenSet[str]:
+    """Слова текста так, как их видит индекс (без ограничения числа)"""
+    return frozenset(word.lower() for word in _WORD.findall(text_value or ""))
+
+
+def installed(conn: Connection) -> bool:
+    if conn.dialect.name == "sqlite":
+        return bool(
+            conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vacancies_fts'")
+            ).first()
+        )
+    if conn.dialect.name == "postgresql":
+        return bool(
+            conn.execute(
+                text(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_name = 'vacancies' AND column_name = 'search_vector'"
+                )
+            ).first()
+        )
+    return False
+
+
+def install(conn: Connection) -> None:
+    """Создать индекс и триггеры (идемпотентно)"""
+    if conn.dialect.name == "sqlite":
+        statements = SQLITE_DDL
+    elif conn.dialect.name == "postgresql":
+        statements = POSTGRES_DDL
+    else:
+        logger.warning("Full-text index is not supported for %s", conn.dialect.name)
+        return
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+def rebuild(conn: Connection) -> int:
+    """Заполнить индекс заново по текущим данным"""
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("DELETE FROM vacancies_fts"))
+        result = conn.execute(
+            text(
+                "INSERT INTO vacancies_fts (rowid, title, company, description) "
+                "SELECT v.vacancy_id, v.title, c.name, v.description FROM vacancies v "
+                "LEFT JOIN companies c ON c.company_id = v.company_id"
+            )
+        )
+        conn.execute(text("INSERT INTO vacancies_fts (vacancies_fts) VALUES ('optimize')"))
+    elif conn.dialect.name == "postgresql":
+        # Триггер пересчитывает search_vector при любом UPDATE OF title
+        result = conn.execute(text("UPDATE vacancies SET title = title"))
+    else:
+        return 0
+    logger.info("Full-text index rebuilt: %s vacancies", result.rowcount)
+    return result.rowcount
+
+
+def search_subquery(q: str) -> Optional[Subquery]:
+    """
+    Подзапрос (vacancy_id, rank) по совпадениям с запросом; больший rank -
+    более релевантная вакансия. None, если в запросе нет слов.
+    """
+    postgres = engine.dialect.name == "postgresql"
+    words = terms(q)
+    if not words:
+        return None
+    if postgres:
+        tsquery = func.to_tsquery(
+            "russian", " & ".join(f"{word}:*" for word in words)
+        )
+        vector = literal_column("vacancies.search_vector")
+        return (
+            select(
+                literal_column("vacancies.vacancy_id").label("vacancy_id"),
+                func.ts_rank_cd(vector, tsquery).label("rank"),
+            )
+            .select_from(text("vacancies"))
+            .where(vector.op("@@")(tsquery))
+            .subquery("fulltext")
+        )
+    match = " AND ".join(f'"{word}"*' for word in words)
+    return (
+        select(
+            literal_column("vacancies_fts.rowid").label("vacancy_id"),
+            (
+                -func.bm25(
+                    literal_column("vacancies_fts"),
+                    TITLE_WEIGHT,
+                    COMPANY_WEIGHT,
+                    DESCRIPTION_WEIGHT,
+                )
+            ).label("rank"),
+        )
+        .select_from(text("vacancies_fts"))
+        .where(literal_column("vacancies_fts").op("MATCH")(match))
+        .subquery("fulltext")
+    )
+
+
+async def main() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(install)
+        await conn.run_sync(rebuild)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
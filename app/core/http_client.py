@@ -0,0 +1,144 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPoolStats:
+    """Метрики пула соединений, собираются через aiohttp.TraceConfig"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued = 0
+        self.queued_seconds = 0.0
+        self.max_queued_seconds = 0.0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.connections_reused += 1
+
+        async def on_connection_queued_start(session, ctx, params):
+            ctx.queued_at = time.monotonic()
+
+        async def on_connection_queued_end(session, ctx, params):
+            # Все соединения к хосту заняты - запрос ждал свободного
+            waited = time.monotonic() - getattr(ctx, "queued_at", time.monotonic())
+            self.queued += 1
+            self.queued_seconds += waited
+            self.max_queued_seconds = max(self.max_queued_seconds, waited)
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self.dns_cache_misses += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_connection_queued_start.append(on_connection_queued_start)
+        trace.on_connection_queued_end.append(on_connection_queued_end)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    def snapshot(self) -> Dict[str, Any]:
+        connections = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_rate": round(self.connections_reused / connections, 3) if connections else 0.0,
+            "queued": self.queued,
+            "queued_seconds": round(self.queued_seconds, 3),
+            "max_queued_ms": round(self.max_queued_seconds * 1000, 1),
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+        }
+
+
+def create_client_session(
+    limit_per_host: Optional[int] = None,
+    stats: Optional[ConnectionPoolStats] = None,
+    resolver: Optional[AbstractResolver] = None,
+) -> aiohttp.ClientSession:
+    """Сессия с настроенным пулом: keep-alive, кэш DNS, таймауты, User-Agent"""
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_POOL_LIMIT,
+        limit_per_host=limit_per_host or settings.HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=settings.HTTP_DNS_TTL_SECONDS,
+        keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+        resolver=resolver,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.HTTP_TOTAL_TIMEOUT_SECONDS,
+        connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"User-Agent": settings.HTTP_USER_AGENT},
+        trace_configs=[stats.trace_config()] if stats else None,
+    )
+
+
+class HTTPClientManager:
+    """
+    HTTP-клиент на всё время жизни приложения. Открывается в lifespan,
+    парсеры берут его сессию вместо создания своей, так что соединения,
+    TLS-сессии и кэш DNS переживают циклы опроса.
+    """
+
+    def __init__(self):
+        self.stats = ConnectionPoolStats()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        if self._session is None or self._session.closed:
+            return None
+        return self._session
+
+    async def start(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            self._session = create_client_session(stats=self.stats)
+            logger.info(
+                "HTTP client started: limit=%s limit_per_host=%s",
+                settings.HTTP_POOL_LIMIT,
+                settings.HTTP_POOL_LIMIT_PER_HOST,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "started": self.session is not None,
+            "limit": settings.HTTP_POOL_LIMIT,
+            "limit_per_host": settings.HTTP_POOL_LIMIT_PER_HOST,
+            **self.stats.snapshot(),
+        }
+
+
+http_client = HTTPClientManager()
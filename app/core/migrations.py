@@ -0,0 +1,353 @@
+import logging
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+
+from app.core import fulltext
+from app.models.change_sequence import ChangeSequence
+from app.models.saved_search import SavedSearch, SavedSearchDelivery, SavedSearchMatch
+from app.models.vacancy import Vacancy
+
+logger = logging.getLogger(__name__)
+
+HH_VACANCY_URL = re.compile(r"hh\.ru/vacancy/(\d+)")
+
+
+def _has_table(conn: Connection, table: str) -> bool:
+    return inspect(conn).has_table(table)
+
+
+def _columns(conn: Connection, table: str) -> set:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _indexes(conn: Connection, table: str) -> Dict[str, dict]:
+    return {index["name"]: index for index in inspect(conn).get_indexes(table)}
+
+
+def add_vacancy_external_key(conn: Connection) -> None:
+    """external_source + external_id у вакансий, заполнение для hh.ru по source_url"""
+    if not _has_table(conn, "vacancies"):
+        return
+    columns = _columns(conn, "vacancies")
+    if "external_source" not in columns:
+        conn.execute(text("ALTER TABLE vacancies ADD COLUMN external_source VARCHAR(20)"))
+    if "external_id" not in columns:
+        conn.execute(text("ALTER TABLE vacancies ADD COLUMN external_id VARCHAR(64)"))
+
+    taken = {
+        row[0]
+        for row in conn.execute(
+            text("SELECT external_id FROM vacancies WHERE external_source = 'hh'")
+        )
+    }
+    updates = []
+    rows = conn.execute(
+        text("SELECT vacancy_id, source_url FROM vacancies WHERE external_id IS NULL")
+    )
+    for vacancy_id, source_url in rows:
+        match = HH_VACANCY_URL.search(source_url or "")
+        # Дубли одной вакансии под разными URL оставляем без ключа
+        if match and match.group(1) not in taken:
+            taken.add(match.group(1))
+            updates.append({"vacancy_id": vacancy_id, "external_id": match.group(1)})
+    if updates:
+        conn.execute(
+            text(
+                "UPDATE vacancies SET external_source = 'hh', external_id = :external_id "
+                "WHERE vacancy_id = :vacancy_id"
+            ),
+            updates,
+        )
+        logger.info("Backfilled external ids for %s vacancies", len(updates))
+
+    if "uq_vacancies_external" not in _indexes(conn, "vacancies"):
+        conn.execute(
+            text(
+                "CREATE UNIQUE INDEX uq_vacancies_external "
+                "ON vacancies (external_source, external_id)"
+            )
+        )
+
+
+def make_skill_names_unique(conn: Connection) -> None:
+    """Уникальное имя навыка: дубли сливаются в навык с меньшим id"""
+    if not _has_table(conn, "skills"):
+        return
+    index = _indexes(conn, "skills").get("ix_skills_name")
+    if index and index["unique"]:
+        return
+
+    duplicates = conn.execute(
+        text(
+            "SELECT name, MIN(skill_id) FROM skills GROUP BY name HAVING COUNT(*) > 1"
+        )
+    ).all()
+    for name, keep_id in duplicates:
+        others = conn.execute(
+            text("SELECT skill_id FROM skills WHERE name = :name AND skill_id <> :keep_id"),
+            {"name": name, "keep_id": keep_id},
+        ).scalars().all()
+        for skill_id in others:
+            params = {"skill_id": skill_id, "keep_id": keep_id}
+            conn.execute(
+                text(
+                    "DELETE FROM vacancy_skills WHERE skill_id = :skill_id AND vacancy_id IN "
+                    "(SELECT vacancy_id FROM vacancy_skills WHERE skill_id = :keep_id)"
+                ),
+                params,
+            )
+            conn.execute(
+                text("UPDATE vacancy_skills SET skill_id = :keep_id WHERE skill_id = :skill_id"),
+                params,
+            )
+            conn.execute(text("DELETE FROM skills WHERE skill_id = :skill_id"), params)
+    if duplicates:
+        logger.info("Merged %s duplicated skill names", len(duplicates))
+
+    if index:
+        conn.execute(text("DROP INDEX ix_skills_name"))
+    conn.execute(text("CREATE UNIQUE INDEX ix_skills_name ON skills (name)"))
+
+
+def _title_unique_constraint(conn: Connection) -> Optional[Tuple[str, Optional[str]]]:
+    """("constraint" | "index", имя) уникальности title; в SQLite имени может не быть"""
+    inspector = inspect(conn)
+    for constraint in inspector.get_unique_constraints("vacancies"):
+        if constraint["column_names"] == ["title"]:
+            return "constraint", constraint["name"]
+    for index in inspector.get_indexes("vacancies"):
+        if index["unique"] and index["column_names"] == ["title"]:
+            return "index", index["name"]
+    return None
+
+
+def _rebuild_sqlite_table(conn: Connection, table: Table) -> None:
+    """
+    SQLite не умеет менять ограничения и параметры таблицы - пересоздаём её
+    по модели.
+
+    Внешние ключи на время пересоздания должны быть выключены: с включёнными
+    DROP TABLE удалил бы строки, ссылающиеся на таблицу (ON DELETE CASCADE).
+    Внутри уже начатой транзакции PRAGMA не действует - тогда миграция
+    останавливается. После пересоздания foreign_key_check сравнивается с
+    состоянием до него: висячие ссылки, которые уже были в базе, не мешают,
+    ошибкой считаются только новые.
+    """
+    foreign_keys = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+    conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+    if conn.exec_driver_sql("PRAGMA foreign_keys").scalar():
+        raise RuntimeError(
+            "Cannot disable SQLite foreign keys inside a transaction; "
+            f"run the {table.name} rebuild on a fresh connection"
+        )
+    try:
+        before = _foreign_key_violations(conn)
+        if before:
+            logger.warning("Database already has %s foreign key violations", len(before))
+        _copy_sqlite_table(conn, table)
+        violations = _foreign_key_violations(conn) - before
+        if violations:
+            logger.error("Foreign key violations after %s rebuild: %s", table.name, sorted(violations)[:20])
+            raise RuntimeError(f"{table.name} rebuild left {len(violations)} foreign key violations")
+    finally:
+        if foreign_keys:
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+
+def _foreign_key_violations(conn: Connection) -> set:
+    """(таблица, rowid, родительская таблица); номер ключа в таблице после пересоздания другой"""
+    return {
+        (table, rowid, parent)
+        for table, rowid, parent, _ in conn.exec_driver_sql("PRAGMA foreign_key_check")
+    }
+
+
+def _copy_sqlite_table(conn: Connection, table: Table) -> None:
+    columns = _columns(conn, table.name)
+    metadata = MetaData()
+    # Связанные таблицы нужны в той же MetaData для внешних ключей
+    for other in table.metadata.sorted_tables:
+        if other is not table:
+            other.to_metadata(metadata)
+    new_name = f"{table.name}_new"
+    new_table = table.to_metadata(metadata, name=new_name)
+    shared = ", ".join(column.name for column in table.columns if column.name in columns)
+    conn.execute(CreateTable(new_table))
+    conn.execute(text(f"INSERT INTO {new_name} ({shared}) SELECT {shared} FROM {table.name}"))
+    conn.execute(text(f"DROP TABLE {table.name}"))
+    conn.execute(text(f"ALTER TABLE {new_name} RENAME TO {table.name}"))
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _restore_titles(conn: Connection) -> None:
+    """Убрать суффиксы " (Компания)" и " (Компания-YYYYmmddHHMMSS[-N])" """
+    rows = conn.execute(
+        text(
+            "SELECT v.vacancy_id, v.title, c.name FROM vacancies v "
+            "JOIN companies c ON c.company_id = v.company_id "
+            "WHERE v.title LIKE '%)'"
+        )
+    )
+    updates = []
+    for vacancy_id, title, company_name in rows:
+        if not company_name:
+            continue
+        suffix = re.compile(rf" \({re.escape(company_name)}(-\d{{14}}(-\d+)?)?\)$")
+        restored = suffix.sub("", title)
+        if restored != title and restored:
+            updates.append({"vacancy_id": vacancy_id, "title": restored})
+    if updates:
+        conn.execute(
+            text("UPDATE vacancies SET title = :title WHERE vacancy_id = :vacancy_id"),
+            updates,
+        )
+    logger.info("Restored %s vacancy titles", len(updates))
+
+
+def drop_vacancy_title_unique(conn: Connection) -> None:
+    """Название вакансии больше не уникально - дубли различает external id"""
+    if not _has_table(conn, "vacancies"):
+        return
+    unique = _title_unique_constraint(conn)
+    if unique is None:
+        return
+    kind, name = unique
+    if conn.dialect.name == "sqlite":
+        _rebuild_sqlite_table(conn, Vacancy.__table__)
+    elif kind == "constraint":
+        conn.execute(text(f'ALTER TABLE vacancies DROP CONSTRAINT "{name}"'))
+    else:
+        conn.execute(text(f'DROP INDEX "{name}"'))
+    _restore_titles(conn)
+
+
+def add_vacancy_content_hash(conn: Connection) -> None:
+    """Хэши содержимого; у старых строк пустые - первая же загрузка их заполнит"""
+    if not _has_table(conn, "vacancies"):
+        return
+    columns = _columns(conn, "vacancies")
+    for column in ("content_hash", "description_hash"):
+        if column not in columns:
+            conn.execute(text(f"ALTER TABLE vacancies ADD COLUMN {column} VARCHAR(64)"))
+
+
+def add_vacancy_fulltext(conn: Connection) -> None:
+    """Полнотекстовый индекс; при первом создании заполняется по всем вакансиям"""
+    if not _has_table(conn, "vacancies"):
+        return
+    created = not fulltext.installed(conn)
+    # Триггеры создаются заново, если таблицу вакансий пересоздавали
+    fulltext.install(conn)
+    if created:
+        fulltext.rebuild(conn)
+
+
+def add_vacancy_change_seq(conn: Connection) -> None:
+    """Номер изменения у вакансий; старым строкам - в порядке vacancy_id"""
+    if not _has_table(conn, "vacancies"):
+        return
+    ChangeSequence.__table__.create(conn, checkfirst=True)
+    if "change_seq" not in _columns(conn, "vacancies"):
+        conn.execute(text("ALTER TABLE vacancies ADD COLUMN change_seq BIGINT"))
+    counter = conn.execute(
+        text("SELECT value FROM change_sequence WHERE name = 'vacancies'")
+    ).scalar()
+    if counter is None:
+        counter = conn.execute(text("SELECT COALESCE(MAX(change_seq), 0) FROM vacancies")).scalar()
+        conn.execute(
+            text("INSERT INTO change_sequence (name, value) VALUES ('vacancies', :value)"),
+            {"value": counter},
+        )
+    backfilled = conn.execute(
+        text(
+            "UPDATE vacancies SET change_seq = :base + vacancy_id WHERE change_seq IS NULL"
+        ),
+        {"base": counter},
+    ).rowcount
+    if backfilled:
+        conn.execute(
+            text(
+                "UPDATE change_sequence SET value = "
+                "(SELECT MAX(change_seq) FROM vacancies) WHERE name = 'vacancies'"
+            )
+        )
+        logger.info("Backfilled change_seq for %s vacancies", backfilled)
+
+
+def add_saved_searches(conn: Connection) -> None:
+    """Таблицы сохранённых поисков, входящих и очереди webhook"""
+    if not _has_table(conn, "vacancies"):
+        return
+    for model in (SavedSearch, SavedSearchMatch, SavedSearchDelivery):
+        model.__table__.create(conn, checkfirst=True)
+        for index in model.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def make_saved_search_ids_autoincrement(conn: Connection) -> None:
+    """
+    SQLite без AUTOINCREMENT отдаёт id удалённого поиска следующему, и новый
+    поиск получал бы чужие входящие и доставки. Заодно удаляются входящие и
+    доставки уже удалённых поисков: внешние ключи в SQLite выключены, и
+    ON DELETE CASCADE их не удалял.
+    """
+    if conn.dialect.name != "sqlite" or not _has_table(conn, "saved_searches"):
+        return
+    for model in (SavedSearchMatch, SavedSearchDelivery):
+        orphaned = conn.execute(
+            text(
+                f"DELETE FROM {model.__tablename__} WHERE saved_search_id NOT IN "
+                "(SELECT saved_search_id FROM saved_searches)"
+            )
+        ).rowcount
+        if orphaned:
+            logger.info("Deleted %s rows of removed saved searches from %s", orphaned, model.__tablename__)
+    sql = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'saved_searches'")
+    ).scalar()
+    if "AUTOINCREMENT" not in sql.upper():
+        _rebuild_sqlite_table(conn, SavedSearch.__table__)
+
+
+def add_vacancy_keyset_indexes(conn: Connection) -> None:
+    """Индексы модели, которых ещё нет (keyset-пагинация, лента изменений)"""
+    if not _has_table(conn, "vacancies"):
+        return
+    for index in Vacancy.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+
+# Миграции идемпотентны и выполняются по порядку при каждом старте
+MIGRATIONS: List[Callable[[Connection], None]] = [
+    add_vacancy_external_key,
+    make_skill_names_unique,
+    drop_vacancy_title_unique,
+    add_vacancy_content_hash,
+    add_vacancy_fulltext,
+    add_vacancy_change_seq,
+    add_saved_searches,
+    make_saved_search_ids_autoincrement,
+    add_vacancy_keyset_indexes,
+]
+
+
+def run_migrations(conn: Connection) -> None:
+    """
+    Все миграции - одна транзакция. Драйвер sqlite3 не открывает её перед
+    DDL, и ALTER TABLE фиксировался бы сразу, а заполнение колонок при
+    ошибке откатывалось бы, оставляя схему наполовину обновлённой. Точка
+    сохранения открывает транзакцию и в SQLite; при ошибке engine.begin()
+    откатывает её целиком.
+    """
+    sqlite = conn.dialect.name == "sqlite"
+    if sqlite:
+        conn.exec_driver_sql("SAVEPOINT run_migrations")
+    for migration in MIGRATIONS:
+        migration(conn)
+    if sqlite:
+        conn.exec_driver_sql("RELEASE SAVEPOINT run_migrations")
@@ -1,21 +1,128 @@
 import json
+import logging
+import os
+import tempfile
 from pathlib import Path
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, Dict, List
 
 from app.schemas.polling import PollingSettings
 
+logger = logging.getLogger(__name__)
+
 STATE_PATH = Path(__file__).resolve().parent / "polling_state.json"
+CURSORS_PATH = Path(__file__).resolve().parent / "polling_cursors.json"
 
+# Сколько id последних вакансий хранить в курсоре запроса
+CURSOR_SEEN_IDS = 500
 
-def load_polling_state() -> Dict[str, Any]:
-    if STATE_PATH.exists():
+
+def _read_json(path: Path) -> Any:
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        logger.warning("Polling file %s is corrupted, using defaults: %s", path, exc)
+        return None
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Запись через временный файл и os.replace: файл не останется обрезанным"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+            json.dump(data, tmp, ensure_ascii=False, indent=2)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
         try:
-            return json.loads(STATE_PATH.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
+            os.unlink(tmp_path)
+        except OSError:
             pass
+        raise
+
+
+def load_polling_state() -> Dict[str, Any]:
+    state = _read_json(STATE_PATH)
+    if state is not None:
+        return state
     return PollingSettings().model_dump()
 
 
 def save_polling_state(data: Dict[str, Any]) -> Dict[str, Any]:
-    STATE_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_json(STATE_PATH, data)
     return data
+
+
+def polling_jobs(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Список запросов для планировщика: основной запрос из верхнего уровня
+    настроек (id "default") плюс записи из `queries`.
+    """
+    if not state.get("enabled", True):
+        return []
+    jobs = []
+    if state.get("title"):
+        jobs.append({
+            "id": "default",
+            "title": state["title"],
+            "limit": state.get("limit", 20),
+            "area": state.get("area", 1),
+            "only_with_salary": state.get("only_with_salary", False),
+            "interval_seconds": state.get("interval_seconds"),
+            "priority": state.get("priority", 0),
+            "skip_seen": state.get("skip_seen", False),
+        })
+    for query in state.get("queries") or []:
+        if not query.get("enabled", True) or not query.get("title"):
+            continue
+        job = dict(query)
+        job["id"] = query.get("id") or polling_cursor_key(query)
+        jobs.append(job)
+    return jobs
+
+
+def polling_cursor_key(state: Dict[str, Any]) -> str:
+    """Курсор привязан к параметрам запроса: новый запрос - новый курсор"""
+    return "|".join(
+        str(state.get(field)) for field in ("title", "area", "only_with_salary")
+    )
+
+
+def _load_cursors() -> Dict[str, Any]:
+    return _read_json(CURSORS_PATH) or {}
+
+
+def load_polling_cursor(key: str) -> Dict[str, Any]:
+    """Верхняя граница запроса: последний published_at и id последних вакансий"""
+    return _load_cursors().get(key) or {"published_at": None, "seen_ids": []}
+
+
+def save_polling_cursor(key: str, cursor: Dict[str, Any]) -> Dict[str, Any]:
+    cursors = _load_cursors()
+    cursors[key] = cursor
+    _write_json(CURSORS_PATH, cursors)
+    return cursor
+
+
+def advance_polling_cursor(
+    cursor: Dict[str, Any], vacancies: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Сдвинуть курсор по вакансиям, полученным за цикл"""
+    published_at = (
+        datetime.fromisoformat(cursor["published_at"]) if cursor.get("published_at") else None
+    )
+    new_ids = []
+    for vacancy in vacancies:
+        published = vacancy.get("published_date")
+        if isinstance(published, datetime) and (published_at is None or published > published_at):
+            published_at = published
+        if vacancy.get("external_id"):
+            new_ids.append(vacancy["external_id"])
+    seen_ids = list(dict.fromkeys(new_ids + list(cursor.get("seen_ids") or [])))
+    return {
+        "published_at": published_at.isoformat() if published_at else None,
+        "seen_ids": seen_ids[:CURSOR_SEEN_IDS],
+    }
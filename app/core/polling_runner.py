@@ -1,86 +1,298 @@
 import asyncio
+import random
 import time
 import logging
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
 from app.core.config import settings
-from app.core.database import AsyncSessionLocal
-from app.core.polling import load_polling_state
-from app.crud.vacancy import vacancy_crud
+from app.core.polling import (
+    advance_polling_cursor,
+    load_polling_cursor,
+    load_polling_state,
+    polling_cursor_key,
+    polling_jobs,
+    save_polling_cursor,
+)
+from app.services.ingestion_queue import ingestion_queue
 from app.services.parsers.hh_parser import HHParser
+from app.services.seen_set import seen_set
 
 logger = logging.getLogger(__name__)
 
+# Как часто перечитывать polling_state.json
+STATE_RELOAD_SECONDS = 5
+
+
+async def run_polling_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Один цикл опроса hh.ru по запросу и сохранение новых вакансий"""
+    query = job["title"]
+    limit = job.get("limit", 20)
+    area = job.get("area", 1)
 
-async def polling_loop() -> None:
     logger.info(
-        "Polling loop initialized, interval=%ss", settings.POLLING_INTERVAL_SECONDS
+        "Polling cycle START: job=%s query='%s' limit=%s area=%s",
+        job["id"], query, limit, area,
+    )
+    t0 = time.monotonic()
+
+    # --- Получаем только новые вакансии (после курсора) и сохраняем пачками,
+    # пока следующая пачка грузится ---
+    cursor_key = polling_cursor_key(job)
+    cursor = load_polling_cursor(cursor_key)
+    date_from = (
+        datetime.fromisoformat(cursor["published_at"])
+        if cursor.get("published_at")
+        else None
+    )
+    # Для курсора нужны только id и дата публикации
+    progress: List[Dict[str, Any]] = []
+    totals = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    write_wait = 0.0
+    parser = HHParser()
+    async with parser:
+        batches = parser.iter_batches(
+            search_query=query,
+            limit=limit,
+            area=area,
+            only_with_salary=job.get("only_with_salary", False),
+            light=True,
+            date_from=date_from,
+            known_ids=set(cursor.get("seen_ids") or []),
+            # Отсев по seen-set - по желанию: без него вакансии выдачи
+            # перечитываются и обновляются на месте, если изменились
+            seen=seen_set if job.get("skip_seen") and seen_set.loaded else None,
+        )
+        async with aclosing(batches) as stream:
+            async for batch in stream:
+                t_batch = time.monotonic()
+                progress.extend(
+                    {
+                        "external_id": vacancy_data.get("external_id"),
+                        "published_date": vacancy_data.get("published_date"),
+                    }
+                    for vacancy_data in batch
+                )
+                result = await ingestion_queue.submit(batch)
+                for key in totals:
+                    totals[key] += result[key]
+                write_wait += time.monotonic() - t_batch
+
+    listing = parser.listing_stats
+    logger.info(
+        "Polling hh.ru done: job=%s fetched=%s pages=%s listed=%s known_skipped=%s "
+        "seen_skipped=%s stopped_early=%s date_from=%s",
+        job["id"],
+        len(progress),
+        listing["pages"],
+        listing["items"],
+        listing["skipped_known"],
+        listing["skipped_seen"],
+        listing["stopped_early"] or listing["stopped_no_new"],
+        cursor.get("published_at"),
     )
-    # Первый цикл: небольшая задержка, чтобы сервер успел подняться
-    await asyncio.sleep(5)
 
-    while True:
-        state = load_polling_state()
-        enabled = state.get("enabled", True)
-        query = state.get("title")
+    # Курсор сдвигаем только после полного цикла: выдача идёт от новых к старым
+    save_polling_cursor(cursor_key, advance_polling_cursor(cursor, progress))
 
-        if not enabled or not query:
-            logger.info("Polling skipped: enabled=%s query=%s", enabled, query)
-            await asyncio.sleep(settings.POLLING_INTERVAL_SECONDS)
-            continue
+    t2 = time.monotonic()
+    logger.info(
+        "Polling cycle END: job=%s added=%s updated=%s unchanged=%s skipped=%s "
+        "write_wait=%.1fs total=%.1fs",
+        job["id"],
+        totals["created"],
+        totals["updated"],
+        totals["unchanged"],
+        totals["skipped"],
+        write_wait,
+        t2 - t0,
+    )
+    return {
+        "fetched": len(progress),
+        "added": totals["created"],
+        "updated": totals["updated"],
+        "unchanged": totals["unchanged"],
+        "skipped": totals["skipped"],
+        # Сколько вакансий цикл не стал загружать
+        "listing": {
+            "pages": listing["pages"],
+            "listed": listing["items"],
+            "skipped_known": listing["skipped_known"],
+            "skipped_seen": listing["skipped_seen"],
+            "stopped_early": listing["stopped_early"] or listing["stopped_no_new"],
+        },
+    }
 
-        limit = min(state.get("limit", 20), 20)
-        area = state.get("area", 1)
 
-        logger.info(
-            "Polling cycle START: query='%s' limit=%s area=%s", query, limit, area
-        )
-        t0 = time.monotonic()
+class PollingJob:
+    def __init__(self, config: Dict[str, Any], now: float):
+        self.config = config
+        self.running = False
+        # Первый запуск со случайным сдвигом, чтобы задания не стартовали разом
+        jitter = min(self.interval, settings.POLLING_START_JITTER_SECONDS)
+        self.next_run = now + random.uniform(0, jitter)
+
+        self.runs = 0
+        self.failures = 0
+        self.last_started_at: Optional[str] = None
+        self.last_finished_at: Optional[str] = None
+        self.last_duration: Optional[float] = None
+        self.last_fetched: Optional[int] = None
+        self.last_added: Optional[int] = None
+        self.last_updated: Optional[int] = None
+        self.last_listing: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def id(self) -> str:
+        return self.config["id"]
+
+    @property
+    def interval(self) -> int:
+        return self.config.get("interval_seconds") or settings.POLLING_INTERVAL_SECONDS
+
+    @property
+    def priority(self) -> int:
+        return self.config.get("priority", 0)
 
+    def schedule_next(self, now: float) -> None:
+        # Следующий запуск считается от запланированного времени, а не от конца
+        # цикла, поэтому расписание не "уплывает"; пропущенные слоты не копятся
+        self.next_run += self.interval
+        if self.next_run <= now:
+            missed = int((now - self.next_run) // self.interval) + 1
+            self.next_run += missed * self.interval
+
+    def status(self, now: float) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.config["title"],
+            "area": self.config.get("area"),
+            "interval_seconds": self.interval,
+            "priority": self.priority,
+            "running": self.running,
+            "next_run_in": None if self.running else round(max(self.next_run - now, 0), 1),
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started_at": self.last_started_at,
+            "last_finished_at": self.last_finished_at,
+            "last_duration": self.last_duration,
+            "last_fetched": self.last_fetched,
+            "last_added": self.last_added,
+            "last_updated": self.last_updated,
+            "last_listing": self.last_listing,
+            "last_error": self.last_error,
+        }
+
+
+class PollingScheduler:
+    """
+    Планировщик запросов опроса: у каждого задания свой интервал и
+    приоритет, одновременно выполняется не больше `max_concurrency` заданий.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.jobs: Dict[str, PollingJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._state_loaded_at = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def sync(self, configs: List[Dict[str, Any]], now: float) -> None:
+        """Привести реестр заданий к текущим настройкам"""
+        wanted = {config["id"]: config for config in configs}
+        for job_id in list(self.jobs):
+            if job_id not in wanted and not self.jobs[job_id].running:
+                del self.jobs[job_id]
+        for job_id, config in wanted.items():
+            job = self.jobs.get(job_id)
+            if job is None:
+                self.jobs[job_id] = PollingJob(config, now)
+            else:
+                job.config = config
+
+    async def _run(self, job: PollingJob) -> None:
+        job.running = True
+        job.runs += 1
+        job.last_started_at = datetime.now(timezone.utc).isoformat()
+        t0 = time.monotonic()
         try:
-            # --- Шаг 1: получить список вакансий (только ID/url, без деталей) ---
-            parser = HHParser()
-            async with parser:
-                vacancies = await parser.parse_vacancies(
-                    search_query=query,
-                    limit=limit,
-                    area=area,
-                    only_with_salary=state.get("only_with_salary", False),
-                    light=True,
-                )
-            t1 = time.monotonic()
-            logger.info(
-                "Polling hh.ru done: fetched=%s time=%.1fs", len(vacancies), t1 - t0
+            result = await run_polling_job(job.config)
+            job.last_fetched = result["fetched"]
+            job.last_added = result["added"]
+            job.last_updated = result["updated"]
+            job.last_listing = result["listing"]
+            job.last_error = None
+        except Exception as exc:
+            job.failures += 1
+            job.last_error = repr(exc)
+            logger.exception(
+                "Polling cycle FAILED: job=%s after %.1fs", job.id, time.monotonic() - t0
             )
+        finally:
+            job.running = False
+            job.last_duration = round(time.monotonic() - t0, 3)
+            job.last_finished_at = datetime.now(timezone.utc).isoformat()
+            self._tasks.pop(job.id, None)
+            if self._wakeup is not None:
+                self._wakeup.set()
 
-            # --- Шаг 2: сохранить в БД ---
-            async with AsyncSessionLocal() as db:
-                added = 0
-                skipped = 0
-                for vacancy_data in vacancies:
-                    source_url = vacancy_data.get("source_url")
-                    if not source_url:
-                        continue
-                    existing = await vacancy_crud.get_by_source_url(db, source_url)
-                    if not existing:
-                        await vacancy_crud.create_from_parsed(
-                            db, vacancy_data, commit=False
-                        )
-                        added += 1
-                    else:
-                        skipped += 1
-                await db.commit()
-
-            t2 = time.monotonic()
-            logger.info(
-                "Polling cycle END: added=%s skipped=%s db_time=%.1fs total=%.1fs",
-                added,
-                skipped,
-                t2 - t1,
-                t2 - t0,
-            )
+    def _start_due(self, now: float) -> None:
+        due = [job for job in self.jobs.values() if not job.running and job.next_run <= now]
+        due.sort(key=lambda job: (-job.priority, job.next_run))
+        for job in due:
+            if len(self._tasks) >= self.max_concurrency:
+                break
+            job.schedule_next(now)
+            job.running = True
+            self._tasks[job.id] = asyncio.create_task(self._run(job))
+
+    def _sleep_time(self, now: float) -> float:
+        # Просроченные задания ждут освобождения слота - их будит _wakeup
+        upcoming = [
+            job.next_run for job in self.jobs.values()
+            if not job.running and job.next_run > now
+        ]
+        until_next = min(upcoming) - now if upcoming else STATE_RELOAD_SECONDS
+        return min(until_next, STATE_RELOAD_SECONDS)
 
-        except Exception:
-            logger.exception("Polling cycle FAILED after %.1fs", time.monotonic() - t0)
+    def status(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [job.status(now) for job in self.jobs.values()]
 
-        logger.info("Polling sleeping %ss...", settings.POLLING_INTERVAL_SECONDS)
-        await asyncio.sleep(settings.POLLING_INTERVAL_SECONDS)
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                now = time.monotonic()
+                if now - self._state_loaded_at >= STATE_RELOAD_SECONDS:
+                    self.sync(polling_jobs(load_polling_state()), now)
+                    self._state_loaded_at = now
+                self._start_due(now)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), self._sleep_time(time.monotonic())
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._tasks.values()):
+                task.cancel()
+            if self._tasks:
+                await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+
+polling_scheduler = PollingScheduler(settings.POLLING_MAX_CONCURRENCY)
+
+
+async def polling_loop() -> None:
+    logger.info(
+        "Polling loop initialized, interval=%ss max_concurrency=%s",
+        settings.POLLING_INTERVAL_SECONDS,
+        settings.POLLING_MAX_CONCURRENCY,
+    )
+    # Первый цикл: небольшая задержка, чтобы сервер успел подняться
+    await asyncio.sleep(5)
+    await polling_scheduler.run()
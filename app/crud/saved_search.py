@@ -0,0 +1,109 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, select, update, func
+from sqlalchemy.orm import joinedload
+from typing import Optional, List, Dict, Any
+from app.models.saved_search import SavedSearch, SavedSearchDelivery, SavedSearchMatch
+from app.models.vacancy import Vacancy
+from app.schemas.saved_search import SavedSearchCreate, SavedSearchUpdate
+from app.services.percolator import percolator
+
+
+def _search_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    if data.get("webhook_url") is not None:
+        data["webhook_url"] = str(data["webhook_url"])
+    if data.get("skill_ids") is not None:
+        data["skill_ids"] = sorted(set(data["skill_ids"]))
+    return data
+
+
+class CRUDSavedSearch:
+    async def get(self, db: AsyncSession, user_id: int, saved_search_id: int) -> Optional[SavedSearch]:
+        result = await db.execute(
+            select(SavedSearch).where(
+                SavedSearch.saved_search_id == saved_search_id,
+                SavedSearch.user_id == user_id,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_multi(self, db: AsyncSession, user_id: int) -> List[SavedSearch]:
+        result = await db.execute(
+            select(SavedSearch)
+            .where(SavedSearch.user_id == user_id)
+            .order_by(SavedSearch.saved_search_id)
+        )
+        return result.scalars().all()
+
+    async def count_for_user(self, db: AsyncSession, user_id: int) -> int:
+        result = await db.execute(
+            select(func.count(SavedSearch.saved_search_id)).where(SavedSearch.user_id == user_id)
+        )
+        return result.scalar()
+
+    async def unread_counts(self, db: AsyncSession, saved_search_ids: List[int]) -> Dict[int, int]:
+        if not saved_search_ids:
+            return {}
+        result = await db.execute(
+            select(SavedSearchMatch.saved_search_id, func.count())
+            .where(
+                SavedSearchMatch.saved_search_id.in_(saved_search_ids),
+                SavedSearchMatch.is_read.is_(False),
+            )
+            .group_by(SavedSearchMatch.saved_search_id)
+        )
+        return dict(result.all())
+
+    async def create(self, db: AsyncSession, user_id: int, obj_in: SavedSearchCreate) -> SavedSearch:
+        db_obj = SavedSearch(user_id=user_id, **_search_data(obj_in.model_dump()))
+        db.add(db_obj)
+        await db.flush()
+        percolator.stage(db, db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(self, db: AsyncSession, db_obj: SavedSearch, obj_in: SavedSearchUpdate) -> SavedSearch:
+        for field, value in _search_data(obj_in.model_dump(exclude_unset=True)).items():
+            setattr(db_obj, field, value)
+        await db.flush()
+        percolator.stage(db, db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, db_obj: SavedSearch) -> None:
+        saved_search_id = db_obj.saved_search_id
+        percolator.stage_removal(db, saved_search_id)
+        # Внешние ключи SQLite выключены - ON DELETE CASCADE не сработает
+        for model in (SavedSearchMatch, SavedSearchDelivery):
+            await db.execute(delete(model).where(model.saved_search_id == saved_search_id))
+        await db.delete(db_obj)
+        await db.commit()
+
+    def inbox_query(self, saved_search_id: int, unread_only: bool = False):
+        """Входящие поиска; сортировку и курсор добавляет пагинация"""
+        query = (
+            select(SavedSearchMatch)
+            .options(joinedload(SavedSearchMatch.vacancy).joinedload(Vacancy.company))
+            .where(SavedSearchMatch.saved_search_id == saved_search_id)
+        )
+        if unread_only:
+            query = query.where(SavedSearchMatch.is_read.is_(False))
+        return query
+
+    async def mark_read(
+        self, db: AsyncSession, saved_search_id: int, up_to_seq: Optional[int] = None
+    ) -> int:
+        """Отметить прочитанными входящие (до номера up_to_seq включительно)"""
+        stmt = update(SavedSearchMatch).where(
+            SavedSearchMatch.saved_search_id == saved_search_id,
+            SavedSearchMatch.is_read.is_(False),
+        )
+        if up_to_seq is not None:
+            stmt = stmt.where(SavedSearchMatch.change_seq <= up_to_seq)
+        result = await db.execute(stmt.values(is_read=True))
+        await db.commit()
+        return result.rowcount
+
+
+saved_search_crud = CRUDSavedSearch()
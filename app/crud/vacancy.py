@@ -1,9 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, delete, update, case, func, and_, or_, tuple_
 from sqlalchemy.orm import selectinload, joinedload
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 from datetime import datetime
+import hashlib
+import json
+import logging
 import re
+from app.core import fulltext
+from app.models.change_sequence import ChangeSequence
 from app.models.vacancy import Vacancy
 from app.models.vacancy_skill import VacancySkill
 from app.models.company import Company
@@ -12,17 +17,63 @@ from app.models.work_format import WorkFormat
 from app.models.work_schedule import WorkSchedule
 from app.models.skill import Skill
 from app.schemas.vacancy import VacancyCreate, VacancyFilter
+from app.crud.upsert import upsert_insert
+from app.services.data_version import data_version
+from app.services.reference_cache import reference_cache
+from app.services.skill_index import skill_index
+from app.services.skill_matcher import skill_matcher
+
+logger = logging.getLogger(__name__)
+
+# Размер IN-списков при пакетной загрузке
+IN_CHUNK_SIZE = 500
+
+# Колонки строки списка вакансий (поля VacancyWithCompany)
+LIST_COLUMNS = [
+    Vacancy.vacancy_id,
+    Vacancy.title,
+    Vacancy.description,
+    Vacancy.salary_from,
+    Vacancy.salary_to,
+    Vacancy.currency,
+    Vacancy.location,
+    Vacancy.raw_address,
+    Vacancy.parsed_address,
+    Vacancy.source_url,
+    Vacancy.published_date,
+    Vacancy.is_active,
+    Vacancy.created_at,
+    Vacancy.updated_at,
+    Vacancy.company_id,
+    Vacancy.experience_id,
+    Vacancy.work_format_id,
+    Vacancy.work_schedule_id,
+    Company.name.label("company_name"),
+    Experience.name.label("experience_name"),
+]
+
+
+def _chunks(values: List[Any], size: int = IN_CHUNK_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _sha256(values: List[Any]) -> str:
+    payload = json.dumps(values, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 
 class CRUDVacancy:
     def _build_conditions(self, filter: VacancyFilter):
         conditions = []
 
         if filter.title:
+            matches = fulltext.search_subquery(filter.title)
+            if matches is not None:
+                conditions.append(Vacancy.vacancy_id.in_(select(matches.c.vacancy_id)))
+        if filter.skill_ids:
             conditions.append(
-                or_(
-                    Vacancy.title.ilike(f"%{filter.title}%"),
-                    Vacancy.description.ilike(f"%{filter.title}%"),
-                )
+                skill_index.condition(filter.skill_ids, match_all=filter.skills_mode == "all")
             )
         if filter.company_id:
             conditions.append(Vacancy.company_id == filter.company_id)
@@ -88,11 +139,12 @@ class CRUDVacancy:
         vacancy_data = obj_in.model_dump(exclude={"skills"})
         if vacancy_data.get("source_url") is not None:
             vacancy_data["source_url"] = str(vacancy_data["source_url"])
-        db_obj = Vacancy(**vacancy_data)
+        db_obj = Vacancy(**vacancy_data, change_seq=await self._reserve_change_seq(db, 1))
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        data_version.mark_changed(db)
 
+        # Навыки в той же транзакции: перколятор видит вакансию сразу с ними
         if obj_in.skills:
             for skill_data in obj_in.skills:
                 vacancy_skill = VacancySkill(
@@ -101,7 +153,10 @@ class CRUDVacancy:
                     is_mandatory=skill_data.in_mandatory
                 )
                 db.add(vacancy_skill)
-            await db.commit()
+            skill_index.stage(
+                db, added=[(skill.skill_id, db_obj.vacancy_id) for skill in obj_in.skills]
+            )
+        await db.commit()
 
         # Возвращаем объект с подгруженными связями для корректного ответа API
         return await self.get(db, vacancy_id=db_obj.vacancy_id)
@@ -112,64 +167,27 @@ class CRUDVacancy:
         data: Dict[str, Any],
         commit: bool = True,
     ) -> Vacancy:
-        company_name = (data.get("company") or {}).get("name") or "Не указано"
-        company_website = (data.get("company") or {}).get("website")
-
-        company = await self._get_or_create_company(
-            db, name=company_name, website=company_website
-        )
-        experience = await self._get_or_create_experience(db, data.get("experience"))
-        work_format = await self._get_or_create_work_format(db, data.get("work_format"))
-        work_schedule = await self._get_or_create_work_schedule(db, data.get("work_schedule"))
-
-        salary = data.get("salary") or {}
-        location = data.get("location") or "Не указано"
-        raw_address = data.get("raw_address") or location
-
-        title = data.get("title") or "Без названия"
-        title = await self._ensure_unique_title(db, title, company_name)
-
-        published_date = data.get("published_date")
-        if isinstance(published_date, datetime):
-            parsed_date = published_date
-        elif isinstance(published_date, str):
-            parsed_date = self._safe_parse_datetime(published_date)
-        else:
-            parsed_date = None
-
+        refs = await self._resolve_references(db, [data])
         vacancy = Vacancy(
-            title=title,
-            description=data.get("description") or "",
-            salary_from=salary.get("from"),
-            salary_to=salary.get("to"),
-            currency=salary.get("currency"),
-            location=location,
-            raw_address=raw_address,
-            parsed_address=data.get("parsed_address"),
-            source_url=data.get("source_url"),
-            published_date=parsed_date,
-            is_active=True,
-            company_id=company.company_id,
-            experience_id=experience.experience_id,
-            work_format_id=work_format.work_format_id,
-            work_schedule_id=work_schedule.work_schedule_id,
+            **self._vacancy_row(data, refs),
+            change_seq=await self._reserve_change_seq(db, 1),
         )
 
         db.add(vacancy)
         await db.flush()
+        data_version.mark_changed(db)
 
-        skill_names = data.get("skills") or []
-        for skill_name in skill_names:
+        for skill_name in dict.fromkeys(data.get("skills") or []):
             if not skill_name:
                 continue
-            skill = await self._get_or_create_skill(db, skill_name)
             db.add(
                 VacancySkill(
                     vacancy_id=vacancy.vacancy_id,
-                    skill_id=skill.skill_id,
+                    skill_id=refs["skills"][skill_name],
                     is_mandatory=True,
                 )
             )
+            skill_index.stage(db, added=[(refs["skills"][skill_name], vacancy.vacancy_id)])
 
         if commit:
             await db.commit()
@@ -177,82 +195,437 @@ class CRUDVacancy:
 
         return vacancy
 
-    async def _get_or_create_company(
-        self, db: AsyncSession, name: str, website: Optional[str]
-    ) -> Company:
-        result = await db.execute(select(Company).where(Company.name == name))
-        company = result.scalar_one_or_none()
-        if company:
-            return company
-        company = Company(
-            name=name,
-            website=website,
-            description="Импортировано из hh.ru",
+    async def ingest_batch(
+        self, db: AsyncSession, items: List[Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """
+        Пакетная загрузка распарсенных вакансий без commit.
+
+        Справочники разрешаются несколькими запросами на всю пачку, вакансии
+        записываются многострочным INSERT ... ON CONFLICT DO UPDATE, который
+        срабатывает только при изменившемся хэше содержимого: неизменённые
+        вакансии не переписываются, изменённые обновляются на месте.
+        """
+        stats = {"received": len(items), "created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+
+        by_key: Dict[Tuple, Dict[str, Any]] = {}
+        seen_urls = set()
+        for data in items:
+            source_url = data.get("source_url")
+            key = self._external_key(data)
+            if not source_url or source_url in seen_urls or key in by_key:
+                stats["skipped"] += 1
+                continue
+            seen_urls.add(source_url)
+            by_key[key] = data
+        if not by_key:
+            return stats
+
+        unique_items = list(by_key.values())
+        refs = await self._resolve_references(db, unique_items)
+
+        # Номера изменений резервируются на всю пачку; у неизменённых вакансий
+        # номер не записывается - в последовательности остаются пропуски
+        next_seq = await self._reserve_change_seq(db, len(unique_items))
+        keyed, unkeyed = [], []
+        for data in unique_items:
+            row = self._vacancy_row(data, refs)
+            row["change_seq"] = next_seq
+            next_seq += 1
+            (keyed if row["external_id"] else unkeyed).append(row)
+
+        # Ключ вакансии -> (id, создана ли)
+        written: Dict[Tuple, Tuple[int, bool]] = {}
+        taken = await self._claim_source_urls(db, keyed) if keyed else set()
+        if taken:
+            keyed = [row for row in keyed if row["source_url"] not in taken]
+        if keyed:
+            written.update(await self._upsert_vacancies(
+                db, keyed, ["external_source", "external_id"]
+            ))
+        if unkeyed:
+            written.update(await self._upsert_vacancies(db, unkeyed, ["source_url"]))
+
+        links = []
+        replaced = []
+        for key, data in by_key.items():
+            if key not in written:
+                stats["skipped" if data["source_url"] in taken else "unchanged"] += 1
+                continue
+            vacancy_id, created = written[key]
+            stats["created" if created else "updated"] += 1
+            # Навыки из сниппета выдачи не заменяют навыки из полного описания
+            if not created:
+                if not data.get("detailed"):
+                    continue
+                replaced.append(vacancy_id)
+            for name in dict.fromkeys(data.get("skills") or []):
+                if name:
+                    links.append({
+                        "vacancy_id": vacancy_id,
+                        "skill_id": refs["skills"][name],
+                        "is_mandatory": True,
+                    })
+        removed = []
+        for chunk in _chunks(replaced):
+            result = await db.execute(
+                delete(VacancySkill)
+                .where(VacancySkill.vacancy_id.in_(chunk))
+                .returning(VacancySkill.skill_id, VacancySkill.vacancy_id)
+            )
+            removed.extend(result.all())
+        if links:
+            await db.execute(
+                upsert_insert(db, VacancySkill).on_conflict_do_nothing(
+                    index_elements=["vacancy_id", "skill_id"]
+                ),
+                links,
+            )
+        skill_index.stage(
+            db,
+            added=[(link["skill_id"], link["vacancy_id"]) for link in links],
+            removed=removed,
         )
-        db.add(company)
-        await db.flush()
-        return company
-
-    async def _get_or_create_experience(
-        self, db: AsyncSession, name: Optional[str]
-    ) -> Experience:
-        normalized = self._normalize_experience_name(name)
-        result = await db.execute(select(Experience).where(Experience.name == normalized))
-        experience = result.scalar_one_or_none()
-        if experience:
-            return experience
-        experience = Experience(name=normalized, order=0)
-        db.add(experience)
-        await db.flush()
-        return experience
-
-    async def _get_or_create_work_format(
-        self, db: AsyncSession, name: Optional[str]
-    ) -> WorkFormat:
-        normalized = self._normalize_work_format_name(name)
-        result = await db.execute(select(WorkFormat).where(WorkFormat.name == normalized))
-        work_format = result.scalar_one_or_none()
-        if work_format:
-            return work_format
-        work_format = WorkFormat(name=normalized)
-        db.add(work_format)
-        await db.flush()
-        return work_format
-
-    async def _get_or_create_work_schedule(
-        self, db: AsyncSession, name: Optional[str]
-    ) -> WorkSchedule:
-        normalized = self._normalize_work_schedule_name(name)
-        result = await db.execute(select(WorkSchedule).where(WorkSchedule.name == normalized))
-        work_schedule = result.scalar_one_or_none()
-        if work_schedule:
-            return work_schedule
-        work_schedule = WorkSchedule(name=normalized)
-        db.add(work_schedule)
-        await db.flush()
-        return work_schedule
-
-    async def _get_or_create_skill(self, db: AsyncSession, name: str) -> Skill:
-        result = await db.execute(select(Skill).where(Skill.name == name))
-        skill = result.scalar_one_or_none()
-        if skill:
-            return skill
-        skill = Skill(name=name, category=None)
-        db.add(skill)
-        await db.flush()
-        return skill
-
-    async def _ensure_unique_title(
-        self, db: AsyncSession, title: str, company_name: str
-    ) -> str:
-        result = await db.execute(select(Vacancy.vacancy_id).where(Vacancy.title == title))
-        if not result.scalar_one_or_none():
-            return title
-        candidate = f"{title} ({company_name})"
-        result = await db.execute(select(Vacancy.vacancy_id).where(Vacancy.title == candidate))
-        if not result.scalar_one_or_none():
-            return candidate
-        return f"{title} ({company_name}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')})"
+        if stats["created"] or stats["updated"]:
+            data_version.mark_changed(db)
+        return stats
+
+    async def _reserve_change_seq(self, db: AsyncSession, count: int) -> int:
+        """
+        Первый из `count` зарезервированных номеров изменений. Строка
+        счётчика блокируется до конца транзакции, поэтому номера
+        становятся видны читателям в порядке возрастания.
+        """
+        stmt = upsert_insert(db, ChangeSequence).values(name="vacancies", value=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"value": ChangeSequence.value + stmt.excluded.value},
+        ).returning(ChangeSequence.value)
+        last = (await db.execute(stmt)).scalar_one()
+        return last - count + 1
+
+    async def current_change_seq(self, db: AsyncSession) -> int:
+        """
+        Номер последнего записанного изменения - версия данных, общая для
+        всех процессов. Берётся по индексу из самих вакансий, а не из
+        счётчика: номера неизменённых вакансий резервируются, но не пишутся.
+        """
+        result = await db.execute(select(func.max(Vacancy.change_seq)))
+        return result.scalar() or 0
+
+    async def changes(
+        self,
+        db: AsyncSession,
+        after: Optional[int],
+        filter: VacancyFilter,
+        limit: int,
+    ) -> Dict[str, Any]:
+        """
+        Изменения вакансий с номером больше `after` в порядке номеров.
+        Без `after` возвращается только текущий курсор - с него клиент
+        начинает следить за новыми изменениями.
+        """
+        # Максимум берём до выборки: изменения после него не будут пропущены
+        latest = (await db.execute(select(func.max(Vacancy.change_seq)))).scalar() or 0
+        if after is None:
+            return {"changes": [], "cursor": latest, "has_more": False}
+        await skill_index.ensure_current(db, filter.skill_ids)
+
+        query = (
+            select(
+                Vacancy.vacancy_id,
+                Vacancy.change_seq,
+                Vacancy.updated_at,
+                Vacancy.title,
+                Company.name,
+                Vacancy.salary_from,
+                Vacancy.salary_to,
+                Vacancy.currency,
+                Vacancy.location,
+                Vacancy.published_date,
+                Vacancy.source_url,
+            )
+            .outerjoin(Company, Company.company_id == Vacancy.company_id)
+            .where(Vacancy.change_seq > after)
+            .order_by(Vacancy.change_seq)
+            .limit(limit + 1)
+        )
+        conditions = self._build_conditions(filter)
+        if conditions:
+            query = query.where(*conditions)
+        rows = (await db.execute(query)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        changes = [
+            {
+                "id": row.vacancy_id,
+                "seq": row.change_seq,
+                # updated_at пуст, пока вакансию не переписывали
+                "op": "created" if row.updated_at is None else "updated",
+                "title": row.title,
+                "company": row.name,
+                "salary_from": row.salary_from,
+                "salary_to": row.salary_to,
+                "currency": row.currency,
+                "location": row.location,
+                "published_date": row.published_date,
+                "url": row.source_url,
+            }
+            for row in rows
+        ]
+        if has_more:
+            cursor = changes[-1]["seq"]
+        else:
+            cursor = max(latest, after, changes[-1]["seq"] if changes else 0)
+        return {"changes": changes, "cursor": cursor, "has_more": has_more}
+
+    def _external_key(self, data: Dict[str, Any]) -> Tuple:
+        if data.get("external_id"):
+            return (data.get("external_source"), str(data["external_id"]))
+        return (None, data.get("source_url"))
+
+    def _vacancy_row(
+        self, data: Dict[str, Any], refs: Dict[str, Dict[str, int]]
+    ) -> Dict[str, Any]:
+        salary = data.get("salary") or {}
+        location = data.get("location") or "Не указано"
+        row = {
+            "title": data.get("title") or "Без названия",
+            "description": data.get("description") or "",
+            "salary_from": salary.get("from"),
+            "salary_to": salary.get("to"),
+            "currency": salary.get("currency"),
+            "location": location,
+            "raw_address": data.get("raw_address") or location,
+            "parsed_address": data.get("parsed_address"),
+            "source_url": data.get("source_url"),
+            "external_source": data.get("external_source") if data.get("external_id") else None,
+            "external_id": str(data["external_id"]) if data.get("external_id") else None,
+            "published_date": self._parsed_date(data.get("published_date")),
+            "is_active": True,
+            **self._reference_ids(data, refs),
+        }
+        row["content_hash"], row["description_hash"] = self._content_hashes(data, row)
+        return row
+
+    def _content_hashes(
+        self, data: Dict[str, Any], row: Dict[str, Any]
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Хэш полей выдачи и отдельно хэш полного описания с навыками. Выдача
+        hh.ru даёт только сниппет, поэтому описание хэшируется лишь для
+        вакансий, загруженных с деталями.
+        """
+        listing = [
+            row["title"],
+            row["salary_from"],
+            row["salary_to"],
+            row["currency"],
+            row["location"],
+            row["raw_address"],
+            (data.get("company") or {}).get("name") or "Не указано",
+            self._normalize_experience_name(data.get("experience")),
+            self._normalize_work_format_name(data.get("work_format")),
+            self._normalize_work_schedule_name(data.get("work_schedule")),
+            row["published_date"].isoformat() if row["published_date"] else None,
+        ]
+        content_hash = _sha256(listing)
+        if not data.get("detailed"):
+            return content_hash, None
+        skills = sorted({name for name in data.get("skills") or [] if name})
+        return content_hash, _sha256([row["description"], skills])
+
+    async def _claim_source_urls(
+        self, db: AsyncSession, rows: List[Dict[str, Any]]
+    ) -> set:
+        """
+        Вакансии с внешним ключом, чей source_url уже записан без ключа
+        (сохранены до появления ключа), получают ключ из пачки - тогда upsert
+        по ключу обновит их, а не упадёт на уникальности source_url и не
+        откатит всю пачку. Возвращает source_url, занятые вакансией с другим
+        ключом: такие строки пачка пропускает.
+        """
+        by_url = {row["source_url"]: row for row in rows}
+        # Ключи, которые уже есть в БД: такую вакансию upsert обновит по ключу
+        existing = set()
+        external_key = tuple_(Vacancy.external_source, Vacancy.external_id)
+        for chunk in _chunks([(row["external_source"], row["external_id"]) for row in rows]):
+            result = await db.execute(
+                select(Vacancy.external_source, Vacancy.external_id).where(external_key.in_(chunk))
+            )
+            existing.update(result.all())
+        claims = []
+        taken = set()
+        for chunk in _chunks(list(by_url)):
+            result = await db.execute(
+                select(Vacancy.vacancy_id, Vacancy.source_url, Vacancy.external_source, Vacancy.external_id)
+                .where(Vacancy.source_url.in_(chunk))
+            )
+            for vacancy_id, source_url, external_source, external_id in result:
+                row = by_url[source_url]
+                key = (row["external_source"], row["external_id"])
+                if key in existing:
+                    continue
+                if external_id is None:
+                    claims.append({
+                        "vacancy_id": vacancy_id,
+                        "external_source": row["external_source"],
+                        "external_id": row["external_id"],
+                    })
+                elif (external_source, external_id) != key:
+                    taken.add(source_url)
+        if claims:
+            await db.execute(update(Vacancy), claims)
+        if taken:
+            logger.warning("Skipped %s vacancies: source_url belongs to another external id", len(taken))
+        return taken
+
+    async def _upsert_vacancies(
+        self, db: AsyncSession, rows: List[Dict[str, Any]], index_elements: List[str]
+    ) -> Dict[Tuple, Tuple[int, bool]]:
+        """
+        Вставка или обновление по ключу; строка возвращается, только если
+        она новая или её хэш изменился. Новые строки отличаются пустым
+        updated_at.
+        """
+        stmt = upsert_insert(db, Vacancy)
+        excluded = stmt.excluded
+        set_ = {
+            column: excluded[column]
+            for column in (
+                "title", "salary_from", "salary_to", "currency", "location",
+                "raw_address", "published_date", "is_active", "company_id",
+                "experience_id", "work_format_id", "work_schedule_id", "content_hash",
+                "change_seq",
+            )
+        }
+        # Описание из сниппета выдачи не затирает полное описание
+        set_["description"] = case(
+            (excluded.description_hash.is_(None), Vacancy.description),
+            else_=excluded.description,
+        )
+        set_["description_hash"] = func.coalesce(excluded.description_hash, Vacancy.description_hash)
+        set_["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_=set_,
+            where=or_(
+                Vacancy.content_hash.is_distinct_from(excluded.content_hash),
+                and_(
+                    excluded.description_hash.is_not(None),
+                    Vacancy.description_hash.is_distinct_from(excluded.description_hash),
+                ),
+                Vacancy.is_active.is_not(True),
+            ),
+        ).returning(
+            Vacancy.vacancy_id,
+            Vacancy.external_source,
+            Vacancy.external_id,
+            Vacancy.source_url,
+            Vacancy.updated_at,
+        )
+        written: Dict[Tuple, Tuple[int, bool]] = {}
+        result = await db.execute(stmt, rows)
+        for vacancy_id, external_source, external_id, source_url, updated_at in result:
+            key = (external_source, external_id) if external_id else (None, source_url)
+            written[key] = (vacancy_id, updated_at is None)
+        return written
+
+    async def _resolve_references(
+        self, db: AsyncSession, items: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, int]]:
+        """Справочники для пачки вакансий: таблица -> {name: id}"""
+        companies: Dict[str, Dict[str, Any]] = {}
+        for data in items:
+            company = data.get("company") or {}
+            name = company.get("name") or "Не указано"
+            companies.setdefault(name, {
+                "name": name,
+                "website": company.get("website"),
+                "description": "Импортировано из hh.ru",
+            })
+        experiences = {self._normalize_experience_name(d.get("experience")) for d in items}
+        work_formats = {self._normalize_work_format_name(d.get("work_format")) for d in items}
+        work_schedules = {self._normalize_work_schedule_name(d.get("work_schedule")) for d in items}
+        skills = {
+            name: {"name": name, "category": None}
+            for data in items
+            for name in (data.get("skills") or [])
+            if name
+        }
+
+        refs = {
+            "companies": await self._resolve_names(
+                db, Company, Company.company_id, Company.name, companies
+            ),
+            "experiences": await self._resolve_names(
+                db, Experience, Experience.experience_id, Experience.name,
+                {name: {"name": name, "order": 0} for name in experiences},
+            ),
+            "work_formats": await self._resolve_names(
+                db, WorkFormat, WorkFormat.work_format_id, WorkFormat.name,
+                {name: {"name": name} for name in work_formats},
+            ),
+            "work_schedules": await self._resolve_names(
+                db, WorkSchedule, WorkSchedule.work_schedule_id, WorkSchedule.name,
+                {name: {"name": name} for name in work_schedules},
+            ),
+            "skills": await self._resolve_names(
+                db, Skill, Skill.skill_id, Skill.name, skills
+            ),
+        }
+        skill_matcher.add_many(skills)
+        return refs
+
+    def _reference_ids(
+        self, data: Dict[str, Any], refs: Dict[str, Dict[str, int]]
+    ) -> Dict[str, int]:
+        company_name = (data.get("company") or {}).get("name") or "Не указано"
+        return {
+            "company_id": refs["companies"][company_name],
+            "experience_id": refs["experiences"][self._normalize_experience_name(data.get("experience"))],
+            "work_format_id": refs["work_formats"][self._normalize_work_format_name(data.get("work_format"))],
+            "work_schedule_id": refs["work_schedules"][self._normalize_work_schedule_name(data.get("work_schedule"))],
+        }
+
+    async def _resolve_names(
+        self,
+        db: AsyncSession,
+        model,
+        id_column,
+        name_column,
+        rows: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, int]:
+        """
+        name -> id для справочника: сначала кэш, промахи - одним upsert.
+        ON CONFLICT DO UPDATE с тем же именем нужен, чтобы RETURNING вернул
+        id и уже существующих строк; параллельная вставка не приводит к
+        IntegrityError.
+        """
+        table = model.__tablename__
+        ids = reference_cache.lookup(db, table, rows)
+        missing = [name for name in rows if name not in ids]
+        if not missing:
+            return ids
+        stmt = upsert_insert(db, model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[name_column.key],
+            set_={name_column.key: stmt.excluded[name_column.key]},
+        ).returning(id_column, name_column)
+        found: Dict[str, int] = {}
+        for chunk in _chunks(missing):
+            result = await db.execute(stmt, [rows[name] for name in chunk])
+            found.update({name: row_id for row_id, name in result})
+        ids.update(found)
+        reference_cache.remember(db, table, found)
+        return ids
+
+    def _parsed_date(self, value: Any) -> Optional[datetime]:
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            return self._safe_parse_datetime(value)
+        return None
 
     def _normalize_work_format_name(self, name: Optional[str]) -> str:
         if not name:
@@ -306,7 +679,8 @@ class CRUDVacancy:
         except ValueError:
             return None
     
-    async def filter(self, db: AsyncSession, filter: VacancyFilter) -> List[Vacancy]:
+    def filter_query(self, filter: VacancyFilter):
+        """Запрос по фильтрам без сортировки и пагинации"""
         query = select(Vacancy).options(
             selectinload(Vacancy.company),
             selectinload(Vacancy.experience)
@@ -315,9 +689,43 @@ class CRUDVacancy:
 
         if conditions:
             query = query.where(and_(*conditions))
+        return query
+
+    def list_rows_query(self, *conditions):
+        """
+        Плоские строки для списков вакансий: вакансия, компания и опыт одним
+        запросом без ORM-объектов (см. app.api.serializers)
+        """
+        return (
+            select(*LIST_COLUMNS)
+            .select_from(Vacancy)
+            .outerjoin(Company, Company.company_id == Vacancy.company_id)
+            .outerjoin(Experience, Experience.experience_id == Vacancy.experience_id)
+            .where(*conditions)
+        )
+
+    def filter_rows_query(self, filter: VacancyFilter):
+        """Как filter_query, но строками для списков"""
+        return self.list_rows_query(*self._build_conditions(filter))
+
+    async def count(self, db: AsyncSession, filter: VacancyFilter) -> int:
+        await skill_index.ensure_current(db, filter.skill_ids)
+        query = select(func.count()).select_from(Vacancy)
+        conditions = self._build_conditions(filter)
+        if conditions:
+            query = query.where(*conditions)
+        result = await db.execute(query)
+        return result.scalar() or 0
 
+    async def filter(self, db: AsyncSession, filter: VacancyFilter) -> List[Vacancy]:
+        await skill_index.ensure_current(db, filter.skill_ids)
         # Пагинация
-        query = query.offset(filter.offset).limit(filter.limit)
+        query = (
+            self.filter_query(filter)
+            .order_by(Vacancy.published_date.desc(), Vacancy.vacancy_id.desc())
+            .offset(filter.offset)
+            .limit(filter.limit)
+        )
 
         result = await db.execute(query)
         return result.scalars().all()
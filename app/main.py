@@ -10,8 +10,17 @@ from app.core.middleware import setup_middleware
 from app.core.exceptions import setup_exception_handlers
 from app.api.v1.api import api_router
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, AsyncSessionLocal
+from app.core.http_client import http_client
+from app.core.migrations import run_migrations
 from app.core.polling_runner import polling_loop
+from app.services.ingestion_queue import ingestion_queue
+from app.services.percolator import percolator
+from app.services.reference_cache import reference_cache
+from app.services.seen_set import seen_set
+from app.services.skill_index import skill_index
+from app.services.skill_matcher import skill_matcher
+from app.services.webhook_dispatcher import webhook_dispatcher
 import logging
 
 
@@ -35,6 +44,21 @@ async def lifespan(app: FastAPI):
             await conn.run_sync(Base.metadata.create_all)
         logger.info("Database created successfuly")
 
+    async with engine.begin() as conn:
+        await conn.run_sync(run_migrations)
+
+    async with AsyncSessionLocal() as db:
+        await skill_matcher.load(db)
+        await reference_cache.warm(db)
+        await seen_set.rebuild(db)
+        await skill_index.load(db)
+        await percolator.load(db)
+
+    await http_client.start()
+    await ingestion_queue.start()
+    percolator.on_matches = webhook_dispatcher.wake
+    await percolator.start()
+    await webhook_dispatcher.start()
     polling_task = asyncio.create_task(polling_loop())
     try:
         yield
@@ -42,6 +66,10 @@ async def lifespan(app: FastAPI):
         polling_task.cancel()
         with suppress(asyncio.CancelledError):
             await polling_task
+        await ingestion_queue.stop()
+        await percolator.stop()
+        await webhook_dispatcher.stop()
+        await http_client.close()
 
 
     logger.info("Stutting down app...")
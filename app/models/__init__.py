@@ -6,4 +6,6 @@ from .work_format import WorkFormat
 from .work_schedule import WorkSchedule
 from .vacancy_skill import VacancySkill
 from .user import User
-from .favorite_vacancy import FavoriteVacancy
\ No newline at end of file
+from .favorite_vacancy import FavoriteVacancy
+from .change_sequence import ChangeSequence
+from .saved_search import SavedSearch, SavedSearchMatch, SavedSearchDelivery
\ No newline at end of file
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, BigInteger
+from ..core.database import Base
+
+class ChangeSequence(Base):
+    """Счётчик последовательности изменений (одна строка на поток изменений)"""
+    __tablename__ = "change_sequence"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,73 @@
+from sqlalchemy import (
+    JSON, BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, Numeric,
+    PrimaryKeyConstraint, String,
+)
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class SavedSearch(Base):
+    """Сохранённый поиск пользователя: поля VacancyFilter и навыки"""
+    __tablename__ = "saved_searches"
+
+    saved_search_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+
+    title = Column(String(255))
+    company_id = Column(Integer, ForeignKey("companies.company_id", ondelete="CASCADE"))
+    experience_id = Column(Integer, ForeignKey("experiences.experience_id"))
+    work_format_id = Column(Integer, ForeignKey("work_formats.work_format_id"))
+    work_schedule_id = Column(Integer, ForeignKey("work_schedules.work_schedule_id"))
+    location = Column(String(255))
+    min_salary = Column(Numeric(10, 2))
+    max_salary = Column(Numeric(10, 2))
+    currency = Column(String(10))
+    skill_ids = Column(JSON)
+    skills_mode = Column(String(3), nullable=False, default="all")
+
+    # Совпадения отправляются пачками POST-запросом на этот адрес
+    webhook_url = Column(String(500))
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # id удалённого поиска не переиспользуется: входящие и webhook не достанутся другому
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    user = relationship("User", back_populates="saved_searches")
+
+
+class SavedSearchMatch(Base):
+    """Входящие сохранённого поиска: вакансии, подошедшие при загрузке"""
+    __tablename__ = "saved_search_matches"
+
+    saved_search_id = Column(Integer, ForeignKey("saved_searches.saved_search_id", ondelete="CASCADE"))
+    vacancy_id = Column(Integer, ForeignKey("vacancies.vacancy_id", ondelete="CASCADE"))
+    # Номер изменения вакансии, на котором она подошла (порядок входящих)
+    change_seq = Column(BigInteger, nullable=False)
+    is_read = Column(Boolean, default=False, nullable=False)
+    matched_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        PrimaryKeyConstraint("saved_search_id", "vacancy_id"),
+        Index("ix_saved_search_matches_inbox", "saved_search_id", "change_seq"),
+    )
+
+    vacancy = relationship("Vacancy")
+
+
+class SavedSearchDelivery(Base):
+    """Очередь доставки совпадений на webhook; строка удаляется после доставки"""
+    __tablename__ = "saved_search_deliveries"
+
+    delivery_id = Column(Integer, primary_key=True)
+    saved_search_id = Column(Integer, ForeignKey("saved_searches.saved_search_id", ondelete="CASCADE"), nullable=False)
+    vacancy_id = Column(Integer, ForeignKey("vacancies.vacancy_id", ondelete="CASCADE"), nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_saved_search_deliveries_due", "next_attempt_at", "saved_search_id"),
+    )
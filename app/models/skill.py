@@ -6,7 +6,7 @@ class Skill(Base):
     __tablename__ = "skills"
 
     skill_id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), nullable=False, index=True)
+    name = Column(String(100), nullable=False, unique=True, index=True)
     category = Column(String(50), nullable=True, index=True)
 
     vacancies = relationship("VacancySkill",
@@ -14,4 +14,5 @@ class User(Base):
     is_superuser = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    favorite_vacancies = relationship("FavoriteVacancy", back_populates="user")
\ No newline at end of file
+    favorite_vacancies = relationship("FavoriteVacancy", back_populates="user")
+    saved_searches = relationship("SavedSearch", back_populates="user")
\ No newline at end of file
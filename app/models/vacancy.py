@@ -1,5 +1,5 @@
-from sqlalchemy import (Column, Integer, String, Text,
-Numeric, Boolean, DateTime, ForeignKey)
+from sqlalchemy import (Column, Integer, BigInteger, String, Text,
+Numeric, Boolean, DateTime, ForeignKey, Index)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -8,7 +8,7 @@ class Vacancy(Base):
     __tablename__ = "vacancies"
 
     vacancy_id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, unique=True, nullable=False)
+    title = Column(String, nullable=False)
 
     company_id = Column(Integer, ForeignKey("companies.company_id", ondelete="CASCADE"))
     experience_id = Column(Integer, ForeignKey("experiences.experience_id"))
@@ -23,11 +23,26 @@ class Vacancy(Base):
     raw_address = Column(Text, nullable=False)
     parsed_address = Column(String(500), nullable=True)
     source_url = Column(String(500), nullable=False, unique=True)
+    # Источник и id вакансии в нём (например, "hh" и id hh.ru) - ключ upsert
+    external_source = Column(String(20), nullable=True)
+    external_id = Column(String(64), nullable=True)
+    # sha256 полей выдачи и полного описания с навыками - для обновления на месте
+    content_hash = Column(String(64), nullable=True)
+    description_hash = Column(String(64), nullable=True)
     published_date = Column(DateTime(timezone=True), nullable=True)
+    # Номер последнего изменения: растёт с каждой записью вакансии (ленты изменений)
+    change_seq = Column(BigInteger, nullable=True, index=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("uq_vacancies_external", "external_source", "external_id", unique=True),
+        # Keyset-пагинация по (published_date, vacancy_id)
+        Index("ix_vacancies_active_published", "is_active", "published_date", "vacancy_id"),
+        Index("ix_vacancies_company_published", "company_id", "published_date", "vacancy_id"),
+    )
+
     company = relationship("Company", back_populates="vacancies")
     experience = relationship("Experience", back_populates="vacancies")
     work_format = relationship("WorkFormat", back_populates="vacancies")
@@ -4,4 +4,5 @@ from .experience import *
 from .skill import *
 from .vacancy import *
 from .work_format import *
-from .work_schedule import *
\ No newline at end of file
+from .work_schedule import *
+from .saved_search import *
\ No newline at end of file
@@ -1,5 +1,18 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
+
+
+class PollingQuery(BaseModel):
+    id: Optional[str] = None
+    enabled: bool = True
+    title: str
+    limit: int = Field(20, ge=1, le=200)
+    area: int = 1
+    only_with_salary: bool = False
+    interval_seconds: Optional[int] = Field(None, ge=5)
+    priority: int = 0
+    # Не перечитывать вакансии, которые уже есть в seen-set
+    skip_seen: bool = False
 
 
 class PollingSettings(BaseModel):
@@ -11,3 +24,37 @@ class PollingSettings(BaseModel):
     limit: int = Field(20, ge=1, le=200)
     area: int = 1
     only_with_salary: bool = False
+    interval_seconds: Optional[int] = Field(None, ge=5)
+    priority: int = 0
+    # Не перечитывать вакансии, которые уже есть в seen-set
+    skip_seen: bool = False
+    queries: List[PollingQuery] = Field(default_factory=list)
+
+
+class PollingListingStats(BaseModel):
+    pages: int
+    listed: int
+    skipped_known: int
+    skipped_seen: int
+    stopped_early: bool
+
+
+class PollingJobStatus(BaseModel):
+    id: str
+    title: str
+    area: Optional[int] = None
+    interval_seconds: int
+    priority: int
+    running: bool
+    next_run_in: Optional[float] = None
+    runs: int
+    failures: int
+    last_started_at: Optional[str] = None
+    last_finished_at: Optional[str] = None
+    last_duration: Optional[float] = None
+    last_fetched: Optional[int] = None
+    last_added: Optional[int] = None
+    last_updated: Optional[int] = None
+    # Что цикл не стал загружать: отсечено по курсору и по seen-set
+    last_listing: Optional[PollingListingStats] = None
+    last_error: Optional[str] = None
@@ -0,0 +1,63 @@
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Literal, Optional, List
+from datetime import datetime
+from .base import BaseSchema, TimestampMixin, Link
+
+# Условия сохранённого поиска - поля VacancyFilter без пагинации
+class SavedSearchBase(BaseModel):
+    name: str = Field(..., max_length=100)
+    title: Optional[str] = Field(None, max_length=255)
+    company_id: Optional[int] = None
+    experience_id: Optional[int] = None
+    work_format_id: Optional[int] = None
+    work_schedule_id: Optional[int] = None
+    location: Optional[str] = Field(None, max_length=255)
+    min_salary: Optional[float] = None
+    max_salary: Optional[float] = None
+    currency: Optional[str] = Field(None, max_length=10)
+    skill_ids: Optional[List[int]] = None
+    skills_mode: Literal["all", "any"] = "all"
+    webhook_url: Optional[HttpUrl] = None
+    is_active: bool = True
+
+class SavedSearchCreate(SavedSearchBase):
+    pass
+
+class SavedSearchUpdate(BaseModel):
+    name: Optional[str] = Field(None, max_length=100)
+    title: Optional[str] = Field(None, max_length=255)
+    company_id: Optional[int] = None
+    experience_id: Optional[int] = None
+    work_format_id: Optional[int] = None
+    work_schedule_id: Optional[int] = None
+    location: Optional[str] = Field(None, max_length=255)
+    min_salary: Optional[float] = None
+    max_salary: Optional[float] = None
+    currency: Optional[str] = Field(None, max_length=10)
+    skill_ids: Optional[List[int]] = None
+    skills_mode: Optional[Literal["all", "any"]] = None
+    webhook_url: Optional[HttpUrl] = None
+    is_active: Optional[bool] = None
+
+class SavedSearch(SavedSearchBase, TimestampMixin):
+    saved_search_id: int
+    user_id: int
+    unread: int = 0
+    # Ключ проверки подписи X-Webhook-Signature; есть, если задан webhook_url
+    webhook_secret: Optional[str] = None
+    links: Optional[List[Link]] = None
+
+# Вакансия во входящих сохранённого поиска (и в теле webhook)
+class SavedSearchHit(BaseSchema):
+    vacancy_id: int
+    seq: int
+    is_read: bool = False
+    matched_at: Optional[datetime] = None
+    title: str
+    company: Optional[str] = None
+    salary_from: Optional[float] = None
+    salary_to: Optional[float] = None
+    currency: Optional[str] = None
+    location: Optional[str] = None
+    published_date: Optional[datetime] = None
+    url: str
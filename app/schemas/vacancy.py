@@ -1,5 +1,6 @@
-from pydantic import BaseModel, HttpUrl, Field
-from typing import Optional, List
+from pydantic import BaseModel, HttpUrl, Field, model_validator
+from typing import Iterable, Literal, Optional, List, Set
+from collections import Counter
 from datetime import datetime
 from .base import BaseSchema, TimestampMixin, Link
 from .company import CompanyInVacancy
@@ -50,8 +51,30 @@ class VacancySimple(VacancyBase, TimestampMixin):
     work_format_id: int
     work_schedule_id: int
 
+def colliding_titles(titles: Iterable[str]) -> Set[str]:
+    """Названия, которые встречаются в выдаче больше одного раза"""
+    return {title for title, count in Counter(titles).items() if count > 1}
+
+
+def display_title(title: str, company_name: Optional[str], collides: bool) -> str:
+    """Название для показа: компания дописывается, только чтобы различить одинаковые названия"""
+    if collides and company_name is not None:
+        return f"{title} ({company_name})"
+    return title
+
+
+class DisplayTitleMixin(BaseModel):
+    # Списки задают его сами (см. colliding_titles); у одной вакансии - название как есть
+    display_title: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _default_display_title(self):
+        if self.display_title is None:
+            self.display_title = self.title
+        return self
+
 # Полная вакансия со связанными объектами
-class Vacancy(VacancySimple):
+class Vacancy(DisplayTitleMixin, VacancySimple):
     company: Optional[CompanyInVacancy] = None
     experience: Optional[ExperienceInVacancy] = None
     work_format: Optional[WorkFormatInVacancy] = None
@@ -60,7 +83,7 @@ class Vacancy(VacancySimple):
     links: Optional[List[Link]] = None
 
 # Вакансия с деталями компании (для списков)
-class VacancyWithCompany(VacancySimple):
+class VacancyWithCompany(DisplayTitleMixin, VacancySimple):
     company: Optional[CompanyInVacancy] = None
     experience: Optional[ExperienceInVacancy] = None
     links: Optional[List[Link]] = None
@@ -77,11 +100,34 @@ class VacancyFilter(BaseModel):
     max_salary: Optional[float] = None
     currency: Optional[str] = None
     skill_ids: Optional[List[int]] = None
+    # all - нужны все навыки из skill_ids, any - хотя бы один
+    skills_mode: Literal["all", "any"] = "all"
     is_active: Optional[bool] = True
     since: Optional[str] = None
+    # Курсор следующей страницы; без него используется offset
+    cursor: Optional[str] = None
     offset: int = 0
     limit: int = Field(100, le=1000)
 
+# Лента изменений
+class VacancyChange(BaseModel):
+    id: int
+    seq: int
+    op: Literal["created", "updated"]
+    title: str
+    company: Optional[str] = None
+    salary_from: Optional[float] = None
+    salary_to: Optional[float] = None
+    currency: Optional[str] = None
+    location: Optional[str] = None
+    published_date: Optional[datetime] = None
+    url: str
+
+class VacancyChanges(BaseModel):
+    changes: List[VacancyChange]
+    cursor: int
+    has_more: bool
+
 # Статистика
 class VacancyStats(BaseSchema):
     total: int
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud.vacancy import vacancy_crud
+from app.schemas.vacancy import VacancyFilter
+
+logger = logging.getLogger(__name__)
+
+
+class CountCache:
+    """
+    Кэш количества вакансий по фильтру.
+
+    Запись действительна, пока не изменилась версия данных - счётчик
+    изменений вакансий в БД (vacancy_crud.current_change_seq). Его
+    увеличивает любая загрузка с изменениями, в том числе из Celery и
+    других воркеров, а проверка стоит одного чтения по индексу. Поэтому между циклами опроса
+    счётчики отдаются из памяти. Одновременные промахи по одному фильтру
+    выполняют один COUNT на всех.
+    """
+
+    def __init__(self, max_entries: int = settings.COUNT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # Ключ фильтра -> (версия данных, количество)
+        self._entries: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int], asyncio.Task] = {}
+        self.version = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(filter: VacancyFilter) -> str:
+        """Нормализованный фильтр: без пагинации, с упорядоченными списками"""
+        data = filter.model_dump(exclude={"offset", "limit", "cursor"})
+        for name, value in data.items():
+            if isinstance(value, str):
+                data[name] = value.strip() or None
+        if data.get("skill_ids"):
+            data["skill_ids"] = sorted(set(data["skill_ids"]))
+        return json.dumps(data, sort_keys=True, default=str)
+
+    async def get(self, db: AsyncSession, filter: VacancyFilter) -> int:
+        key = self.key(filter)
+        version = self.version = await vacancy_crud.current_change_seq(db)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        task = self._inflight.get((key, version))
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._load(key, version, filter))
+            self._inflight[(key, version)] = task
+        else:
+            self.coalesced += 1
+        # Отмена одного запроса не должна отменять общий подсчёт
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, version: int, filter: VacancyFilter) -> int:
+        try:
+            # Своя сессия: подсчёт переживает запрос, который его начал
+            async with AsyncSessionLocal() as db:
+                count = await vacancy_crud.count(db, filter)
+            current = self._entries.get(key)
+            if current is None or current[0] <= version:
+                self._entries[key] = (version, count)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return count
+        finally:
+            self._inflight.pop((key, version), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "data_version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
+
+
+count_cache = CountCache()
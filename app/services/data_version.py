@@ -0,0 +1,56 @@
+import asyncio
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import on_outer_commit
+
+# Ключ в Session.info: транзакция изменила вакансии
+CHANGED_KEY = "data_version_changed"
+
+
+class DataVersion:
+    """
+    Счётчик версии данных о вакансиях в процессе.
+
+    Увеличивается после каждого commit, изменившего вакансии; кэши,
+    построенные на старой версии, считаются устаревшими.
+    """
+
+    def __init__(self):
+        self.value = 0
+        # Одно событие на всех ожидающих; заменяется после каждого изменения
+        self._changed: Optional[asyncio.Event] = None
+        self.waiters = 0
+
+    def bump(self) -> int:
+        self.value += 1
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+        return self.value
+
+    async def wait_for_change(self, seen: int, timeout: float) -> bool:
+        """Дождаться версии новее `seen`; False - по истечении timeout"""
+        if self.value != seen:
+            return True
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        changed = self._changed
+        self.waiters += 1
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return self.value != seen
+        finally:
+            self.waiters -= 1
+
+    def mark_changed(self, db: AsyncSession) -> None:
+        """Версия увеличится после commit текущей транзакции"""
+        db.sync_session.info[CHANGED_KEY] = True
+
+
+data_version = DataVersion()
+
+on_outer_commit(CHANGED_KEY, lambda changed: data_version.bump())
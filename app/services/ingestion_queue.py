@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud.vacancy import vacancy_crud
+from app.services.parsers.detail_fetcher import LatencyStats
+from app.services.seen_set import seen_set
+
+logger = logging.getLogger(__name__)
+
+STAT_KEYS = ("created", "updated", "unchanged", "skipped")
+
+
+class _Ticket:
+    """Одна отправка производителя: ждёт, пока запишутся все её вакансии"""
+
+    def __init__(self, size: int):
+        self.pending = size
+        self.stats = dict.fromkeys(STAT_KEYS, 0)
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def done(self, count: int, stats: Dict[str, int]) -> None:
+        for key in STAT_KEYS:
+            self.stats[key] += stats.get(key, 0)
+        self.pending -= count
+        if self.pending <= 0 and not self.future.done():
+            self.future.set_result(self.stats)
+
+    def fail(self, exc: BaseException) -> None:
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+class IngestionQueue:
+    """
+    Очередь вакансий на запись в БД с единственным писателем.
+
+    Производители (опрос, /parse/hh, Celery) кладут вакансии в
+    ограниченную очередь и ждут, когда они будут записаны; при заполненной
+    очереди `submit` блокируется. Писатель собирает пачку до `batch_size`
+    вакансий или `max_delay` секунд и записывает её одной транзакцией.
+    Если транзакция пачки падает, отправки из неё записываются каждая
+    своей транзакцией: ошибку получает только та, что её вызвала.
+    """
+
+    def __init__(
+        self,
+        max_items: int = settings.INGEST_QUEUE_MAX_ITEMS,
+        batch_size: int = settings.INGEST_BATCH_SIZE,
+        max_delay: float = settings.INGEST_BATCH_MAX_DELAY_SECONDS,
+    ):
+        self.max_items = max(1, max_items)
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+
+        self.commit_latency = LatencyStats()
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.max_depth = 0
+        self.producer_wait_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None and not self._writer.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_items)
+        self._writer = asyncio.create_task(self._run())
+        logger.info(
+            "Ingestion writer started: max_items=%s batch_size=%s max_delay=%.2fs",
+            self.max_items, self.batch_size, self.max_delay,
+        )
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Дописать то, что уже в очереди, и остановить писателя"""
+        if self._writer is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Ingestion queue not drained in %.0fs, %s items dropped", timeout, self._queue.qsize())
+        self._writer.cancel()
+        await asyncio.gather(self._writer, return_exceptions=True)
+        self._writer = None
+
+    async def __aenter__(self) -> "IngestionQueue":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+    async def submit(self, items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Поставить вакансии в очередь и дождаться их записи"""
+        if not self.running:
+            raise RuntimeError("Ingestion writer is not running")
+        if not items:
+            return dict.fromkeys(STAT_KEYS, 0)
+        ticket = _Ticket(len(items))
+        for data in items:
+            if self._queue.full():
+                t0 = time.monotonic()
+                await self._queue.put((data, ticket))
+                self.producer_wait_seconds += time.monotonic() - t0
+            else:
+                self._queue.put_nowait((data, ticket))
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return await ticket.future
+
+    async def _next_batch(self) -> List[Tuple[Dict[str, Any], _Ticket]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _commit(
+        self, groups: Dict[_Ticket, List[Dict[str, Any]]]
+    ) -> List[Tuple[_Ticket, int, Dict[str, int]]]:
+        t0 = time.monotonic()
+        results = []
+        try:
+            async with AsyncSessionLocal() as db:
+                # Отправки пишутся раздельно, чтобы вернуть каждой её статистику,
+                # но коммит один на все
+                for ticket, items in groups.items():
+                    results.append((ticket, len(items), await vacancy_crud.ingest_batch(db, items)))
+                await db.commit()
+        except Exception:
+            self.commit_latency.record(time.monotonic() - t0, ok=False)
+            raise
+        self.commit_latency.record(time.monotonic() - t0)
+        self.batches += 1
+        for ticket, items in groups.items():
+            # Только после коммита: иначе откат оставил бы "известными" несохранённые вакансии
+            seen_set.add_many(data.get("source_url") for data in items)
+            self.written += len(items)
+        return results
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], _Ticket]]) -> None:
+        groups: Dict[_Ticket, List[Dict[str, Any]]] = {}
+        for data, ticket in batch:
+            groups.setdefault(ticket, []).append(data)
+
+        try:
+            results = await self._commit(groups)
+        except Exception as exc:
+            self.failed_batches += 1
+            if len(groups) == 1:
+                logger.exception("Ingestion batch of %s items failed", len(batch))
+                for ticket in groups:
+                    ticket.fail(exc)
+                return
+            logger.warning(
+                "Ingestion batch of %s items from %s submissions failed, retrying one by one: %r",
+                len(batch), len(groups), exc,
+            )
+            results = None
+
+        if results is None:
+            # Одна плохая отправка не должна ронять чужие: пишем каждую отдельно
+            results = []
+            for ticket, items in groups.items():
+                try:
+                    results.extend(await self._commit({ticket: items}))
+                except Exception as ticket_exc:
+                    logger.exception("Ingestion of a submission (%s items) failed", len(items))
+                    ticket.fail(ticket_exc)
+
+        for ticket, count, stats in results:
+            ticket.done(count, stats)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "depth": self._queue.qsize() if self._queue else 0,
+            "max_depth": self.max_depth,
+            "max_items": self.max_items,
+            "batch_size": self.batch_size,
+            "submitted": self.submitted,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "avg_batch": round(self.written / self.batches, 1) if self.batches else 0.0,
+            "producer_wait_seconds": round(self.producer_wait_seconds, 3),
+            "commit_latency": self.commit_latency.snapshot(),
+        }
+
+
+ingestion_queue = IngestionQueue()
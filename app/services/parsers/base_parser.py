@@ -1,22 +1,137 @@
 import aiohttp
 import asyncio
-from typing import List, Dict, Any
+import logging
+from contextlib import aclosing
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from app.core.config import settings
+from app.core.http_client import create_client_session, http_client
+from app.services.skill_matcher import skill_matcher
+from .detail_fetcher import DetailFetcher, LatencyStats
+from .rate_limiter import TokenBucket, backoff_delay, parse_retry_after, shared_rate_limiter
+
+logger = logging.getLogger(__name__)
 
 class BaseParser:
+    # Ограничения параллелизма задаются для каждого источника отдельно
+    MAX_IN_FLIGHT: int = 4
+    PER_HOST_LIMIT: int = 4
+    detail_latency: LatencyStats = LatencyStats()
+    # Общий для всех парсеров процесса лимитер запросов
+    rate_limiter: TokenBucket = shared_rate_limiter
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    MAX_RETRIES: int = settings.PARSER_MAX_RETRIES
+
     def __init__(self):
         self.session = None
+        self._owns_session = False
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Общая сессия приложения; своя - только вне lifespan (Celery, скрипты)
+        self.session = http_client.session
+        if self.session is None:
+            self.session = self._create_session()
+            self._owns_session = True
         return self
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        return create_client_session(limit_per_host=self.PER_HOST_LIMIT, stats=http_client.stats)
+
+    def detail_fetcher(self) -> DetailFetcher:
+        return DetailFetcher(self.MAX_IN_FLIGHT, stats=self.detail_latency)
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.session.close()
+        if self._owns_session:
+            await self.session.close()
+        self.session = None
+        self._owns_session = False
     
-    async def parse_vacancies(self, search_query: str, limit: int = 100) -> List[Dict]:
+    async def _request(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Any, bytes]:
+        """
+        GET через общий лимитер с повторами на 429/5xx и сетевых ошибках.
+        Возвращает (status, headers, body) последней попытки.
+        """
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            retry_after = None
+            try:
+                async with session.get(url, params=params, headers=headers) as resp:
+                    if resp.status not in self.RETRY_STATUSES or attempt >= self.MAX_RETRIES:
+                        return resp.status, resp.headers, await resp.read()
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    status = resp.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                if attempt >= self.MAX_RETRIES:
+                    raise
+                status = type(exc).__name__
+
+            delay = backoff_delay(attempt, retry_after)
+            if status == 429:
+                self.rate_limiter.pause(delay)
+            self.rate_limiter.retries += 1
+            logger.info("Retrying %s after %s in %.2fs (attempt %s)", url, status, delay, attempt + 1)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def iter_vacancies(self, search_query: str, limit: int = 100, **kwargs) -> AsyncIterator[Dict]:
+        """Вакансии по одной, по мере загрузки"""
         raise NotImplementedError
+
+    async def parse_vacancies(self, search_query: str, limit: int = 100, **kwargs) -> List[Dict]:
+        async with aclosing(self.iter_vacancies(search_query, limit=limit, **kwargs)) as vacancies:
+            return [vacancy async for vacancy in vacancies]
+
+    async def iter_batches(
+        self,
+        search_query: str,
+        limit: int = 100,
+        batch_size: Optional[int] = None,
+        **kwargs,
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Вакансии пачками. Загрузка идёт в фоновой задаче и не ждёт, пока
+        вызывающий код обработает предыдущую пачку; очередь ограничена
+        PARSER_BATCH_QUEUE пачками, так что память не растёт с `limit`.
+        """
+        batch_size = batch_size or settings.PARSER_BATCH_SIZE
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.PARSER_BATCH_QUEUE)
+        done = object()
+
+        async def produce():
+            batch: List[Dict] = []
+            try:
+                stream = self.iter_vacancies(search_query, limit=limit, **kwargs)
+                async with aclosing(stream) as vacancies:
+                    async for vacancy in vacancies:
+                        batch.append(vacancy)
+                        if len(batch) >= batch_size:
+                            await queue.put(batch)
+                            batch = []
+                if batch:
+                    await queue.put(batch)
+                await queue.put(done)
+            except Exception as exc:
+                await queue.put(exc)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
     
     def normalize_salary(self, salary_data: Dict) -> Dict:
         """Нормализация зарплаты из разных источников"""
@@ -32,12 +147,4 @@ class BaseParser:
     
     def parse_skills(self, description: str) -> List[str]:
         """Извлечение навыков из описания"""
-        skills = []
-        common_skills = ["Python", "JavaScript", "Java", "SQL", "Docker", 
-                        "Kubernetes", "React", "Vue", "AWS", "Git"]
-        
-        for skill in common_skills:
-            if skill.lower() in description.lower():
-                skills.append(skill)
-        
-        return skills
\ No newline at end of file
+        return skill_matcher.extract(description)
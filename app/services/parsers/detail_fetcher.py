@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyStats:
+    """Статистика задержек запросов (скользящее окно последних замеров)"""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.failures = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        self.count += 1
+        if not ok:
+            self.failures += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._samples.append(seconds)
+
+    def _percentile(self, samples: list, q: float) -> float:
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(q * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "p50_ms": round(self._percentile(samples, 0.5) * 1000, 1),
+            "p95_ms": round(self._percentile(samples, 0.95) * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+async def _aiter(items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if hasattr(items, "__aiter__"):
+        try:
+            async for item in items:
+                yield item
+        finally:
+            if hasattr(items, "aclose"):
+                await items.aclose()
+    else:
+        for item in items:
+            yield item
+
+
+class DetailFetcher:
+    """
+    Загрузка деталей с ограничением числа одновременных запросов.
+
+    Результаты отдаются в порядке входных идентификаторов; как только набрано
+    `limit` непустых результатов, оставшиеся запросы отменяются.
+    """
+
+    def __init__(self, max_in_flight: int, stats: Optional[LatencyStats] = None):
+        self.max_in_flight = max(1, max_in_flight)
+        self.stats = stats or LatencyStats()
+
+    async def _timed(
+        self, fetch_one: Callable[[Any], Awaitable[Optional[T]]], item_id: Any
+    ) -> Optional[T]:
+        t0 = time.monotonic()
+        try:
+            result = await fetch_one(item_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats.record(time.monotonic() - t0, ok=False)
+            logger.exception("Detail fetch failed: id=%s", item_id)
+            return None
+        self.stats.record(time.monotonic() - t0, ok=result is not None)
+        return result
+
+    async def stream(
+        self,
+        ids: Union[Iterable[Any], AsyncIterable[Any]],
+        fetch_one: Callable[[Any], Awaitable[Optional[T]]],
+        limit: int,
+    ) -> AsyncIterator[T]:
+        pending: Deque[asyncio.Task] = deque()
+        produced = 0
+        source = _aiter(ids)
+
+        try:
+            async for item_id in source:
+                if produced >= limit:
+                    break
+                pending.append(asyncio.create_task(self._timed(fetch_one, item_id)))
+                # Не держим в полёте больше, чем ещё может понадобиться
+                while pending and len(pending) >= min(self.max_in_flight, limit - produced):
+                    result = await pending.popleft()
+                    if result is not None:
+                        produced += 1
+                        yield result
+                        if produced >= limit:
+                            return
+
+            while pending and produced < limit:
+                result = await pending.popleft()
+                if result is not None:
+                    produced += 1
+                    yield result
+        finally:
+            await source.aclose()
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def fetch(
+        self,
+        ids: Union[Iterable[Any], AsyncIterable[Any]],
+        fetch_one: Callable[[Any], Awaitable[Optional[T]]],
+        limit: int,
+    ) -> list:
+        return [result async for result in self.stream(ids, fetch_one, limit)]
@@ -1,71 +1,250 @@
 from .base_parser import BaseParser
+from .detail_fetcher import LatencyStats
+from .http_cache import get_response_cache
+from .html_text import html_to_text
 from app.core.config import settings
-from bs4 import BeautifulSoup
 import logging
 import aiohttp
+import asyncio
+from collections import deque
+from contextlib import aclosing
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, AsyncIterator, Collection, Container
+import json
 import re
 
 logger = logging.getLogger(__name__)
 
 class HHParser(BaseParser):
     BASE_URL = settings.HH_API_URL
+    MAX_IN_FLIGHT = settings.HH_MAX_IN_FLIGHT
+    PER_HOST_LIMIT = settings.HH_PER_HOST_LIMIT
+    PAGE_PREFETCH = settings.HH_PAGE_PREFETCH
+    # Подряд идущих страниц без новых вакансий, после которых обход прекращается
+    MAX_EMPTY_PAGES = settings.HH_MAX_EMPTY_PAGES
+    # Ограничения API hh.ru: не больше 100 на страницу и 2000 результатов в глубину
+    MAX_PER_PAGE = 100
+    MAX_DEPTH = 2000
+    detail_latency = LatencyStats()
 
-    async def parse_vacancies(
+    def __init__(self):
+        super().__init__()
+        # Статистика последнего обхода выдачи
+        self.listing_stats: Dict[str, Any] = {
+            "found": 0, "pages": 0, "items": 0, "skipped_known": 0, "skipped_seen": 0,
+            "stopped_early": False, "stopped_no_new": False,
+        }
+
+    async def iter_vacancies(
         self,
         search_query: str,
         limit: int = 100,
         area: Optional[int] = None,
         only_with_salary: bool = False,
         light: bool = False,
-    ) -> List[Dict[str, Any]]:
-        vacancies: List[Dict[str, Any]] = []
-        page = 0
-        per_page = min(20, max(1, limit))
-        headers = {"User-Agent": "vacancy-insight/1.0"}
+        date_from: Optional[datetime] = None,
+        known_ids: Optional[Collection[str]] = None,
+        seen: Optional[Container[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Вакансии по одной, по мере загрузки.
+
+        `date_from` и `known_ids` включают инкрементальный режим: выдача
+        сортируется по времени публикации, уже известные вакансии
+        пропускаются, а обход прекращается на первой известной вакансии
+        старше `date_from`.
 
-        session = self.session or aiohttp.ClientSession(headers=headers)
+        `seen` - множество source_url уже сохранённых вакансий: такие
+        вакансии отбрасываются ещё до загрузки деталей, но обход не
+        останавливают. Без него известные вакансии перечитываются, чтобы
+        обновить изменившиеся.
+        """
+        session = self.session or self._create_session()
         close_session = self.session is None
 
+        params: Dict[str, Any] = {"text": search_query}
+        if area is not None:
+            params["area"] = area
+        if only_with_salary:
+            # aiohttp не принимает bool в параметрах запроса
+            params["only_with_salary"] = "true"
+        if date_from is not None or known_ids is not None:
+            params["order_by"] = "publication_time"
+        if date_from is not None:
+            params["date_from"] = self.format_date(date_from)
+
+        def listing():
+            items = self._iter_listing(session, params, limit)
+            if known_ids:
+                items = self._skip_known(items, known_ids, date_from)
+            if seen is not None:
+                items = self._skip_seen(items, seen)
+            return items
+
         try:
-            while len(vacancies) < limit:
-                params = {
-                    "text": search_query,
-                    "page": page,
-                    "per_page": per_page,
-                }
-                if area is not None:
-                    params["area"] = area
-                if only_with_salary:
-                    params["only_with_salary"] = True
-
-                async with session.get(f"{self.BASE_URL}/vacancies", params=params) as resp:
-                    if resp.status != 200:
-                        logger.warning("HH API returned status %s", resp.status)
-                        break
-
-                    data = await resp.json()
-                    items = data.get("items", [])
-                    if not items:
-                        break
-
-                    for item in items:
-                        if light:
-                            vacancy = self._parse_from_list_item(item)
-                        else:
-                            vacancy = await self.parse_vacancy_detail(session, item["id"])
-                        if vacancy:
-                            vacancies.append(vacancy)
-                        if len(vacancies) >= limit:
+            if light:
+                produced = 0
+                async with aclosing(listing()) as items:
+                    async for item in items:
+                        yield self._parse_from_list_item(item)
+                        produced += 1
+                        if produced >= limit:
                             break
+            else:
+                # Детали грузим параллельно, порядок выдачи сохраняется
+                async def item_ids():
+                    async with aclosing(listing()) as items:
+                        async for item in items:
+                            yield item["id"]
 
-                    page += 1
+                stream = self.detail_fetcher().stream(
+                    item_ids(),
+                    lambda vacancy_id: self.parse_vacancy_detail(session, vacancy_id),
+                    limit,
+                )
+                async with aclosing(stream) as vacancies:
+                    async for vacancy in vacancies:
+                        yield vacancy
         finally:
             if close_session:
                 await session.close()
 
-        return vacancies[:limit]
+    async def _skip_known(
+        self,
+        items: AsyncIterator[Dict[str, Any]],
+        known_ids: Collection[str],
+        date_from: Optional[datetime],
+    ) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            async for item in items:
+                if str(item.get("id")) not in known_ids:
+                    yield item
+                    continue
+                self.listing_stats["skipped_known"] += 1
+                published = self.parse_published_date(item.get("published_at"))
+                # На границе date_from могут быть и новые вакансии с той же секундой
+                if date_from is None or published is None or published < date_from:
+                    self.listing_stats["stopped_early"] = True
+                    return
+        finally:
+            await items.aclose()
+
+    async def _skip_seen(
+        self,
+        items: AsyncIterator[Dict[str, Any]],
+        seen: Container[str],
+    ) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            async for item in items:
+                if item.get("alternate_url", "") in seen:
+                    self.listing_stats["skipped_seen"] += 1
+                    continue
+                yield item
+        finally:
+            await items.aclose()
+
+    async def _fetch_listing_page(
+        self,
+        session: aiohttp.ClientSession,
+        params: Dict[str, Any],
+        page: int,
+        per_page: int,
+    ) -> Optional[Dict[str, Any]]:
+        query = {**params, "page": page, "per_page": per_page}
+        status, _, body = await self._request(session, f"{self.BASE_URL}/vacancies", params=query)
+        if status != 200:
+            logger.warning("HH API returned status %s for listing page %s", status, page)
+            return None
+        return json.loads(body)
+
+    async def _iter_listing(
+        self,
+        session: aiohttp.ClientSession,
+        params: Dict[str, Any],
+        limit: int,
+    ):
+        """
+        Обход выдачи: первая страница даёт `pages`/`found`, остальные
+        запрашиваются параллельно окном PAGE_PREFETCH. Элементы отдаются
+        по порядку страниц, как только страница пришла.
+
+        Если фильтры (_skip_known, _skip_seen) отбросили все элементы
+        MAX_EMPTY_PAGES страниц подряд, обход прекращается: иначе опрос, в
+        котором всё уже известно, прошёл бы выдачу на всю глубину.
+        """
+        per_page = min(self.MAX_PER_PAGE, max(1, limit))
+        max_pages = max(1, self.MAX_DEPTH // per_page)
+        stats = self.listing_stats
+
+        def filtered() -> int:
+            return stats["skipped_known"] + stats["skipped_seen"]
+
+        first = await self._fetch_listing_page(session, params, 0, per_page)
+        if not first:
+            return
+        items = first.get("items") or []
+        total_pages = min(int(first.get("pages") or 0), max_pages)
+        wanted_pages = min(total_pages, -(-limit // per_page))
+        stats["found"] = int(first.get("found") or 0)
+        stats["pages"] = 1
+        stats["items"] = len(items)
+        logger.debug(
+            "HH listing: found=%s pages=%s wanted=%s per_page=%s",
+            first.get("found"), total_pages, wanted_pages, per_page,
+        )
+
+        filtered_before = filtered()
+        page_size = len(items)
+        for item in items:
+            yield item
+        if not items:
+            return
+
+        next_page = 1
+        empty_pages = 0
+        pending: deque = deque()
+        try:
+            while True:
+                # Сюда возвращаемся, когда потребитель разобрал всю предыдущую страницу
+                if page_size:
+                    if filtered() - filtered_before < page_size:
+                        empty_pages = 0
+                    elif (empty_pages := empty_pages + 1) >= self.MAX_EMPTY_PAGES:
+                        stats["stopped_no_new"] = True
+                        return
+                    page_size = 0
+                # Расчётные страницы запрашиваем волной, дальше - по одной по требованию
+                while next_page < wanted_pages and len(pending) < self.PAGE_PREFETCH:
+                    pending.append(asyncio.create_task(
+                        self._fetch_listing_page(session, params, next_page, per_page)
+                    ))
+                    next_page += 1
+                if not pending and next_page < total_pages:
+                    pending.append(asyncio.create_task(
+                        self._fetch_listing_page(session, params, next_page, per_page)
+                    ))
+                    next_page += 1
+                if not pending:
+                    return
+
+                data = await pending.popleft()
+                stats["pages"] += 1
+                if data is None:
+                    # Страница не пришла даже после повторов - пропускаем её
+                    continue
+                items = data.get("items") or []
+                if not items:
+                    return
+                stats["items"] += len(items)
+                filtered_before = filtered()
+                page_size = len(items)
+                for item in items:
+                    yield item
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
     def _parse_from_list_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Быстрый парсинг из элемента списка (без доп. запроса)."""
@@ -100,54 +279,91 @@ class HHParser(BaseParser):
             "raw_address": address_raw,
             "skills": skills,
             "source_url": item.get("alternate_url", ""),
+            "external_source": "hh",
+            "external_id": str(item["id"]) if item.get("id") else None,
+            "detailed": False,
             "published_date": self.parse_published_date(item.get("published_at")),
         }
 
     async def parse_vacancy_detail(self, session: aiohttp.ClientSession, vacancy_id: str) -> Optional[Dict[str, Any]]:
-        async with session.get(f"{self.BASE_URL}/vacancies/{vacancy_id}") as resp:
-            if resp.status != 200:
-                return None
-
-            data = await resp.json()
-
-            description_html = data.get("description", "") or ""
-            description_text = self._html_to_text(description_html)
-
-            skills = [skill.get("name") for skill in data.get("key_skills", []) if skill.get("name")]
-            parsed_skills = self.parse_skills(description_text)
-            skills = list(dict.fromkeys(skills + parsed_skills))
-
-            address_raw = None
-            address_data = data.get("address") or {}
-            if isinstance(address_data, dict):
-                address_raw = address_data.get("raw")
-
-            # Преобразование в нашу структуру
-            vacancy = {
-                "title": data.get("name", ""),
-                "description": description_text,
-                "salary": self.normalize_salary(data.get("salary")),
-                "company": {
-                    "name": data.get("employer", {}).get("name", ""),
-                    "website": data.get("employer", {}).get("site_url", ""),
-                },
-                "experience": data.get("experience", {}).get("name", ""),
-                "work_format": self.parse_work_format(data),
-                "work_schedule": self.parse_work_schedule(data),
-                "location": data.get("area", {}).get("name", ""),
-                "raw_address": address_raw,
-                "skills": skills,
-                "source_url": data.get("alternate_url", ""),
-                "published_date": self.parse_published_date(data.get("published_at")),
-            }
-
-            return vacancy
+        data = await self._get_cached_json(session, f"{self.BASE_URL}/vacancies/{vacancy_id}")
+        if data is None:
+            return None
+
+        description_html = data.get("description", "") or ""
+        description_text = self._html_to_text(description_html)
+
+        skills = [skill.get("name") for skill in data.get("key_skills", []) if skill.get("name")]
+        parsed_skills = self.parse_skills(description_text)
+        skills = list(dict.fromkeys(skills + parsed_skills))
+
+        address_raw = None
+        address_data = data.get("address") or {}
+        if isinstance(address_data, dict):
+            address_raw = address_data.get("raw")
+
+        # Преобразование в нашу структуру
+        vacancy = {
+            "title": data.get("name", ""),
+            "description": description_text,
+            "salary": self.normalize_salary(data.get("salary")),
+            "company": {
+                "name": data.get("employer", {}).get("name", ""),
+                "website": data.get("employer", {}).get("site_url", ""),
+            },
+            "experience": data.get("experience", {}).get("name", ""),
+            "work_format": self.parse_work_format(data),
+            "work_schedule": self.parse_work_schedule(data),
+            "location": data.get("area", {}).get("name", ""),
+            "raw_address": address_raw,
+            "skills": skills,
+            "source_url": data.get("alternate_url", ""),
+            "external_source": "hh",
+            "external_id": str(data["id"]) if data.get("id") else None,
+            "detailed": True,
+            "published_date": self.parse_published_date(data.get("published_at")),
+        }
+
+        return vacancy
+
+    async def _get_cached_json(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        GET с дисковым кэшем: свежий ответ - без запроса, устаревший - условный запрос.
+        Кэш - синхронный sqlite3 с commit на каждую запись, поэтому обращения
+        к нему уходят в поток, а не блокируют цикл событий
+        """
+        cache = get_response_cache()
+        entry = await asyncio.to_thread(cache.get, url) if cache else None
+        if entry and entry.is_fresh:
+            cache.hits += 1
+            return json.loads(entry.body)
+
+        headers = entry.conditional_headers() if entry else {}
+        status, resp_headers, body = await self._request(session, url, headers=headers)
+        if status == 304 and entry:
+            cache.revalidated += 1
+            await asyncio.to_thread(cache.refresh, url)
+            return json.loads(entry.body)
+        if cache:
+            cache.misses += 1
+        if status != 200:
+            if status != 404:
+                logger.warning("HH API returned status %s for %s", status, url)
+            return None
+        if cache:
+            await asyncio.to_thread(
+                cache.store,
+                url,
+                body,
+                etag=resp_headers.get("ETag"),
+                last_modified=resp_headers.get("Last-Modified"),
+            )
+        return json.loads(body)
 
     def _html_to_text(self, html: str) -> str:
-        if not html:
-            return ""
-        soup = BeautifulSoup(html, "html.parser")
-        return soup.get_text(separator=" ", strip=True)
+        return html_to_text(html)
 
     def parse_work_format(self, data: Dict[str, Any]) -> str:
         # Пытаемся извлечь формат работы из разных полей
@@ -177,6 +393,12 @@ class HHParser(BaseParser):
         schedule = (data.get("schedule") or {}).get("name")
         return schedule or "Полный день"
 
+    def format_date(self, value: datetime) -> str:
+        """Дата в формате параметров API hh.ru (YYYY-MM-DDThh:mm:ss±hhmm)"""
+        if value.tzinfo is None:
+            return value.strftime("%Y-%m-%dT%H:%M:%S")
+        return value.strftime("%Y-%m-%dT%H:%M:%S%z")
+
     def parse_published_date(self, value: Optional[str]) -> Optional[datetime]:
         if not value:
             return None
@@ -0,0 +1,76 @@
+from html.parser import HTMLParser
+from typing import List
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Потоковое извлечение текста без построения дерева.
+
+    Повторяет BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True):
+    текст между соседними тегами - один фрагмент, фрагменты обрезаются по
+    краям и склеиваются пробелом; содержимое script/style/template и
+    комментарии пропускаются, CDATA попадает в текст.
+    """
+
+    SKIP_TAGS = frozenset({"script", "style", "template"})
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._buffer: List[str] = []
+        self._skip_depth = 0
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        text = "".join(self._buffer).strip()
+        self._buffer.clear()
+        if text and not self._skip_depth:
+            self.parts.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+
+    def handle_data(self, data):
+        self._buffer.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.startswith("CDATA["):
+            self._buffer.append(data[len("CDATA["):])
+            self._flush()
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def html_to_text(html: str) -> str:
+    if not html:
+        return ""
+    # Описания без разметки и сущностей разбирать незачем
+    if "<" not in html and "&" not in html:
+        return html.strip()
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return " ".join(extractor.parts)
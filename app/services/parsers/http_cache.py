@@ -0,0 +1,243 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    def __init__(
+        self,
+        url: str,
+        body: bytes,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        stored_at: float,
+        ttl: int,
+    ):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() - self.stored_at < self.ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Дисковый кэш HTTP-ответов (SQLite), ключ - URL.
+
+    Пока запись свежая (ttl), запрос не выполняется вовсе; устаревшая запись
+    используется для условного запроса (ETag / Last-Modified). Записи старше
+    expire удаляются, при превышении max_bytes вытесняются давно не
+    использованные.
+
+    Время обращения при попадании не пишется в файл сразу: отметки копятся
+    в памяти и сбрасываются одной пачкой перед вытеснением, при закрытии
+    или когда их набралось TOUCH_FLUSH_SIZE. Иначе каждое попадание
+    стоило бы UPDATE и commit.
+
+    Методы синхронные и защищены блокировкой; из асинхронного кода их
+    вызывают через asyncio.to_thread.
+    """
+
+    TOUCH_FLUSH_SIZE = 512
+
+    def __init__(self, path: str, ttl: int, expire: int, max_bytes: int):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.expire = expire
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # url -> время последнего обращения, ещё не записанное в файл
+        self._touched: Dict[str, float] = {}
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[3] >= self.expire:
+                self._delete(url)
+                self._conn.commit()
+                return None
+            self._touched[url] = time.time()
+            if len(self._touched) >= self.TOUCH_FLUSH_SIZE:
+                self._flush_touches()
+                self._conn.commit()
+        return CachedResponse(url, row[0], row[1], row[2], row[3], self.ttl)
+
+    def store(
+        self,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            self._touched.pop(url, None)
+            self._delete(url)
+            self._conn.execute(
+                "INSERT INTO responses (url, body, etag, last_modified, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now, now, len(body)),
+            )
+            self._total_bytes += len(body)
+            self.stores += 1
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str) -> None:
+        """Ответ 304: запись снова считается свежей"""
+        now = time.time()
+        with self._lock:
+            self._touched.pop(url, None)
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+            self._conn.commit()
+
+    def _flush_touches(self) -> None:
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET accessed_at = ? WHERE url = ?",
+            [(accessed_at, url) for url, accessed_at in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _delete(self, url: str) -> None:
+        row = self._conn.execute(
+            "SELECT size FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._total_bytes -= row[0]
+
+    def _evict(self) -> None:
+        expired = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses WHERE stored_at < ?",
+            (time.time() - self.expire,),
+        ).fetchone()
+        if expired[0]:
+            self._conn.execute(
+                "DELETE FROM responses WHERE stored_at < ?", (time.time() - self.expire,)
+            )
+            self._total_bytes -= expired[1]
+            self.evictions += expired[0]
+
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Порядок вытеснения должен учитывать последние попадания
+        self._flush_touches()
+        # Вытесняем до 90% лимита, чтобы не чистить кэш на каждой записи
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        )
+        victims = []
+        freed = 0
+        for url, size in rows:
+            if self._total_bytes - freed <= target:
+                break
+            victims.append((url,))
+            freed += size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", victims)
+        self._total_bytes -= freed
+        self.evictions += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Общий на процесс кэш ответов; None, если кэш выключен"""
+    global _response_cache
+    if not settings.HH_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            settings.HH_CACHE_PATH,
+            ttl=settings.HH_CACHE_TTL_SECONDS,
+            expire=settings.HH_CACHE_EXPIRE_SECONDS,
+            max_bytes=settings.HH_CACHE_MAX_BYTES,
+        )
+    return _response_cache
@@ -0,0 +1,113 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket: `rate` запросов в секунду с запасом `burst`.
+
+    Один экземпляр делится всеми парсерами процесса, поэтому общий темп
+    запросов к внешним API не зависит от числа одновременных обходов.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+        self.acquired = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.retries = 0
+        self.rate_limited = 0
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Celery запускает каждую задачу в новом event loop
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        waited = 0.0
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    delay = (1 - self._tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+        self.acquired += 1
+        if waited:
+            self.throttled += 1
+            self.throttled_seconds += waited
+
+    def pause(self, seconds: float) -> None:
+        """Ответ 429: приостановить выдачу токенов для всех потребителей"""
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Экспоненциальная задержка с полным джиттером; Retry-After - нижняя граница"""
+    ceiling = min(settings.PARSER_BACKOFF_MAX_SECONDS, settings.PARSER_BACKOFF_BASE_SECONDS * 2 ** attempt)
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+shared_rate_limiter = TokenBucket(
+    rate=settings.PARSER_RATE_LIMIT_RPS,
+    burst=settings.PARSER_RATE_LIMIT_BURST,
+)
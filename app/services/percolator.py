@@ -0,0 +1,469 @@
+"""
+Перколятор сохранённых поисков: новые вакансии проверяются против
+поисков, а не поиски перезапускаются по всей таблице.
+
+Каждый поиск хранится в памяти под одним "якорем" - условием, без
+которого он не может совпасть (редкий навык, компания, слово названия,
+формат, зарплатная полоса). Для вакансии собираются только поиски из
+корзин её навыков, компании, слов и т.д., и лишь они проверяются
+полностью. Стоимость растёт с числом новых вакансий, а не с числом
+поисков × размер таблицы.
+
+Вакансии берутся из ленты изменений (change_seq) после commit загрузки;
+позиция перколятора хранится в change_sequence, поэтому после рестарта
+он продолжает с того же места.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import fulltext
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, on_outer_commit
+from app.crud.upsert import upsert_insert
+from app.models.change_sequence import ChangeSequence
+from app.models.company import Company
+from app.models.saved_search import SavedSearch, SavedSearchDelivery, SavedSearchMatch
+from app.models.vacancy import Vacancy
+from app.models.vacancy_skill import VacancySkill
+from app.services.data_version import data_version
+from app.services.skill_index import skill_index
+
+logger = logging.getLogger(__name__)
+
+# Ключ в Session.info: изменения сохранённых поисков до commit
+PENDING_KEY = "percolator_pending"
+
+# Строка change_sequence с номером последнего проверенного изменения
+CHECKPOINT = "saved_search_percolator"
+
+# Перепроверка ленты без сигнала: вакансии пишет и Celery в другом процессе
+IDLE_RECHECK_SECONDS = 30.0
+
+# Полос с запасом: Numeric(10, 2) не превышает 2 ** 34
+MAX_BAND = 40
+
+Anchor = Tuple[str, Any]
+
+
+def _band(value: float) -> int:
+    """Зарплатная полоса: границы - степени двойки"""
+    return int(max(value, 0)).bit_length()
+
+
+class SearchSpec(NamedTuple):
+    """Условия сохранённого поиска в виде, удобном для проверки в памяти"""
+    search_id: int
+    terms: Tuple[str, ...]
+    skill_ids: FrozenSet[int]
+    match_all: bool
+    company_id: Optional[int]
+    experience_id: Optional[int]
+    work_format_id: Optional[int]
+    work_schedule_id: Optional[int]
+    location: Optional[str]
+    min_salary: Optional[float]
+    max_salary: Optional[float]
+    currency: Optional[str]
+    webhook: bool
+
+    @classmethod
+    def from_model(cls, search: SavedSearch) -> "SearchSpec":
+        return cls(
+            search_id=search.saved_search_id,
+            terms=tuple(fulltext.terms(search.title)) if search.title else (),
+            skill_ids=frozenset(search.skill_ids or ()),
+            match_all=search.skills_mode != "any",
+            company_id=search.company_id or None,
+            experience_id=search.experience_id or None,
+            work_format_id=search.work_format_id or None,
+            work_schedule_id=search.work_schedule_id or None,
+            location=search.location.lower() if search.location else None,
+            min_salary=float(search.min_salary) if search.min_salary else None,
+            max_salary=float(search.max_salary) if search.max_salary else None,
+            currency=search.currency or None,
+            webhook=bool(search.webhook_url),
+        )
+
+
+class VacancyDoc(NamedTuple):
+    """Поля вакансии, по которым проверяются поиски"""
+    vacancy_id: int
+    change_seq: int
+    is_active: bool
+    company_id: Optional[int]
+    experience_id: Optional[int]
+    work_format_id: Optional[int]
+    work_schedule_id: Optional[int]
+    location: str
+    salaries: Tuple[float, ...]
+    currency: Optional[str]
+    skill_ids: FrozenSet[int]
+    tokens: FrozenSet[str]
+
+
+def matches(spec: SearchSpec, doc: VacancyDoc) -> bool:
+    """Полная проверка - те же условия, что у фильтра /vacancies/"""
+    if not doc.is_active:
+        return False
+    if spec.company_id and doc.company_id != spec.company_id:
+        return False
+    if spec.experience_id and doc.experience_id != spec.experience_id:
+        return False
+    if spec.work_format_id and doc.work_format_id != spec.work_format_id:
+        return False
+    if spec.work_schedule_id and doc.work_schedule_id != spec.work_schedule_id:
+        return False
+    if spec.currency and doc.currency != spec.currency:
+        return False
+    if spec.min_salary and not any(salary >= spec.min_salary for salary in doc.salaries):
+        return False
+    if spec.max_salary and not any(salary <= spec.max_salary for salary in doc.salaries):
+        return False
+    if spec.location and spec.location not in doc.location:
+        return False
+    if spec.skill_ids:
+        if spec.match_all and not spec.skill_ids <= doc.skill_ids:
+            return False
+        if not spec.match_all and spec.skill_ids.isdisjoint(doc.skill_ids):
+            return False
+    # Как в полнотекстовом индексе: каждое слово запроса - префикс слова вакансии
+    for term in spec.terms:
+        if not any(token.startswith(term) for token in doc.tokens):
+            return False
+    return True
+
+
+class Percolator:
+    """
+    Индекс сохранённых поисков и фоновая задача, которая проверяет по нему
+    новые изменения вакансий и пишет совпадения во входящие и в очередь
+    webhook-доставки.
+    """
+
+    def __init__(self, batch_size: int = settings.SAVED_SEARCH_PERCOLATE_BATCH):
+        self.batch_size = max(1, batch_size)
+        self.specs: Dict[int, SearchSpec] = {}
+        self.buckets: Dict[Anchor, Set[int]] = {}
+        self._anchors: Dict[int, List[Anchor]] = {}
+        # Длины слов-якорей: префиксы слов вакансии других длин не ищутся
+        self._term_lengths: Dict[int, int] = {}
+        self.loaded = False
+        self._task: Optional[asyncio.Task] = None
+        # Вызывается после записи новых совпадений (будит доставку webhook)
+        self.on_matches = None
+
+        self.vacancies = 0
+        self.candidates = 0
+        self.matched = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.match_seconds = 0.0
+        self.checkpoint = 0
+
+    # Индекс поисков
+
+    def _choose_anchors(self, spec: SearchSpec) -> List[Anchor]:
+        if spec.skill_ids:
+            if not spec.match_all:
+                return [("skill", skill_id) for skill_id in spec.skill_ids]
+            # Достаточно одного навыка - берём самый редкий
+            rarest = min(
+                spec.skill_ids,
+                key=lambda skill_id: len(skill_index.postings.get(skill_id, ())),
+            )
+            return [("skill", rarest)]
+        if spec.company_id:
+            return [("company", spec.company_id)]
+        if spec.terms:
+            return [("term", max(spec.terms, key=len))]
+        for field in ("experience_id", "work_schedule_id", "work_format_id"):
+            value = getattr(spec, field)
+            if value:
+                return [(field, value)]
+        if spec.min_salary:
+            return [("min_salary", _band(spec.min_salary))]
+        if spec.max_salary:
+            return [("max_salary", _band(spec.max_salary))]
+        return [("any", None)]
+
+    def put(self, spec: SearchSpec) -> None:
+        self.remove(spec.search_id)
+        anchors = self._choose_anchors(spec)
+        self.specs[spec.search_id] = spec
+        self._anchors[spec.search_id] = anchors
+        for anchor in anchors:
+            self.buckets.setdefault(anchor, set()).add(spec.search_id)
+            if anchor[0] == "term":
+                length = len(anchor[1])
+                self._term_lengths[length] = self._term_lengths.get(length, 0) + 1
+
+    def remove(self, search_id: int) -> None:
+        self.specs.pop(search_id, None)
+        for anchor in self._anchors.pop(search_id, ()):
+            bucket = self.buckets.get(anchor)
+            if bucket is not None:
+                bucket.discard(search_id)
+                if not bucket:
+                    del self.buckets[anchor]
+            if anchor[0] == "term":
+                length = len(anchor[1])
+                self._term_lengths[length] -= 1
+                if not self._term_lengths[length]:
+                    del self._term_lengths[length]
+
+    async def load(self, db: AsyncSession) -> None:
+        """Построить индекс по активным сохранённым поискам"""
+        self.specs.clear()
+        self.buckets.clear()
+        self._anchors.clear()
+        self._term_lengths.clear()
+        result = await db.stream_scalars(select(SavedSearch).where(SavedSearch.is_active.is_(True)))
+        async for search in result:
+            self.put(SearchSpec.from_model(search))
+        self.loaded = True
+        logger.info("Percolator loaded: %s saved searches, %s anchors", len(self.specs), len(self.buckets))
+
+    def stage(self, db: AsyncSession, search: SavedSearch) -> None:
+        """Поиск попадёт в индекс (или уйдёт из него) после commit"""
+        spec = SearchSpec.from_model(search) if search.is_active else None
+        pending = db.sync_session.info.setdefault(PENDING_KEY, {})
+        pending[search.saved_search_id] = spec
+
+    def stage_removal(self, db: AsyncSession, search_id: int) -> None:
+        db.sync_session.info.setdefault(PENDING_KEY, {})[search_id] = None
+
+    def _promote(self, pending: Dict[int, Optional[SearchSpec]]) -> None:
+        if not self.loaded:
+            return
+        for search_id, spec in pending.items():
+            if spec is None:
+                self.remove(search_id)
+            else:
+                self.put(spec)
+
+    # Проверка вакансий
+
+    def _probe_keys(self, doc: VacancyDoc) -> Iterable[Anchor]:
+        for skill_id in doc.skill_ids:
+            yield ("skill", skill_id)
+        yield ("company", doc.company_id)
+        yield ("experience_id", doc.experience_id)
+        yield ("work_schedule_id", doc.work_schedule_id)
+        yield ("work_format_id", doc.work_format_id)
+        if self._term_lengths:
+            for token in doc.tokens:
+                for length in self._term_lengths:
+                    if length <= len(token):
+                        yield ("term", token[:length])
+        if doc.salaries:
+            top = _band(max(doc.salaries))
+            bottom = _band(min(doc.salaries))
+            for band in range(top + 1):
+                yield ("min_salary", band)
+            for band in range(bottom, MAX_BAND + 1):
+                yield ("max_salary", band)
+        yield ("any", None)
+
+    def match(self, docs: Iterable[VacancyDoc]) -> List[Tuple[SearchSpec, VacancyDoc]]:
+        """Пары (поиск, вакансия) для подошедших вакансий"""
+        t0 = time.perf_counter()
+        found = []
+        for doc in docs:
+            self.vacancies += 1
+            if not doc.is_active:
+                continue
+            candidates: Set[int] = set()
+            for key in self._probe_keys(doc):
+                bucket = self.buckets.get(key)
+                if bucket:
+                    candidates |= bucket
+            self.candidates += len(candidates)
+            for search_id in candidates:
+                spec = self.specs[search_id]
+                if matches(spec, doc):
+                    found.append((spec, doc))
+        self.matched += len(found)
+        self.match_seconds += time.perf_counter() - t0
+        return found
+
+    # Фоновая обработка ленты изменений
+
+    async def _read_checkpoint(self, db: AsyncSession) -> int:
+        checkpoint = (
+            await db.execute(
+                select(ChangeSequence.value)
+                .where(ChangeSequence.name == CHECKPOINT)
+                .with_for_update()
+            )
+        ).scalar()
+        if checkpoint is None:
+            # Первый запуск: старые вакансии не рассылаем
+            checkpoint = (await db.execute(select(func.max(Vacancy.change_seq)))).scalar() or 0
+            await db.execute(
+                upsert_insert(db, ChangeSequence)
+                .values(name=CHECKPOINT, value=checkpoint)
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+        return checkpoint
+
+    async def _load_docs(self, db: AsyncSession, after: int) -> List[VacancyDoc]:
+        rows = (
+            await db.execute(
+                select(
+                    Vacancy.vacancy_id,
+                    Vacancy.change_seq,
+                    Vacancy.is_active,
+                    Vacancy.company_id,
+                    Vacancy.experience_id,
+                    Vacancy.work_format_id,
+                    Vacancy.work_schedule_id,
+                    Vacancy.location,
+                    Vacancy.salary_from,
+                    Vacancy.salary_to,
+                    Vacancy.currency,
+                    Vacancy.title,
+                    Vacancy.description,
+                    Company.name,
+                )
+                .outerjoin(Company, Company.company_id == Vacancy.company_id)
+                .where(Vacancy.change_seq > after)
+                .order_by(Vacancy.change_seq)
+                .limit(self.batch_size)
+            )
+        ).all()
+        if not rows:
+            return []
+        skills: Dict[int, Set[int]] = {}
+        links = await db.execute(
+            select(VacancySkill.vacancy_id, VacancySkill.skill_id).where(
+                VacancySkill.vacancy_id.in_([row.vacancy_id for row in rows])
+            )
+        )
+        for vacancy_id, skill_id in links:
+            skills.setdefault(vacancy_id, set()).add(skill_id)
+        return [
+            VacancyDoc(
+                vacancy_id=row.vacancy_id,
+                change_seq=row.change_seq,
+                is_active=row.is_active is not False,
+                company_id=row.company_id,
+                experience_id=row.experience_id,
+                work_format_id=row.work_format_id,
+                work_schedule_id=row.work_schedule_id,
+                location=(row.location or "").lower(),
+                salaries=tuple(
+                    float(value) for value in (row.salary_from, row.salary_to) if value is not None
+                ),
+                currency=row.currency,
+                skill_ids=frozenset(skills.get(row.vacancy_id, ())),
+                tokens=fulltext.tokens(
+                    " ".join(filter(None, (row.title, row.name, row.description)))
+                ),
+            )
+            for row in rows
+        ]
+
+    async def run_once(self) -> int:
+        """Проверить одну пачку изменений; возвращает число вакансий в ней"""
+        async with AsyncSessionLocal() as db:
+            checkpoint = await self._read_checkpoint(db)
+            docs = await self._load_docs(db, checkpoint)
+            if not docs:
+                await db.commit()
+                self.checkpoint = checkpoint
+                return 0
+            found = self.match(docs)
+            inserted = []
+            if found:
+                result = await db.execute(
+                    upsert_insert(db, SavedSearchMatch)
+                    .on_conflict_do_nothing(index_elements=["saved_search_id", "vacancy_id"])
+                    .returning(SavedSearchMatch.saved_search_id, SavedSearchMatch.vacancy_id),
+                    [
+                        {
+                            "saved_search_id": spec.search_id,
+                            "vacancy_id": doc.vacancy_id,
+                            "change_seq": doc.change_seq,
+                        }
+                        for spec, doc in found
+                    ],
+                )
+                inserted = result.all()
+            # Вакансия, уже бывшая во входящих, повторно не отправляется
+            webhooks = {spec.search_id for spec, _ in found if spec.webhook}
+            now = datetime.now(timezone.utc)
+            deliveries = [
+                {
+                    "saved_search_id": search_id,
+                    "vacancy_id": vacancy_id,
+                    "next_attempt_at": now,
+                }
+                for search_id, vacancy_id in inserted
+                if search_id in webhooks
+            ]
+            if deliveries:
+                await db.execute(SavedSearchDelivery.__table__.insert(), deliveries)
+            last = docs[-1].change_seq
+            await db.execute(
+                update(ChangeSequence).where(ChangeSequence.name == CHECKPOINT).values(value=last)
+            )
+            await db.commit()
+        self.checkpoint = last
+        self.batches += 1
+        if deliveries and self.on_matches is not None:
+            self.on_matches()
+        return len(docs)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Percolator started: %s saved searches", len(self.specs))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            seen = data_version.value
+            try:
+                while await self.run_once() >= self.batch_size:
+                    pass
+            except Exception:
+                self.failed_batches += 1
+                logger.exception("Percolation batch failed")
+            await data_version.wait_for_change(seen, IDLE_RECHECK_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "running": self.running,
+            "saved_searches": len(self.specs),
+            "anchors": len(self.buckets),
+            "checkpoint": self.checkpoint,
+            "vacancies": self.vacancies,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "avg_candidates": round(self.candidates / self.vacancies, 2) if self.vacancies else 0.0,
+            "matched": self.matched,
+            "avg_match_ms": round(self.match_seconds / self.vacancies * 1000, 4) if self.vacancies else 0.0,
+        }
+
+
+percolator = Percolator()
+
+on_outer_commit(PENDING_KEY, percolator._promote)
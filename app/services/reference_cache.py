@@ -0,0 +1,142 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import on_outer_commit
+from app.models.company import Company
+from app.models.experience import Experience
+from app.models.skill import Skill
+from app.models.work_format import WorkFormat
+from app.models.work_schedule import WorkSchedule
+
+logger = logging.getLogger(__name__)
+
+# Ключ в Session.info: id, полученные в ещё не закоммиченной транзакции
+PENDING_KEY = "reference_cache_pending"
+
+
+class _LRU:
+    def __init__(self, max_size: Optional[int]):
+        self.max_size = max_size
+        self.items: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str) -> Optional[int]:
+        value = self.items.get(name)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.items.move_to_end(name)
+        return value
+
+    def put(self, name: str, value: int) -> None:
+        self.items[name] = value
+        self.items.move_to_end(name)
+        if self.max_size is not None:
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.items),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class ReferenceCache:
+    """
+    Кэш name -> id справочников (компании, опыт, форматы, графики, навыки)
+    на всё время жизни процесса.
+
+    Id, полученные внутри транзакции, до commit видны только этой сессии:
+    после commit они попадают в общий кэш, после rollback отбрасываются.
+    """
+
+    def __init__(self):
+        # Маленькие справочники без ограничения, большие - LRU
+        self.tables = {
+            Company.__tablename__: (Company.company_id, Company.name),
+            Experience.__tablename__: (Experience.experience_id, Experience.name),
+            WorkFormat.__tablename__: (WorkFormat.work_format_id, WorkFormat.name),
+            WorkSchedule.__tablename__: (WorkSchedule.work_schedule_id, WorkSchedule.name),
+            Skill.__tablename__: (Skill.skill_id, Skill.name),
+        }
+        limits = {
+            Company.__tablename__: settings.REFERENCE_CACHE_MAX_COMPANIES,
+            Skill.__tablename__: settings.REFERENCE_CACHE_MAX_SKILLS,
+        }
+        self._caches = {table: _LRU(limits.get(table)) for table in self.tables}
+        self.invalidations = 0
+
+    def lookup(self, db: AsyncSession, table: str, names: Iterable[str]) -> Dict[str, int]:
+        """Найденные в кэше id; сначала смотрим незакоммиченные id этой сессии"""
+        pending = db.sync_session.info.get(PENDING_KEY, {}).get(table, {})
+        cache = self._caches[table]
+        found = {}
+        for name in names:
+            value = pending.get(name)
+            if value is None:
+                value = cache.get(name)
+            if value is not None:
+                found[name] = value
+        return found
+
+    def remember(self, db: AsyncSession, table: str, ids: Dict[str, int]) -> None:
+        """Запомнить id до commit текущей транзакции"""
+        if not ids:
+            return
+        pending = db.sync_session.info.setdefault(PENDING_KEY, {})
+        pending.setdefault(table, {}).update(ids)
+
+    def invalidate(self, table: Optional[str] = None, name: Optional[str] = None) -> None:
+        self.invalidations += 1
+        tables = [table] if table else list(self._caches)
+        for key in tables:
+            cache = self._caches[key]
+            if name is None:
+                cache.items.clear()
+            else:
+                cache.items.pop(name, None)
+
+    def _promote(self, pending: Dict[str, Dict[str, int]]) -> None:
+        for table, ids in pending.items():
+            cache = self._caches[table]
+            for name, value in ids.items():
+                cache.put(name, value)
+
+    async def warm(self, db: AsyncSession) -> None:
+        """Загрузить справочники при старте (большие - в пределах лимита)"""
+        for table, (id_column, name_column) in self.tables.items():
+            cache = self._caches[table]
+            query = select(id_column, name_column).order_by(id_column.desc())
+            if cache.max_size is not None:
+                query = query.limit(cache.max_size)
+            result = await db.execute(query)
+            # Самые старые id загружаем последними - при дублях имени побеждает меньший id
+            for value, name in result:
+                cache.put(name, value)
+        logger.info(
+            "Reference cache warmed: %s",
+            {table: len(cache.items) for table, cache in self._caches.items()},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "invalidations": self.invalidations,
+            "tables": {table: cache.stats() for table, cache in self._caches.items()},
+        }
+
+
+reference_cache = ReferenceCache()
+
+on_outer_commit(PENDING_KEY, reference_cache._promote)
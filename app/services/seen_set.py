@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import math
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.vacancy import Vacancy
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Bloom-фильтр на bytearray с двойным хэшированием (blake2b)"""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = max(1, capacity)
+        self.fp_rate = fp_rate
+        self.size = max(8, int(math.ceil(-self.capacity * math.log(fp_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / self.capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def estimated_fp_rate(self) -> float:
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+
+class SeenSet:
+    """
+    Уже загруженные вакансии (по source_url) для отсева до парсинга и БД.
+
+    Bloom-фильтр помнит все URL, точный LRU - последние `lru_size`.
+    Вакансия считается известной, только если её подтвердил LRU; ответ
+    фильтра "возможно" без подтверждения - ложное срабатывание или
+    вытесненная запись, такая вакансия проходит дальше (upsert идемпотентен).
+    """
+
+    def __init__(
+        self,
+        capacity: int = settings.SEEN_SET_CAPACITY,
+        fp_rate: float = settings.SEEN_SET_FP_RATE,
+        lru_size: int = settings.SEEN_SET_LRU_SIZE,
+    ):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.lru_size = max(1, lru_size)
+        self.bloom = BloomFilter(capacity, fp_rate)
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self.loaded = False
+
+        self.lookups = 0
+        self.bloom_negative = 0
+        self.confirmed = 0
+        self.unconfirmed = 0
+
+    def __len__(self) -> int:
+        return self.bloom.count
+
+    def add(self, key: str) -> None:
+        if not key:
+            return
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            return
+        self.bloom.add(key)
+        self._lru[key] = None
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        self.lookups += 1
+        if not key or key not in self.bloom:
+            self.bloom_negative += 1
+            return False
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.confirmed += 1
+            return True
+        self.unconfirmed += 1
+        return False
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Заполнить из БД стримингом одной колонки"""
+        total = (await db.execute(select(func.count(Vacancy.vacancy_id)))).scalar() or 0
+        # Запас по ёмкости, чтобы доля ложных срабатываний не росла сразу после старта
+        capacity = max(self.capacity, total * 2)
+        self.bloom = BloomFilter(capacity, self.fp_rate)
+        self._lru.clear()
+        result = await db.stream_scalars(
+            select(Vacancy.source_url).order_by(Vacancy.vacancy_id)
+        )
+        async for source_url in result:
+            self.add(source_url)
+        self.loaded = True
+        logger.info(
+            "Seen-set rebuilt: %s urls, bloom=%s KiB k=%s",
+            len(self), len(self.bloom.bits) // 1024, self.bloom.hash_count,
+        )
+
+    def _lru_bytes(self) -> int:
+        # Оценка: строки ключей плюс накладные расходы OrderedDict на запись
+        keys = sum(sys.getsizeof(key) for key in self._lru)
+        return keys + sys.getsizeof(self._lru) + len(self._lru) * 100
+
+    def stats(self) -> Dict[str, Any]:
+        bloom_positive = self.confirmed + self.unconfirmed
+        return {
+            "loaded": self.loaded,
+            "entries": len(self),
+            "lru_entries": len(self._lru),
+            "lru_size": self.lru_size,
+            "bloom_capacity": self.bloom.capacity,
+            "bloom_hashes": self.bloom.hash_count,
+            "bloom_bytes": len(self.bloom.bits),
+            "lru_bytes": self._lru_bytes(),
+            "lookups": self.lookups,
+            "bloom_negative": self.bloom_negative,
+            "confirmed": self.confirmed,
+            "unconfirmed": self.unconfirmed,
+            "estimated_fp_rate": round(self.bloom.estimated_fp_rate(), 6),
+            # Доля "возможно" от фильтра без подтверждения LRU: ложные
+            # срабатывания плюс вытесненные из LRU записи
+            "unconfirmed_rate": round(self.unconfirmed / bloom_positive, 6) if bloom_positive else 0.0,
+        }
+
+
+seen_set = SeenSet()
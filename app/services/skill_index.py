@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, false, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from app.core.config import settings
+from app.core.database import on_outer_commit
+from app.models.vacancy import Vacancy
+from app.models.vacancy_skill import VacancySkill
+
+try:
+    from pyroaring import BitMap
+except ImportError:  # pyroaring необязателен
+    BitMap = None
+
+logger = logging.getLogger(__name__)
+
+# Ключ в Session.info: изменения связей навыков до commit
+PENDING_KEY = "skill_index_pending"
+
+
+class IntBitmap:
+    """Битовое множество id на int - замена pyroaring, если он не установлен"""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, ids: Iterable[int] = ()):
+        ids = list(ids)
+        if not ids:
+            self.bits = 0
+            return
+        raw = bytearray(max(ids) // 8 + 1)
+        for value in ids:
+            raw[value >> 3] |= 1 << (value & 7)
+        self.bits = int.from_bytes(raw, "little")
+
+    @classmethod
+    def _wrap(cls, bits: int) -> "IntBitmap":
+        bitmap = cls()
+        bitmap.bits = bits
+        return bitmap
+
+    def add(self, value: int) -> None:
+        self.bits |= 1 << value
+
+    def discard(self, value: int) -> None:
+        self.bits &= ~(1 << value)
+
+    def __and__(self, other: "IntBitmap") -> "IntBitmap":
+        return self._wrap(self.bits & other.bits)
+
+    def __or__(self, other: "IntBitmap") -> "IntBitmap":
+        return self._wrap(self.bits | other.bits)
+
+    def __isub__(self, other: "IntBitmap") -> "IntBitmap":
+        self.bits &= ~other.bits
+        return self
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __iter__(self):
+        # Поиск единиц в строковом представлении идёт в C, а не побитово
+        digits = bin(self.bits)[:1:-1]
+        position = digits.find("1")
+        while position != -1:
+            yield position
+            position = digits.find("1", position + 1)
+
+    def __sizeof__(self) -> int:
+        return sys.getsizeof(self.bits)
+
+
+def _bitmap(ids: Iterable[int] = ()):
+    return BitMap(ids) if BitMap is not None else IntBitmap(ids)
+
+
+def _bitmap_bytes(bitmap) -> int:
+    return len(bitmap.serialize()) if BitMap is not None else sys.getsizeof(bitmap)
+
+
+class SkillIndex:
+    """
+    Инвертированный индекс навык -> битовая карта id вакансий.
+
+    Фильтр по нескольким навыкам (все / любой) считается пересечением или
+    объединением карт в памяти и передаётся в SQL списком id. Если
+    совпадений больше `max_in_ids` или индекс не загружен, фильтр
+    выполняется одним подзапросом к vacancy_skills.
+
+    Свои изменения индекс получает после commit (stage), а записи других
+    процессов (Celery, второй воркер) - по версии: `version` - наибольший
+    vacancies.change_seq, учтённый в индексе. Перед фильтром
+    ensure_current сравнивает его с БД и перечитывает связи изменившихся
+    вакансий; если их больше `max_refresh`, индекс строится заново.
+    """
+
+    def __init__(
+        self,
+        max_in_ids: int = settings.SKILL_INDEX_MAX_IN_IDS,
+        max_refresh: int = settings.SKILL_INDEX_MAX_REFRESH,
+    ):
+        self.max_in_ids = max_in_ids
+        self.max_refresh = max_refresh
+        self.postings: Dict[int, Any] = {}
+        self.loaded = False
+        self.version = 0
+        self._refresh_lock = asyncio.Lock()
+
+        self.refreshes = 0
+        self.reloads = 0
+
+        self.queries = 0
+        self.sql_fallbacks = 0
+        self.match_seconds = 0.0
+
+    @property
+    def backend(self) -> str:
+        return "pyroaring" if BitMap is not None else "int"
+
+    @staticmethod
+    async def _db_version(db: AsyncSession) -> int:
+        return (await db.execute(select(func.max(Vacancy.change_seq)))).scalar() or 0
+
+    async def load(self, db: AsyncSession) -> None:
+        """Построить индекс по vacancy_skills (стримингом)"""
+        # Версию читаем до связей: изменения во время загрузки догонит ensure_current
+        version = await self._db_version(db)
+        grouped: Dict[int, List[int]] = {}
+        result = await db.stream(select(VacancySkill.skill_id, VacancySkill.vacancy_id))
+        async for skill_id, vacancy_id in result:
+            grouped.setdefault(skill_id, []).append(vacancy_id)
+        self.postings = {skill_id: _bitmap(ids) for skill_id, ids in grouped.items()}
+        self.version = version
+        self.loaded = True
+        logger.info(
+            "Skill index loaded: %s skills, %s links (%s)",
+            len(self.postings), sum(len(ids) for ids in grouped.values()), self.backend,
+        )
+
+    async def ensure_current(self, db: AsyncSession, skill_ids: Optional[List[int]] = None) -> None:
+        """Догнать записи других процессов перед фильтром по skill_ids"""
+        if not skill_ids or not self.loaded:
+            return
+        version = await self._db_version(db)
+        if version <= self.version:
+            return
+        async with self._refresh_lock:
+            if version <= self.version:
+                return
+            changed_ids = (
+                await db.execute(
+                    select(Vacancy.vacancy_id).where(
+                        Vacancy.change_seq > self.version, Vacancy.change_seq <= version
+                    )
+                )
+            ).scalars().all()
+            if len(changed_ids) > self.max_refresh:
+                self.reloads += 1
+                await self.load(db)
+                return
+            links = []
+            for chunk_start in range(0, len(changed_ids), 500):
+                chunk = changed_ids[chunk_start:chunk_start + 500]
+                links.extend(
+                    (
+                        await db.execute(
+                            select(VacancySkill.skill_id, VacancySkill.vacancy_id)
+                            .where(VacancySkill.vacancy_id.in_(chunk))
+                        )
+                    ).all()
+                )
+            # Старые связи изменившихся вакансий неизвестны - убираем их из всех карт
+            changed = _bitmap(changed_ids)
+            for bitmap in self.postings.values():
+                bitmap -= changed
+            self.add(links)
+            self.version = version
+            self.refreshes += 1
+            logger.debug(
+                "Skill index refreshed to version %s: %s vacancies, %s links",
+                version, len(changed_ids), len(links),
+            )
+
+    def add(self, links: Iterable[Tuple[int, int]]) -> None:
+        for skill_id, vacancy_id in links:
+            bitmap = self.postings.get(skill_id)
+            if bitmap is None:
+                bitmap = self.postings[skill_id] = _bitmap()
+            bitmap.add(vacancy_id)
+
+    def remove(self, links: Iterable[Tuple[int, int]]) -> None:
+        for skill_id, vacancy_id in links:
+            bitmap = self.postings.get(skill_id)
+            if bitmap is not None:
+                bitmap.discard(vacancy_id)
+
+    def stage(
+        self,
+        db: AsyncSession,
+        added: Iterable[Tuple[int, int]] = (),
+        removed: Iterable[Tuple[int, int]] = (),
+    ) -> None:
+        """Изменения (skill_id, vacancy_id) применяются к индексу после commit"""
+        pending = db.sync_session.info.setdefault(PENDING_KEY, {"added": [], "removed": []})
+        pending["removed"].extend(removed)
+        pending["added"].extend(added)
+
+    def _promote(self, pending: Dict[str, list]) -> None:
+        if self.loaded:
+            self.remove(pending["removed"])
+            self.add(pending["added"])
+
+    def match(self, skill_ids: List[int], match_all: bool = True):
+        """Карта вакансий с навыками; None, если индекс не загружен"""
+        if not self.loaded:
+            return None
+        t0 = time.perf_counter()
+        empty = _bitmap()
+        bitmaps = [self.postings.get(skill_id, empty) for skill_id in dict.fromkeys(skill_ids)]
+        # Пересечение начинаем с самой короткой карты
+        bitmaps.sort(key=len)
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            if match_all and not result:
+                break
+            result = result & bitmap if match_all else result | bitmap
+        self.queries += 1
+        self.match_seconds += time.perf_counter() - t0
+        return result
+
+    def condition(self, skill_ids: List[int], match_all: bool = True) -> ColumnElement:
+        """Условие на Vacancy.vacancy_id для фильтра по навыкам"""
+        matched = self.match(skill_ids, match_all)
+        if matched is not None and len(matched) <= self.max_in_ids:
+            if not matched:
+                return false()
+            # Значения встраиваются в SQL: у SQLite лимит на число параметров
+            return Vacancy.vacancy_id.in_(
+                bindparam("skill_vacancy_ids", list(matched), expanding=True, literal_execute=True)
+            )
+        self.sql_fallbacks += 1
+        unique_ids = list(dict.fromkeys(skill_ids))
+        subquery = select(VacancySkill.vacancy_id).where(VacancySkill.skill_id.in_(unique_ids))
+        if match_all:
+            subquery = subquery.group_by(VacancySkill.vacancy_id).having(
+                func.count(VacancySkill.skill_id) == len(unique_ids)
+            )
+        return Vacancy.vacancy_id.in_(subquery)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "backend": self.backend,
+            "version": self.version,
+            "refreshes": self.refreshes,
+            "reloads": self.reloads,
+            "skills": len(self.postings),
+            "links": sum(len(bitmap) for bitmap in self.postings.values()),
+            "memory_bytes": sum(_bitmap_bytes(bitmap) for bitmap in self.postings.values()),
+            "queries": self.queries,
+            "sql_fallbacks": self.sql_fallbacks,
+            "avg_match_ms": round(self.match_seconds / self.queries * 1000, 4) if self.queries else 0.0,
+        }
+
+
+skill_index = SkillIndex()
+
+on_outer_commit(PENDING_KEY, skill_index._promote)
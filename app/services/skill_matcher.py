@@ -0,0 +1,189 @@
+import logging
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.skill import Skill
+
+logger = logging.getLogger(__name__)
+
+# Навыки, которые ищутся до загрузки справочника из БД
+DEFAULT_SKILLS = [
+    "Python", "JavaScript", "Java", "SQL", "Docker",
+    "Kubernetes", "React", "Vue", "AWS", "Git",
+]
+
+# Синонимы: каноническое название (в нижнем регистре) -> варианты написания
+SKILL_SYNONYMS: Dict[str, List[str]] = {
+    "javascript": ["js", "java script"],
+    "typescript": ["ts"],
+    "kubernetes": ["k8s"],
+    "postgresql": ["postgres", "постгрес"],
+    "python": ["питон"],
+    "golang": ["go lang"],
+    "react": ["react.js", "reactjs"],
+    "vue": ["vue.js", "vuejs"],
+    "node.js": ["nodejs", "node js"],
+    "c#": ["с#"],
+    "1с": ["1c"],
+    "machine learning": ["ml", "машинное обучение"],
+}
+
+
+# Короче этой длины шаблон ищется только из списка SHORT_SKILLS и строже:
+# с учётом регистра и без соседних "&", "-", апострофов ("R&D", "C-level")
+MIN_PATTERN_LENGTH = 3
+SHORT_SKILLS = {"c", "c#", "с#", "r", "go", "js", "ts", "1с", "1c", "ml", "qa", "qt", "ui", "ux", "bi"}
+_SHORT_JOINERS = "&-'’@+#"
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _is_short_boundary(ch: str) -> bool:
+    return not _is_word_char(ch) and ch not in _SHORT_JOINERS
+
+
+class SkillMatcher:
+    """
+    Поиск навыков в тексте автоматом Ахо-Корасик.
+
+    Текст проходится один раз независимо от размера словаря; совпадение
+    засчитывается только на границах слова ("Java" не находится внутри
+    "JavaScript"). Короткие названия (R, C, Go) ищутся только из
+    SHORT_SKILLS, в написании как есть или заглавными, чтобы "go" или
+    "R&D" в обычном тексте не давали навык.
+
+    Новые навыки добавляются в бор сразу, а ссылки неудач после этого
+    пересчитываются для всего бора заново - лениво, при следующем поиске.
+    """
+
+    def __init__(self, skills: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Собственные шаблоны узла: (длина, канонич. имя, является ли синонимом,
+        # допустимые написания для короткого шаблона или None)
+        self._own: List[Optional[Tuple[int, str, bool, Optional[FrozenSet[str]]]]] = [None]
+        self._out: List[List[Tuple[int, str, Optional[FrozenSet[str]]]]] = [[]]
+        self._names: Dict[str, str] = {}
+        self._dirty = False
+        self.loaded = False
+        for name in skills:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name.strip().lower() in self._names
+
+    def _insert(self, pattern: str, canonical: str, synonym: bool) -> None:
+        key = pattern.lower()
+        spellings = None
+        if len(key) < MIN_PATTERN_LENGTH:
+            if key not in SHORT_SKILLS:
+                return
+            spellings = frozenset((pattern, pattern.upper()))
+        node = 0
+        for ch in key:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append(None)
+                self._out.append([])
+            node = next_node
+        current = self._own[node]
+        # Точное название навыка важнее синонима
+        if current is None or (current[2] and not synonym):
+            self._own[node] = (len(key), canonical, synonym, spellings)
+            self._dirty = True
+
+    def add(self, name: str) -> None:
+        if not name or not name.strip():
+            return
+        canonical = name.strip()
+        key = canonical.lower()
+        if key in self._names:
+            return
+        self._names[key] = canonical
+        self._insert(canonical, canonical, synonym=False)
+        for synonym in SKILL_SYNONYMS.get(key, []):
+            self._insert(synonym, canonical, synonym=True)
+
+    def add_many(self, names: Iterable[str]) -> None:
+        for name in names:
+            self.add(name)
+
+    def _build(self) -> None:
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+        self._out[0] = []
+        while queue:
+            node = queue.popleft()
+            own = self._own[node]
+            out = [(own[0], own[1], own[3])] if own else []
+            out.extend(self._out[self._fail[node]])
+            self._out[node] = out
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(ch, 0)
+                self._fail[child] = candidate if candidate != child else 0
+                queue.append(child)
+        self._dirty = False
+
+    def extract(self, text: str) -> List[str]:
+        """Навыки в порядке первого упоминания, без повторов"""
+        if not text or not self._names:
+            return []
+        if self._dirty:
+            self._build()
+
+        lowered = text.lower()
+        size = len(lowered)
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Dict[str, None] = {}
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            for length, canonical, spellings in out[node]:
+                start = i - length + 1
+                if spellings is not None:
+                    if (
+                        text[start:i + 1] not in spellings
+                        or (start > 0 and not _is_short_boundary(text[start - 1]))
+                        or (i + 1 < size and not _is_short_boundary(text[i + 1]))
+                    ):
+                        continue
+                    found.setdefault(canonical, None)
+                    continue
+                if start > 0 and _is_word_char(lowered[start - 1]) and _is_word_char(lowered[start]):
+                    continue
+                if i + 1 < size and _is_word_char(lowered[i + 1]) and _is_word_char(lowered[i]):
+                    continue
+                found.setdefault(canonical, None)
+        return list(found)
+
+    async def load(self, db: AsyncSession) -> None:
+        """Загрузить справочник навыков из БД (стримингом по одной колонке)"""
+        result = await db.stream_scalars(select(Skill.name))
+        async for name in result:
+            self.add(name)
+        self.loaded = True
+        logger.info("Skill matcher loaded: %s skills", len(self))
+
+
+skill_matcher = SkillMatcher(DEFAULT_SKILLS)
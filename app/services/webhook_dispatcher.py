@@ -0,0 +1,337 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp.abc import ResolveResult
+from aiohttp.resolver import DefaultResolver
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Row, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.http_client import create_client_session
+from app.models.company import Company
+from app.models.saved_search import SavedSearch, SavedSearchDelivery, SavedSearchMatch
+from app.models.vacancy import Vacancy
+from app.schemas.saved_search import SavedSearchHit
+
+logger = logging.getLogger(__name__)
+
+# Верхняя граница паузы между повторами доставки
+MAX_BACKOFF_SECONDS = 3600.0
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+TIMESTAMP_HEADER = "X-Webhook-Timestamp"
+
+
+class WebhookTargetError(OSError):
+    """Адрес webhook ведёт во внутреннюю сеть"""
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def webhook_target_error(url: str) -> Optional[str]:
+    """
+    Причина, по которой на адрес нельзя слать webhook, или None.
+    Проверяются схема и адрес, записанный в URL; имя хоста проверяет
+    PublicResolver при каждом соединении.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return "Webhook URL must be an absolute http(s) URL"
+    if settings.SAVED_SEARCH_WEBHOOK_ALLOW_PRIVATE:
+        return None
+    host = parts.hostname.rstrip(".").lower()
+    if host == "localhost" or host.endswith(".localhost"):
+        return "Webhook URL must not point to localhost"
+    try:
+        public = _is_public(host)
+    except ValueError:
+        return None
+    return None if public else "Webhook URL must not point to a private or loopback address"
+
+
+class PublicResolver(DefaultResolver):
+    """Резолвер, который не отдаёт частные, loopback и link-local адреса"""
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> List[ResolveResult]:
+        hosts = await super().resolve(host, port, family)
+        if not settings.SAVED_SEARCH_WEBHOOK_ALLOW_PRIVATE:
+            blocked = [entry["host"] for entry in hosts if not _is_public(entry["host"])]
+            if blocked:
+                raise WebhookTargetError(f"{host} resolves to non-public address {blocked[0]}")
+        return hosts
+
+
+def webhook_secret(saved_search_id: int) -> str:
+    """Ключ подписи доставок поиска; выводится из SECRET_KEY, у каждого поиска свой"""
+    return hmac.new(
+        settings.SECRET_KEY.encode(), f"saved-search-webhook:{saved_search_id}".encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def sign_payload(secret: str, timestamp: str, body: bytes) -> str:
+    """Подпись тела: HMAC-SHA256 от "<timestamp>.<body>" """
+    digest = hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256)
+    return f"sha256={digest.hexdigest()}"
+
+
+class WebhookDispatcher:
+    """
+    Доставка совпадений сохранённых поисков на webhook.
+
+    Очередь - таблица saved_search_deliveries, поэтому недоставленное
+    переживает рестарт. Совпадения одного поиска уходят одним POST пачкой
+    до `batch_size` вакансий; при ошибке пачка повторяется с
+    экспоненциальной паузой, после `max_attempts` попыток отбрасывается.
+
+    Поиски обслуживаются параллельно (не больше `concurrency`), на один
+    хост - не больше SAVED_SEARCH_WEBHOOK_PER_HOST соединений. Адреса во
+    внутренней сети отвергаются и при записи, и при соединении, редиректы
+    не выполняются, тело подписывается ключом поиска (webhook_secret).
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.SAVED_SEARCH_WEBHOOK_BATCH_SIZE,
+        interval: float = settings.SAVED_SEARCH_WEBHOOK_INTERVAL_SECONDS,
+        max_attempts: int = settings.SAVED_SEARCH_WEBHOOK_MAX_ATTEMPTS,
+        concurrency: int = settings.SAVED_SEARCH_WEBHOOK_CONCURRENCY,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.max_attempts = max(1, max_attempts)
+        self.concurrency = max(1, concurrency)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.posts = 0
+        self.delivered = 0
+        self.failed_posts = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Webhook dispatcher started: batch_size=%s", self.batch_size)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def wake(self) -> None:
+        """Есть новые доставки - не ждать конца интервала"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.interval * 2 ** attempts, MAX_BACKOFF_SECONDS))
+
+    def _client(self) -> aiohttp.ClientSession:
+        # Своя сессия: резолвер с проверкой адресов и лимит соединений на хост
+        if self._session is None or self._session.closed:
+            self._session = create_client_session(
+                limit_per_host=settings.SAVED_SEARCH_WEBHOOK_PER_HOST,
+                resolver=PublicResolver(),
+            )
+        return self._session
+
+    async def _post(self, url: str, secret: str, payload: Dict[str, Any]) -> bool:
+        error = webhook_target_error(url)
+        if error:
+            logger.warning("Webhook %s refused: %s", url, error)
+            self.failed_posts += 1
+            return False
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            TIMESTAMP_HEADER: timestamp,
+            SIGNATURE_HEADER: sign_payload(secret, timestamp, body),
+        }
+        self.posts += 1
+        try:
+            async with self._client().post(url, data=body, headers=headers, allow_redirects=False) as response:
+                if 200 <= response.status < 300:
+                    return True
+                logger.warning("Webhook %s answered %s", url, response.status)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            logger.warning("Webhook %s failed: %s", url, exc)
+        self.failed_posts += 1
+        return False
+
+    async def _deliver(self, db: AsyncSession, search: Row, now: datetime) -> int:
+        rows = (
+            await db.execute(
+                select(
+                    SavedSearchDelivery.delivery_id,
+                    SavedSearchDelivery.attempts,
+                    SavedSearchMatch.change_seq,
+                    SavedSearchMatch.matched_at,
+                    Vacancy.vacancy_id,
+                    Vacancy.title,
+                    Company.name,
+                    Vacancy.salary_from,
+                    Vacancy.salary_to,
+                    Vacancy.currency,
+                    Vacancy.location,
+                    Vacancy.published_date,
+                    Vacancy.source_url,
+                )
+                .join(Vacancy, Vacancy.vacancy_id == SavedSearchDelivery.vacancy_id)
+                .join(
+                    SavedSearchMatch,
+                    (SavedSearchMatch.saved_search_id == SavedSearchDelivery.saved_search_id)
+                    & (SavedSearchMatch.vacancy_id == SavedSearchDelivery.vacancy_id),
+                )
+                .outerjoin(Company, Company.company_id == Vacancy.company_id)
+                .where(
+                    SavedSearchDelivery.saved_search_id == search.saved_search_id,
+                    SavedSearchDelivery.next_attempt_at <= now,
+                )
+                .order_by(SavedSearchDelivery.delivery_id)
+                .limit(self.batch_size)
+            )
+        ).all()
+        if not rows:
+            return 0
+        ids = [row.delivery_id for row in rows]
+        payload = {
+            "saved_search_id": search.saved_search_id,
+            "name": search.name,
+            "matches": jsonable_encoder(
+                [
+                    SavedSearchHit(
+                        vacancy_id=row.vacancy_id,
+                        seq=row.change_seq,
+                        matched_at=row.matched_at,
+                        title=row.title,
+                        company=row.name,
+                        salary_from=row.salary_from,
+                        salary_to=row.salary_to,
+                        currency=row.currency,
+                        location=row.location,
+                        published_date=row.published_date,
+                        url=row.source_url,
+                    ).model_dump(exclude={"is_read"})
+                    for row in rows
+                ]
+            ),
+        }
+        if (
+            search.webhook_url
+            and search.is_active
+            and await self._post(search.webhook_url, webhook_secret(search.saved_search_id), payload)
+        ):
+            await db.execute(delete(SavedSearchDelivery).where(SavedSearchDelivery.delivery_id.in_(ids)))
+            self.delivered += len(ids)
+            return len(ids)
+
+        attempts = max(row.attempts for row in rows) + 1
+        if attempts >= self.max_attempts or not search.webhook_url or not search.is_active:
+            await db.execute(delete(SavedSearchDelivery).where(SavedSearchDelivery.delivery_id.in_(ids)))
+            self.dropped += len(ids)
+            logger.warning(
+                "Dropped %s webhook deliveries of saved search %s", len(ids), search.saved_search_id
+            )
+        else:
+            await db.execute(
+                update(SavedSearchDelivery)
+                .where(SavedSearchDelivery.delivery_id.in_(ids))
+                .values(attempts=attempts, next_attempt_at=now + self._backoff(attempts))
+            )
+        return 0
+
+    async def run_once(self) -> int:
+        """Одна пачка на каждый поиск с подошедшими доставками"""
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            searches = (
+                await db.execute(
+                    select(
+                        SavedSearch.saved_search_id,
+                        SavedSearch.name,
+                        SavedSearch.webhook_url,
+                        SavedSearch.is_active,
+                    ).where(
+                        SavedSearch.saved_search_id.in_(
+                            select(SavedSearchDelivery.saved_search_id)
+                            .where(SavedSearchDelivery.next_attempt_at <= now)
+                            .distinct()
+                        )
+                    )
+                )
+            ).all()
+        if not searches:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(search: Row) -> int:
+            async with semaphore:
+                # Своя сессия и коммит на каждый поиск: отправленное не уйдёт повторно
+                async with AsyncSessionLocal() as db:
+                    delivered = await self._deliver(db, search, now)
+                    await db.commit()
+                    return delivered
+
+        results = await asyncio.gather(*(deliver(search) for search in searches), return_exceptions=True)
+        for search, result in zip(searches, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    "Webhook delivery of saved search %s failed", search.saved_search_id, exc_info=result
+                )
+        return sum(result for result in results if isinstance(result, int))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Webhook delivery failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "posts": self.posts,
+            "delivered": self.delivered,
+            "failed_posts": self.failed_posts,
+            "dropped": self.dropped,
+        }
+
+
+webhook_dispatcher = WebhookDispatcher()
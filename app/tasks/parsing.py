@@ -1,7 +1,9 @@
+from contextlib import aclosing
 from celery import shared_task
 from app.services.parsers.hh_parser import HHParser
 from app.core.database import AsyncSessionLocal
-from app.crud.vacancy import vacancy_crud
+from app.services.ingestion_queue import IngestionQueue
+from app.services.skill_matcher import skill_matcher
 
 @shared_task
 def parse_hh_vacancies(search_query: str):
@@ -9,18 +11,16 @@ def parse_hh_vacancies(search_query: str):
     parser = HHParser()
     
     async def parse():
-        async with parser:
-            vacancies_data = await parser.parse_vacancies(search_query, limit=50)
-            
+        if not skill_matcher.loaded:
             async with AsyncSessionLocal() as db:
-                for vacancy_data in vacancies_data:
-                    source_url = vacancy_data.get("source_url")
-                    if not source_url:
-                        continue
-                    existing = await vacancy_crud.get_by_source_url(db, source_url)
-                    if not existing:
-                        await vacancy_crud.create_from_parsed(db, vacancy_data, commit=False)
-                await db.commit()
+                await skill_matcher.load(db)
+
+        # У воркера свой цикл событий - и своя очередь с писателем
+        async with parser, IngestionQueue() as queue:
+            batches = parser.iter_batches(search_query, limit=50)
+            async with aclosing(batches) as stream:
+                async for batch in stream:
+                    await queue.submit(batch)
     
     # Запускаем асинхронную функцию
     import asyncio
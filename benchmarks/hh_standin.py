@@ -0,0 +1,364 @@
+"""
+Локальная замена API hh.ru для офлайн-бенчмарков парсера и загрузки.
+
+Отдаёт /vacancies (поиск с пагинацией) и /vacancies/{id} из одного из
+источников:
+
+    # синтетические вакансии
+    python -m benchmarks.hh_standin --synthetic 10000 --port 8099
+
+    # воспроизведение записанных ответов
+    python -m benchmarks.hh_standin --replay recordings/
+
+    # запись: проксирование в настоящий API с сохранением ответов
+    python -m benchmarks.hh_standin --record recordings/ --upstream https://api.hh.ru
+
+Задержка, доля ошибок 5xx и ответы 429 настраиваются флагами. Затем
+приложение или бенчмарк направляется на заглушку:
+
+    HH_API_URL=http://127.0.0.1:8099 python run.py
+
+Счётчики запросов: GET /__stats.
+"""
+import argparse
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+HH_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+MAX_PER_PAGE = 100
+MAX_DEPTH = 2000
+
+TITLES = [
+    "Python-разработчик", "Backend-разработчик (Python)", "Java-разработчик",
+    "Frontend-разработчик (React)", "Data Engineer", "DevOps-инженер",
+    "QA Automation Engineer", "Go-разработчик", "Аналитик данных",
+    "Fullstack-разработчик", "ML-инженер", "Системный аналитик",
+]
+COMPANIES = [
+    "Яндекс", "Сбер", "Тинькофф", "VK", "Ozon", "Авито", "Kaspersky",
+    "МТС", "X5 Tech", "Wildberries", "Контур", "Positive Technologies",
+]
+AREAS = [(1, "Москва"), (2, "Санкт-Петербург"), (3, "Екатеринбург"), (4, "Новосибирск")]
+SKILLS = [
+    "Python", "FastAPI", "Django", "PostgreSQL", "Docker", "Kubernetes", "Java",
+    "Spring Boot", "Kafka", "React", "TypeScript", "Go", "Redis", "SQL", "Git",
+    "Airflow", "Spark", "ClickHouse", "Linux", "CI/CD",
+]
+EXPERIENCES = [
+    ("noExperience", "Нет опыта"), ("between1And3", "От 1 года до 3 лет"),
+    ("between3And6", "От 3 до 6 лет"), ("moreThan6", "Более 6 лет"),
+]
+SCHEDULES = [
+    ("fullDay", "Полный день"), ("remote", "Удаленная работа"),
+    ("flexible", "Гибкий график"), ("shift", "Сменный график"),
+]
+
+
+class StandinConfig:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+
+
+def synthetic_vacancy(vacancy_id: int, base_time: datetime) -> Dict[str, Any]:
+    """Детерминированная вакансия в формате /vacancies/{id}"""
+    rnd = random.Random(vacancy_id)
+    title = rnd.choice(TITLES)
+    company_index = rnd.randrange(len(COMPANIES) * 20)
+    company = COMPANIES[company_index % len(COMPANIES)]
+    if company_index >= len(COMPANIES):
+        company = f"{company} {company_index // len(COMPANIES)}"
+    area_id, area_name = rnd.choice(AREAS)
+    experience = rnd.choice(EXPERIENCES)
+    schedule = rnd.choice(SCHEDULES)
+    skills = rnd.sample(SKILLS, rnd.randint(2, 6))
+    salary = None
+    if rnd.random() < 0.6:
+        salary_from = rnd.randrange(80, 400) * 1000
+        salary = {"from": salary_from, "to": salary_from + rnd.randrange(0, 150) * 1000,
+                  "currency": "RUR", "gross": False}
+    published = base_time - timedelta(minutes=vacancy_id)
+    description = (
+        f"<p><strong>{company}</strong> ищет специалиста в команду.</p>"
+        "<p><strong>Обязанности:</strong></p><ul>"
+        + "".join(f"<li>разработка с использованием {skill};</li>" for skill in skills[:3])
+        + "</ul><p><strong>Требования:</strong></p><ul>"
+        + "".join(f"<li>опыт работы с {skill}</li>" for skill in skills)
+        + "</ul><p><strong>Условия:</strong> ДМС, гибкий график&nbsp;и &laquo;печеньки&raquo;.</p>"
+    )
+    return {
+        "id": str(vacancy_id),
+        "name": title,
+        "area": {"id": str(area_id), "name": area_name},
+        "salary": salary,
+        "experience": {"id": experience[0], "name": experience[1]},
+        "schedule": {"id": schedule[0], "name": schedule[1]},
+        "employer": {
+            "id": str(company_index),
+            "name": company,
+            "site_url": f"https://company{company_index}.example.com",
+        },
+        "address": {"raw": f"{area_name}, ул. Тестовая, {rnd.randint(1, 200)}"},
+        "published_at": published.strftime(HH_DATE_FORMAT),
+        "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+        "description": description,
+        "key_skills": [{"name": skill} for skill in skills],
+        "snippet": {
+            "requirement": f"Опыт работы с <highlighttext>{skills[0]}</highlighttext>.",
+            "responsibility": f"Разработка сервисов на {skills[-1]}.",
+        },
+    }
+
+
+def parse_hh_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, HH_DATE_FORMAT)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def list_item(detail: Dict[str, Any]) -> Dict[str, Any]:
+    """Элемент выдачи /vacancies: без description и key_skills"""
+    return {k: v for k, v in detail.items() if k not in ("description", "key_skills")}
+
+
+class VacancyStore:
+    def __init__(self):
+        self.details: Dict[str, Dict[str, Any]] = {}
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self._ordered: Optional[List[Dict[str, Any]]] = None
+
+    def add(self, detail: Dict[str, Any], full: bool = True) -> None:
+        vacancy_id = str(detail["id"])
+        if full:
+            self.details[vacancy_id] = detail
+        self.items[vacancy_id] = list_item(detail)
+        self._ordered = None
+
+    @classmethod
+    def synthetic(cls, count: int) -> "VacancyStore":
+        store = cls()
+        base_time = datetime.now(timezone.utc).replace(microsecond=0)
+        for vacancy_id in range(1, count + 1):
+            store.add(synthetic_vacancy(vacancy_id, base_time))
+        return store
+
+    @classmethod
+    def load(cls, directory: Path) -> "VacancyStore":
+        store = cls()
+        for path in sorted((directory / "vacancies").glob("*.json")):
+            data = json.loads(path.read_text(encoding="utf-8"))
+            store.add(data, full="description" in data)
+        return store
+
+    def ordered(self) -> List[Dict[str, Any]]:
+        if self._ordered is None:
+            self._ordered = sorted(
+                self.items.values(), key=lambda item: item.get("published_at") or "", reverse=True
+            )
+        return self._ordered
+
+    def search(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        items = self.ordered()
+        text = (query.get("text") or "").lower()
+        area = query.get("area")
+        date_from = query.get("date_from")
+        only_with_salary = query.get("only_with_salary") in ("true", "True", "1")
+        date_from = parse_hh_date(date_from) if date_from else None
+        result = []
+        for item in items:
+            if text and text not in item["name"].lower() and text not in json.dumps(
+                item.get("snippet"), ensure_ascii=False
+            ).lower():
+                continue
+            if area and str((item.get("area") or {}).get("id")) != area:
+                continue
+            if only_with_salary and not item.get("salary"):
+                continue
+            if date_from and parse_hh_date(item["published_at"]) < date_from:
+                continue
+            result.append(item)
+        return result
+
+
+class HHStandin:
+    def __init__(
+        self,
+        store: VacancyStore,
+        config: StandinConfig,
+        record_dir: Optional[Path] = None,
+        upstream: Optional[str] = None,
+    ):
+        self.store = store
+        self.config = config
+        self.record_dir = record_dir
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.counters = {"listing": 0, "detail": 0, "not_modified": 0, "errors": 0, "throttled": 0}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _inject(self) -> Optional[web.Response]:
+        config = self.config
+        delay = config.latency_ms + config.random.uniform(0, config.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        roll = config.random.random()
+        if roll < config.throttle_rate:
+            self.counters["throttled"] += 1
+            return web.json_response(
+                {"errors": [{"type": "too_many_requests"}]},
+                status=429,
+                headers={"Retry-After": str(config.retry_after)},
+            )
+        if roll < config.throttle_rate + config.error_rate:
+            self.counters["errors"] += 1
+            return web.json_response({"errors": [{"type": "server_error"}]}, status=503)
+        return None
+
+    def _record(self, data: Dict[str, Any]) -> None:
+        path = self.record_dir / "vacancies" / f"{data['id']}.json"
+        if "description" not in data and path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    async def _proxy(self, request: web.Request) -> web.Response:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(headers={"User-Agent": "vacancy-insight/1.0"})
+        async with self._session.get(
+            f"{self.upstream}{request.path}", params=request.query
+        ) as resp:
+            body = await resp.read()
+            if resp.status == 200:
+                data = json.loads(body)
+                for item in data.get("items", []) if "items" in data else [data]:
+                    self.store.add(item, full="description" in item)
+                    self._record(item)
+            return web.Response(body=body, status=resp.status, content_type="application/json")
+
+    async def vacancies(self, request: web.Request) -> web.Response:
+        self.counters["listing"] += 1
+        injected = await self._inject()
+        if injected is not None:
+            return injected
+        if self.upstream:
+            return await self._proxy(request)
+
+        page = int(request.query.get("page", 0))
+        per_page = min(int(request.query.get("per_page", 20)), MAX_PER_PAGE)
+        if (page + 1) * per_page > MAX_DEPTH:
+            return web.json_response({"errors": [{"type": "bad_argument"}]}, status=400)
+        found = self.store.search(request.query)
+        pages = min(-(-len(found) // per_page), MAX_DEPTH // per_page)
+        return web.json_response({
+            "items": found[page * per_page:(page + 1) * per_page],
+            "found": len(found),
+            "pages": pages,
+            "page": page,
+            "per_page": per_page,
+        })
+
+    async def vacancy(self, request: web.Request) -> web.Response:
+        self.counters["detail"] += 1
+        injected = await self._inject()
+        if injected is not None:
+            return injected
+        if self.upstream:
+            return await self._proxy(request)
+
+        vacancy_id = request.match_info["vacancy_id"]
+        detail = self.store.details.get(vacancy_id)
+        if detail is None:
+            return web.json_response({"errors": [{"type": "not_found"}]}, status=404)
+        etag = f'"{vacancy_id}-{detail.get("published_at")}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.counters["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.json_response(detail, headers={"ETag": etag})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.counters, "vacancies": len(self.store.items)})
+
+    async def _close(self, app: web.Application) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/vacancies", self.vacancies)
+        app.router.add_get("/vacancies/{vacancy_id}", self.vacancy)
+        app.router.add_get("/__stats", self.stats)
+        app.on_cleanup.append(self._close)
+        return app
+
+
+async def start_standin(
+    standin: HHStandin, host: str = "127.0.0.1", port: int = 0
+) -> Tuple[web.AppRunner, str]:
+    """Запустить заглушку в текущем event loop; возвращает runner и базовый URL"""
+    runner = web.AppRunner(standin.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    bound_port = runner.addresses[0][1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthetic", type=int, metavar="N", help="сгенерировать N вакансий")
+    source.add_argument("--replay", type=Path, metavar="DIR", help="отдавать записанные ответы")
+    source.add_argument("--record", type=Path, metavar="DIR", help="проксировать и записывать")
+    parser.add_argument("--upstream", default="https://api.hh.ru")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="доля ответов 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    config = StandinConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    if args.synthetic:
+        standin = HHStandin(VacancyStore.synthetic(args.synthetic), config)
+    elif args.replay:
+        standin = HHStandin(VacancyStore.load(args.replay), config)
+    else:
+        standin = HHStandin(VacancyStore(), config, record_dir=args.record, upstream=args.upstream)
+    print(f"hh.ru stand-in: {len(standin.store.items)} vacancies on http://{args.host}:{args.port}")
+    web.run_app(standin.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Микро-бенчмарк HTMLParser-экстрактора против BeautifulSoup.
+
+    python -m benchmarks.html_to_text [--input descriptions.json] [--number 200]
+
+`--input` - JSON-список HTML-строк либо список ответов /vacancies/{id}
+(берётся поле description). По умолчанию используется
+benchmarks/data/hh_descriptions.json.
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from app.services.parsers.html_text import html_to_text
+
+DEFAULT_INPUT = Path(__file__).resolve().parent / "data" / "hh_descriptions.json"
+
+
+def soup_to_text(html: str) -> str:
+    if not html:
+        return ""
+    return BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True)
+
+
+def load_descriptions(path: Path) -> list:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        data = data.get("items", [])
+    descriptions = []
+    for entry in data:
+        if isinstance(entry, dict):
+            entry = entry.get("description") or ""
+        descriptions.append(entry)
+    return descriptions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    descriptions = load_descriptions(args.input)
+    total_chars = sum(len(d) for d in descriptions)
+
+    mismatches = [d for d in descriptions if html_to_text(d) != soup_to_text(d)]
+    if mismatches:
+        print(f"MISMATCH: {len(mismatches)} of {len(descriptions)} descriptions differ")
+        for html in mismatches[:3]:
+            print("  html:   ", html[:120])
+            print("  soup:   ", soup_to_text(html)[:120])
+            print("  stream: ", html_to_text(html)[:120])
+
+    results = {}
+    for name, func in (("beautifulsoup", soup_to_text), ("html_to_text", html_to_text)):
+        seconds = min(timeit.repeat(
+            lambda: [func(d) for d in descriptions], number=args.number, repeat=3
+        ))
+        per_doc = seconds / (args.number * len(descriptions))
+        results[name] = per_doc
+        print(
+            f"{name:>14}: {per_doc * 1e6:8.1f} us/doc "
+            f"{total_chars * args.number / seconds / 1e6:6.2f} MB/s"
+        )
+
+    print(f"speedup: {results['beautifulsoup'] / results['html_to_text']:.1f}x "
+          f"({len(descriptions)} descriptions, {total_chars} chars)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
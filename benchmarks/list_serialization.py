@@ -0,0 +1,209 @@
+"""
+Пропускная способность списков вакансий: прежний путь (ORM-объекты,
+model_validate / model_dump, resource_links, проверка response_model)
+против строк запроса, сериализованных сразу в JSON.
+
+    python -m benchmarks.list_serialization --rows 20000 --limit 1000 --repeat 20
+
+Оба варианта отвечают через одно и то же ASGI-приложение (httpx, без
+сети); перед замером проверяется, что их JSON совпадает.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+_TMP_DIR = tempfile.mkdtemp(prefix="vi-list-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_TMP_DIR}/bench.db")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI, Request  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from app.api import serializers  # noqa: E402
+from app.api.links import resource_links  # noqa: E402
+from app.api.pagination import LATEST_VACANCIES, paginate  # noqa: E402
+from app.api.v1.api import api_router  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import AsyncSessionLocal, Base, engine, get_db  # noqa: E402
+from app.core.migrations import run_migrations  # noqa: E402
+from app.crud.vacancy import vacancy_crud  # noqa: E402
+from app.models.company import Company  # noqa: E402
+from app.models.experience import Experience  # noqa: E402
+from app.models.vacancy import Vacancy  # noqa: E402
+from app.schemas.vacancy import VacancyWithCompany, colliding_titles, display_title  # noqa: E402
+
+legacy = FastAPI()
+
+
+def disambiguate(payload: List[dict]) -> List[dict]:
+    """Одинаковые названия в выдаче различаются компанией, как в сериализаторе"""
+    colliding = colliding_titles(item["title"] for item in payload)
+    for item in payload:
+        company = item["company"]
+        item["display_title"] = display_title(
+            item["title"], company["name"] if company else None, item["title"] in colliding
+        )
+    return payload
+
+
+@legacy.get("/legacy/vacancies", response_model=List[VacancyWithCompany])
+async def legacy_read_vacancies(limit: int = 100, db: AsyncSession = Depends(get_db), request: Request = None):
+    """Прежняя реализация списка: объект за объектом через pydantic"""
+    query = select(Vacancy).options(selectinload(Vacancy.company), selectinload(Vacancy.experience))
+    vacancies, _ = await paginate(db, query, LATEST_VACANCIES, limit)
+    response = []
+    for vacancy in vacancies:
+        payload = VacancyWithCompany.model_validate(vacancy).model_dump()
+        payload["links"] = resource_links(
+            request,
+            f"{settings.API_V1_PREFIX}/vacancies/{vacancy.vacancy_id}",
+            f"{settings.API_V1_PREFIX}/vacancies",
+        )
+        response.append(payload)
+    return disambiguate(response)
+
+
+legacy.include_router(api_router, prefix=settings.API_V1_PREFIX)
+
+
+async def populate(rows: int, companies: int) -> None:
+    now = datetime.now(timezone.utc)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        await conn.execute(
+            insert(Company),
+            [{"company_id": i + 1, "name": f"Компания {i + 1}"} for i in range(companies)],
+        )
+        await conn.execute(
+            insert(Experience),
+            [{"experience_id": i + 1, "name": name} for i, name in enumerate(["Нет опыта", "1-3 года", "3-6 лет"])],
+        )
+        chunk = 5000
+        for start in range(0, rows, chunk):
+            await conn.execute(
+                insert(Vacancy),
+                [
+                    {
+                        "vacancy_id": i + 1,
+                        "title": f"Python-разработчик {i % 50}",
+                        "company_id": i % companies + 1,
+                        "experience_id": i % 3 + 1,
+                        "work_format_id": 1,
+                        "work_schedule_id": 1,
+                        "description": "Разработка сервисов на FastAPI и PostgreSQL. " * 8,
+                        "salary_from": 100000 + i % 100 * 1000,
+                        "salary_to": 150000 + i % 100 * 1000,
+                        "currency": "RUR",
+                        "location": "Москва",
+                        "raw_address": "Москва, Тверская, 1",
+                        "source_url": f"https://hh.ru/vacancy/{i + 1}",
+                        "published_date": now - timedelta(minutes=i),
+                        "is_active": True,
+                    }
+                    for i in range(start, min(start + chunk, rows))
+                ],
+            )
+
+
+async def measure(client: httpx.AsyncClient, url: str, repeat: int) -> tuple:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        response = await client.get(url)
+        timings.append((time.perf_counter() - t0) * 1000)
+        response.raise_for_status()
+        size = len(response.content)
+    return statistics.median(timings), min(timings), size
+
+
+async def measure_serialization(limit: int, repeat: int) -> tuple:
+    """Только сериализация: строки уже загружены"""
+    async with AsyncSessionLocal() as db:
+        objects, _ = await paginate(
+            db,
+            select(Vacancy).options(selectinload(Vacancy.company), selectinload(Vacancy.experience)),
+            LATEST_VACANCIES,
+            limit,
+        )
+        rows, _ = await paginate(db, vacancy_crud.list_rows_query(), LATEST_VACANCIES, limit)
+    adapter = VacancyWithCompany.__pydantic_validator__
+
+    def old() -> bytes:
+        payload = []
+        for vacancy in objects:
+            item = VacancyWithCompany.model_validate(vacancy).model_dump()
+            item["links"] = resource_links(
+                None, f"{settings.API_V1_PREFIX}/vacancies/{vacancy.vacancy_id}",
+                f"{settings.API_V1_PREFIX}/vacancies",
+            )
+            payload.append(item)
+        disambiguate(payload)
+        # Повторная проверка response_model и JSON, как в FastAPI
+        validated = [adapter.validate_python(item) for item in payload]
+        return json.dumps([item.model_dump(mode="json") for item in validated]).encode()
+
+    def new() -> bytes:
+        return serializers.VacancyListSerializer(None).render(rows)
+
+    result = []
+    for render in (old, new):
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            render()
+            timings.append((time.perf_counter() - t0) * 1000)
+        result.append(statistics.median(timings))
+    return tuple(result)
+
+
+async def main_async(args) -> None:
+    engine.sync_engine.echo = False
+    t0 = time.perf_counter()
+    await populate(args.rows, args.companies)
+    print(f"populated {args.rows} rows in {time.perf_counter() - t0:.1f}s "
+          f"(orjson: {'yes' if serializers.orjson is not None else 'no'})")
+
+    old_url = f"/legacy/vacancies?limit={args.limit}"
+    new_url = f"{settings.API_V1_PREFIX}/vacancies/?limit={args.limit}"
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=legacy), base_url="http://bench") as client:
+            old_body = (await client.get(old_url)).json()
+            new_body = (await client.get(new_url)).json()
+            if old_body != new_body:
+                print("WARNING: responses differ")
+            for label, url in (("before", old_url), ("after", new_url)):
+                p50, best, size = await measure(client, url, args.repeat)
+                print(
+                    f"{label:6} {args.limit} rows: p50={p50:8.2f}ms best={best:8.2f}ms "
+                    f"{args.limit / p50 * 1000:10.0f} rows/s  {size / 1024:.0f} KiB"
+                )
+        old_ms, new_ms = await measure_serialization(args.limit, args.repeat)
+        print(f"serialization only: before={old_ms:.2f}ms after={new_ms:.2f}ms x{old_ms / new_ms:.1f}")
+    finally:
+        await engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
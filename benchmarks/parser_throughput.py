@@ -0,0 +1,139 @@
+"""
+Бенчмарк HHParser и загрузки в БД на локальной заглушке hh.ru.
+
+    python -m benchmarks.parser_throughput --synthetic 5000 --limit 500 \\
+        --latency-ms 50 --throttle-rate 0.02 --in-flight 1 4 8 16 --ingest
+
+Заглушка (benchmarks.hh_standin) поднимается в том же процессе на
+свободном порту. Для `--ingest` используется временная SQLite-база, если
+DATABASE_URL не задан.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.hh_standin import HHStandin, StandinConfig, VacancyStore, start_standin
+
+_TMP_DIR = tempfile.mkdtemp(prefix="vi-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_TMP_DIR}/bench.db")
+os.environ.setdefault("HH_CACHE_PATH", f"{_TMP_DIR}/hh_responses.sqlite3")
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.crud.vacancy import vacancy_crud  # noqa: E402
+from app.services.parsers.hh_parser import HHParser  # noqa: E402
+from app.services.parsers.http_cache import get_response_cache  # noqa: E402
+
+
+async def run_parse(base_url: str, args, in_flight: int) -> list:
+    HHParser.BASE_URL = base_url
+    HHParser.MAX_IN_FLIGHT = in_flight
+    HHParser.PER_HOST_LIMIT = max(in_flight, HHParser.PER_HOST_LIMIT)
+    parser = HHParser()
+    async with parser:
+        return await parser.parse_vacancies(
+            search_query=args.query, limit=args.limit, light=args.light
+        )
+
+
+async def run_ingest(vacancies: list, per_row: bool, batch_size: int) -> float:
+    t0 = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        if per_row:
+            for vacancy_data in vacancies:
+                existing = await vacancy_crud.get_by_source_url(db, vacancy_data["source_url"])
+                if not existing:
+                    await vacancy_crud.create_from_parsed(db, vacancy_data, commit=False)
+        else:
+            for start in range(0, len(vacancies), batch_size):
+                await vacancy_crud.ingest_batch(db, vacancies[start:start + batch_size])
+        await db.commit()
+    return time.perf_counter() - t0
+
+
+async def main_async(args) -> None:
+    engine.sync_engine.echo = False
+    HHParser.rate_limiter.rate = args.rps
+    HHParser.rate_limiter.burst = max(1, int(args.rps))
+    if args.replay:
+        store = VacancyStore.load(args.replay)
+    else:
+        store = VacancyStore.synthetic(args.synthetic)
+    config = StandinConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    standin = HHStandin(store, config)
+    runner, base_url = await start_standin(standin)
+    print(f"stand-in: {len(store.items)} vacancies at {base_url}")
+
+    if args.ingest:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        for in_flight in args.in_flight:
+            cache = get_response_cache()
+            if cache:
+                cache.clear()
+            for run in ("cold", "warm") if args.cache_runs else ("cold",):
+                before = dict(standin.counters)
+                t0 = time.perf_counter()
+                vacancies = await run_parse(base_url, args, in_flight)
+                elapsed = time.perf_counter() - t0
+                requests = {k: standin.counters[k] - before[k] for k in standin.counters}
+                print(
+                    f"in_flight={in_flight:>3} {run:>4}: {len(vacancies):>5} vacancies "
+                    f"in {elapsed:7.2f}s ({len(vacancies) / elapsed:8.1f}/s) requests={requests}"
+                )
+            if args.ingest:
+                ingest_time = await run_ingest(vacancies, args.per_row, args.batch_size)
+                mode = "per-row" if args.per_row else f"batch={args.batch_size}"
+                print(
+                    f"ingest ({mode}): {len(vacancies)} rows in {ingest_time:.2f}s "
+                    f"({len(vacancies) / ingest_time:.1f} rows/s)"
+                )
+        print("detail latency:", HHParser.detail_latency.snapshot())
+        print("rate limiter:", HHParser.rate_limiter.stats())
+        cache = get_response_cache()
+        if cache:
+            print("response cache:", cache.stats())
+    finally:
+        await runner.cleanup()
+        await engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--synthetic", type=int, default=2000)
+    source.add_argument("--replay", type=Path)
+    parser.add_argument("--query", default="")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--light", action="store_true", help="только выдача, без деталей")
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[HHParser.MAX_IN_FLIGHT])
+    parser.add_argument("--cache-runs", action="store_true", help="повторный прогон на тёплом кэше")
+    parser.add_argument("--rps", type=float, default=1000.0, help="лимит запросов в секунду")
+    parser.add_argument("--ingest", action="store_true", help="замерить загрузку в БД")
+    parser.add_argument("--per-row", action="store_true", help="загрузка через create_from_parsed")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Задержка текстового поиска: полнотекстовый индекс против ILIKE.
+
+    python -m benchmarks.search_latency --rows 1000000 --repeat 20
+
+Строки генерируются во временной SQLite-базе (если DATABASE_URL не задан),
+индекс заполняется той же миграцией, что и при старте приложения.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+_TMP_DIR = tempfile.mkdtemp(prefix="vi-search-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_TMP_DIR}/bench.db")
+
+from sqlalchemy import insert, or_, select  # noqa: E402
+
+from app.core import fulltext  # noqa: E402
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.core.migrations import run_migrations  # noqa: E402
+from app.models.company import Company  # noqa: E402
+from app.models.vacancy import Vacancy  # noqa: E402
+
+TITLES = [
+    "Python-разработчик", "Backend разработчик", "Frontend-разработчик", "Java Developer",
+    "Аналитик данных", "Системный аналитик", "DevOps-инженер", "Тестировщик",
+    "Менеджер проектов", "Data Scientist", "Golang разработчик", "Дизайнер интерфейсов",
+]
+WORDS = (
+    "опыт работы разработка проектирование сервисов высоконагруженных систем команда "
+    "продукт задачи требования знание понимание принципов микросервисы базы данных "
+    "PostgreSQL Redis Kafka Docker Kubernetes Python Django FastAPI asyncio Java Spring "
+    "React TypeScript аналитика отчётность SQL ClickHouse тестирование автоматизация "
+    "удалённо офис гибкий график ДМС обучение конференции развитие рост зарплата"
+).split()
+QUERIES = [
+    "python", "разработчика", "аналитик данных", "kubernetes docker", "java spring",
+    "системного аналитика", "clickhouse", "тестирование автоматизация",
+]
+
+
+# Словарь "прочих" слов: без него любое слово запроса встречалось бы почти везде
+FILLER = [f"слово{i}" for i in range(20000)]
+# Доля слов описания из WORDS
+TOPIC_SHARE = 0.1
+
+
+def _description(rnd: random.Random, words: int) -> str:
+    return " ".join(
+        rnd.choice(WORDS) if rnd.random() < TOPIC_SHARE else rnd.choice(FILLER)
+        for _ in range(words)
+    )
+
+
+async def populate(rows: int, companies: int, words: int, seed: int) -> None:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(Company),
+            [{"company_id": i + 1, "name": f"Компания {i + 1}"} for i in range(companies)],
+        )
+        chunk = 10000
+        for start in range(0, rows, chunk):
+            await conn.execute(
+                insert(Vacancy),
+                [
+                    {
+                        "vacancy_id": i + 1,
+                        "title": rnd.choice(TITLES),
+                        "company_id": rnd.randint(1, companies),
+                        "description": _description(rnd, words),
+                        "location": "Москва",
+                        "raw_address": "Москва",
+                        "source_url": f"https://hh.ru/vacancy/{i + 1}",
+                        "published_date": now - timedelta(minutes=i),
+                        "is_active": True,
+                    }
+                    for i in range(start, min(start + chunk, rows))
+                ],
+            )
+
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def measure(query_text: str, repeat: int, limit: int, use_index: bool) -> tuple:
+    timings = []
+    found = 0
+    async with AsyncSessionLocal() as db:
+        for _ in range(repeat):
+            query = select(Vacancy.vacancy_id).join(Company)
+            if use_index:
+                matches = fulltext.search_subquery(query_text)
+                query = query.join(matches, matches.c.vacancy_id == Vacancy.vacancy_id)
+                query = query.order_by(matches.c.rank.desc(), Vacancy.published_date.desc())
+            else:
+                query = query.where(
+                    or_(
+                        Vacancy.title.ilike(f"%{query_text}%"),
+                        Vacancy.description.ilike(f"%{query_text}%"),
+                        Company.name.ilike(f"%{query_text}%"),
+                    )
+                ).order_by(Vacancy.published_date.desc())
+            t0 = time.perf_counter()
+            found = len((await db.execute(query.limit(limit))).all())
+            timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings), _percentile(timings, 0.95), found
+
+
+async def main_async(args) -> None:
+    engine.sync_engine.echo = False
+    t0 = time.perf_counter()
+    await populate(args.rows, args.companies, args.words, args.seed)
+    print(f"populated {args.rows} rows in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(run_migrations)
+    print(f"full-text backfill in {time.perf_counter() - t0:.1f}s")
+
+    try:
+        for query_text in QUERIES:
+            fts = await measure(query_text, args.repeat, args.limit, use_index=True)
+            line = f"{query_text!r:32} fts p50={fts[0]:8.2f}ms p95={fts[1]:8.2f}ms hits={fts[2]:>3}"
+            if not args.skip_ilike:
+                like = await measure(query_text, max(1, args.repeat // 4), args.limit, use_index=False)
+                line += f" | ilike p50={like[0]:8.2f}ms p95={like[1]:8.2f}ms hits={like[2]:>3}"
+            print(line)
+    finally:
+        await engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--companies", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=60, help="слов в описании")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--skip-ilike", action="store_true", help="не замерять ILIKE")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
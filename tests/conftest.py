@@ -0,0 +1,69 @@
+"""
+Общая настройка тестов: отдельная SQLite-база во временном каталоге.
+
+Переменные окружения задаются до импорта приложения - движок БД и
+настройки создаются при импорте app.core.
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+_TMP_DIR = tempfile.mkdtemp(prefix="vi-tests-")
+DB_PATH = Path(_TMP_DIR) / "test.db"
+# Не setdefault: тесты пересоздают базу и не должны попасть в настоящую из .env
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MIN", "30")
+os.environ.setdefault("SUPERJOB_API_KEY", "test")
+os.environ["HH_CACHE_ENABLED"] = "false"
+
+from app.core.database import Base, engine  # noqa: E402
+from app.core.migrations import run_migrations  # noqa: E402
+from app.services.reference_cache import reference_cache  # noqa: E402
+from app.services.skill_index import skill_index  # noqa: E402
+
+
+async def _recreate_database(schema: Optional[str] = None) -> None:
+    await engine.dispose()
+    # Кэши процесса помнят id из прошлой базы
+    reference_cache.invalidate()
+    skill_index.loaded = False
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{DB_PATH}{suffix}").unlink(missing_ok=True)
+    if schema:
+        # База прежней версии: миграции должны довести её до моделей
+        with sqlite3.connect(DB_PATH) as conn:
+            conn.executescript(schema)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+
+
+@pytest.fixture
+def run_with_db():
+    """
+    Выполнить сценарий (корутинную функцию) на новой базе: пустой или,
+    если передан schema, созданной этим SQL-скриптом до миграций.
+    """
+
+    def run(scenario, *args, schema: Optional[str] = None):
+        async def main():
+            await _recreate_database(schema)
+            try:
+                return await scenario(*args)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
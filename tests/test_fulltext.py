@@ -0,0 +1,57 @@
+from sqlalchemy import select
+
+from app.core import fulltext
+from app.core.database import AsyncSessionLocal
+from app.crud.vacancy import vacancy_crud
+from app.schemas.vacancy import VacancyFilter
+
+ITEMS = [
+    ("1", "Python-разработчик", "Пишем сервисы на FastAPI"),
+    ("2", "Разработчика ищем", "Нужен опыт с Go"),
+    ("3", "Аналитик данных", "Python и SQL для отчётов"),
+    ("4", "Тестировщик", "Ручное тестирование"),
+]
+
+
+def _item(external_id, title, description):
+    return {
+        "title": title,
+        "description": description,
+        "company": {"name": "Сбер"},
+        "location": "Москва",
+        "source_url": f"https://hh.ru/vacancy/{external_id}",
+        "external_source": "hh",
+        "external_id": external_id,
+        "detailed": True,
+    }
+
+
+def test_terms_are_raw_lowercase_words():
+    assert fulltext.terms("Python-Разработчики, python") == ["python", "разработчики"]
+    assert fulltext.terms("  ") == []
+
+
+def test_sqlite_search_is_prefix_match_on_raw_words(run_with_db):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await vacancy_crud.ingest_batch(db, [_item(*item) for item in ITEMS])
+            await db.commit()
+
+            async def found(q):
+                vacancies = await vacancy_crud.filter(db, VacancyFilter(title=q))
+                return sorted(vacancy.external_id for vacancy in vacancies)
+
+            async def ranked(q):
+                matches = fulltext.search_subquery(q)
+                rows = await db.execute(select(matches.c.vacancy_id).order_by(matches.c.rank.desc()))
+                return rows.scalars().all()
+
+            assert await found("разработ") == ["1", "2"]
+            assert await found("разработчик") == ["1", "2"]
+            # Без морфологии: слово запроса длиннее слова вакансии не совпадает
+            assert await found("разработчики") == []
+            assert await found("PYTHON sql") == ["3"]
+            # Название весит больше описания
+            assert await ranked("python") == [1, 3]
+
+    run_with_db(scenario)
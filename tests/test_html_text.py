@@ -0,0 +1,38 @@
+import pytest
+
+from app.services.parsers.html_text import html_to_text
+
+bs4 = pytest.importorskip("bs4")
+
+from benchmarks.html_to_text import DEFAULT_INPUT, load_descriptions  # noqa: E402
+
+CASES = [
+    "",
+    "  просто текст  ",
+    "<p>Обязанности:</p><ul><li>писать код</li><li> ревью </li></ul>",
+    "<p>Зарплата от 100&nbsp;000 &amp; бонусы &lt;по итогам&gt;</p>",
+    "<strong>Python</strong>, <em>Django</em><br/>и <a href='#'>SQL</a>",
+    "<p>до<!-- комментарий -->после</p><script>var x = 1;</script><style>p {}</style>",
+    "<div>вложенный <b>жирный <i>курсив</i></b> хвост</div>",
+    "<p>незакрытый <b>тег",
+    "<![CDATA[сырые данные]]><p>текст</p>",
+    "&laquo;кавычки&raquo; &#8212; &#x2014; тире",
+]
+
+
+def _soup_text(html: str) -> str:
+    if not html:
+        return ""
+    return bs4.BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True)
+
+
+@pytest.mark.parametrize("html", CASES)
+def test_matches_beautifulsoup(html):
+    assert html_to_text(html) == _soup_text(html)
+
+
+def test_matches_beautifulsoup_on_recorded_descriptions():
+    descriptions = load_descriptions(DEFAULT_INPUT)
+    assert descriptions
+    for html in descriptions:
+        assert html_to_text(html) == _soup_text(html)
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import time
+
+from app.services.parsers import hh_parser
+from app.services.parsers.hh_parser import HHParser
+from app.services.parsers.http_cache import ResponseCache
+
+URL = "https://api.hh.ru/vacancies/1"
+BODY = json.dumps({"id": "1", "name": "Python dev"}).encode()
+
+
+def _cache(tmp_path, **kwargs):
+    options = {"ttl": 60, "expire": 3600, "max_bytes": 1 << 20}
+    options.update(kwargs)
+    return ResponseCache(str(tmp_path / "cache.db"), **options)
+
+
+def _age(cache, url, seconds):
+    """Состарить запись, как будто она сохранена `seconds` назад"""
+    cache._conn.execute(
+        "UPDATE responses SET stored_at = stored_at - ? WHERE url = ?", (seconds, url)
+    )
+    cache._conn.commit()
+
+
+class FakeParser(HHParser):
+    """Парсер, отвечающий заготовленными статусами и запоминающий заголовки запросов"""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    async def _request(self, session, url, params=None, headers=None):
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+
+def test_stale_entry_carries_validators_and_refresh_makes_it_fresh(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store(URL, BODY, etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+    assert cache.get(URL).is_fresh
+
+    _age(cache, URL, 120)
+    entry = cache.get(URL)
+    assert not entry.is_fresh
+    assert entry.body == BODY
+    assert entry.conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+    }
+
+    cache.refresh(URL)
+    assert cache.get(URL).is_fresh
+    cache.close()
+
+
+def test_expired_entry_is_dropped(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store(URL, BODY)
+    _age(cache, URL, 7200)
+    assert cache.get(URL) is None
+    assert cache.stats()["size_bytes"] == 0
+    cache.close()
+
+
+def test_eviction_keeps_recently_hit_entries(tmp_path):
+    cache = _cache(tmp_path, max_bytes=len(BODY) * 3)
+    for i in range(3):
+        cache.store(f"{URL}?{i}", BODY)
+        time.sleep(0.01)
+    # Попадание в самую старую запись должно уберечь её от вытеснения
+    assert cache.get(f"{URL}?0") is not None
+    # Превышение лимита: вытесняется до 90% лимита, то есть две давние записи
+    cache.store(f"{URL}?3", BODY)
+    assert cache.evictions == 2
+    assert [i for i in range(4) if cache.get(f"{URL}?{i}") is not None] == [0, 3]
+    cache.close()
+
+
+def test_parser_revalidates_stale_entry(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    monkeypatch.setattr(hh_parser, "get_response_cache", lambda: cache)
+
+    parser = FakeParser([(200, {"ETag": '"v1"'}, BODY), (304, {}, b"")])
+    # Промах: ответ сохраняется вместе с ETag
+    assert asyncio.run(parser._get_cached_json(None, URL)) == json.loads(BODY)
+    # Свежая запись: запроса нет
+    assert asyncio.run(parser._get_cached_json(None, URL)) == json.loads(BODY)
+    assert len(parser.sent_headers) == 1
+
+    # Устаревшая запись: условный запрос, 304 продлевает её
+    _age(cache, URL, 120)
+    assert asyncio.run(parser._get_cached_json(None, URL)) == json.loads(BODY)
+    assert parser.sent_headers[-1] == {"If-None-Match": '"v1"'}
+    assert cache.get(URL).is_fresh
+    assert (cache.misses, cache.hits, cache.revalidated) == (1, 1, 1)
+    cache.close()
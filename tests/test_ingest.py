@@ -0,0 +1,116 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+
+from app.core.database import AsyncSessionLocal
+from app.crud.vacancy import vacancy_crud
+from app.models.skill import Skill
+from app.models.vacancy import Vacancy
+from app.models.vacancy_skill import VacancySkill
+
+
+def _item(external_id: str, **overrides):
+    item = {
+        "title": f"Python-разработчик {external_id}",
+        "description": "Сниппет выдачи",
+        "salary": {"from": 100000, "to": 150000, "currency": "RUR"},
+        "company": {"name": "Сбер"},
+        "experience": "От 1 года до 3 лет",
+        "work_format": "Удалённо",
+        "work_schedule": "Полный день",
+        "location": "Москва",
+        "raw_address": "Москва",
+        "skills": ["Python"],
+        "source_url": f"https://hh.ru/vacancy/{external_id}",
+        "external_source": "hh",
+        "external_id": external_id,
+        "detailed": False,
+        "published_date": datetime(2025, 1, 1, tzinfo=timezone.utc),
+    }
+    item.update(overrides)
+    return item
+
+
+async def _ingest(items):
+    async with AsyncSessionLocal() as db:
+        stats = await vacancy_crud.ingest_batch(db, items)
+        await db.commit()
+    return stats
+
+
+async def _rows():
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Vacancy).order_by(Vacancy.vacancy_id))
+        return result.scalars().all()
+
+
+def _counts(stats):
+    return {key: stats[key] for key in ("created", "updated", "unchanged", "skipped")}
+
+
+def test_reingest_updates_only_changed_rows(run_with_db):
+    async def scenario():
+        items = [_item(str(i)) for i in range(1, 4)]
+        assert _counts(await _ingest(items)) == {"created": 3, "updated": 0, "unchanged": 0, "skipped": 0}
+        before = {row.vacancy_id: row.change_seq for row in await _rows()}
+
+        # Повтор без изменений ничего не переписывает
+        assert _counts(await _ingest(items)) == {"created": 0, "updated": 0, "unchanged": 3, "skipped": 0}
+        assert {row.vacancy_id: row.change_seq for row in await _rows()} == before
+
+        # Изменилась зарплата одной вакансии; дубль в пачке пропускается
+        items[1] = _item("2", salary={"from": 200000, "to": None, "currency": "RUR"})
+        stats = await _ingest(items + [_item("2")])
+        assert _counts(stats) == {"created": 0, "updated": 1, "unchanged": 2, "skipped": 1}
+        rows = {row.external_id: row for row in await _rows()}
+        assert len(rows) == 3
+        assert rows["2"].salary_from == 200000
+        assert rows["2"].updated_at is not None
+        assert rows["2"].change_seq > max(before.values())
+        assert rows["1"].updated_at is None
+
+    run_with_db(scenario)
+
+
+def test_snippet_does_not_overwrite_full_description(run_with_db):
+    async def scenario():
+        detailed = _item("1", description="Полное описание", detailed=True, skills=["Python", "SQL"])
+        await _ingest([detailed])
+        # Выдача с тем же содержимым - без изменений, описание остаётся полным
+        assert _counts(await _ingest([_item("1", skills=["Python"])]))["unchanged"] == 1
+        # Изменение в полях выдачи обновляет строку, но не описание
+        assert _counts(await _ingest([_item("1", title="Senior Python")]))["updated"] == 1
+        [row] = await _rows()
+        assert (row.title, row.description) == ("Senior Python", "Полное описание")
+        async with AsyncSessionLocal() as db:
+            skills = await db.execute(
+                select(Skill.name).join(VacancySkill, VacancySkill.skill_id == Skill.skill_id).order_by(Skill.name)
+            )
+            assert skills.scalars().all() == ["Python", "SQL"]
+
+    run_with_db(scenario)
+
+
+def test_keyed_item_takes_over_row_without_key(run_with_db):
+    async def scenario():
+        # Вакансии, сохранённые до появления внешнего ключа
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Vacancy), [
+                {"title": "Старая", "location": "Москва", "raw_address": "Москва",
+                 "source_url": "https://hh.ru/vacancy/1"},
+                {"title": "Чужая", "location": "Москва", "raw_address": "Москва",
+                 "source_url": "https://hh.ru/vacancy/2", "external_source": "hh", "external_id": "99"},
+            ])
+            await db.commit()
+
+        stats = await _ingest([_item("1"), _item("2"), _item("3")])
+        # URL второй занят вакансией с другим ключом - пропуск, а не откат всей пачки
+        assert _counts(stats) == {"created": 1, "updated": 1, "unchanged": 0, "skipped": 1}
+        rows = await _rows()
+        assert [(row.vacancy_id, row.external_id, row.title) for row in rows] == [
+            (1, "1", "Python-разработчик 1"),
+            (2, "99", "Чужая"),
+            (3, "3", "Python-разработчик 3"),
+        ]
+
+    run_with_db(scenario)
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.services import ingestion_queue as ingestion_module
+from app.services.ingestion_queue import IngestionQueue
+
+
+@pytest.fixture
+def ingest_calls(monkeypatch):
+    """Подмена записи: отправка с "bad" падает, остальные считаются созданными"""
+    calls = []
+
+    async def ingest_batch(db, items):
+        calls.append([data["source_url"] for data in items])
+        if any(data.get("bad") for data in items):
+            raise ValueError("bad row")
+        return {"created": len(items), "updated": 0, "unchanged": 0, "skipped": 0}
+
+    monkeypatch.setattr(ingestion_module.vacancy_crud, "ingest_batch", ingest_batch)
+    return calls
+
+
+def _items(*urls, bad=False):
+    return [{"source_url": f"https://hh.ru/vacancy/queue-{url}", "bad": bad} for url in urls]
+
+
+def test_failed_submission_does_not_fail_others(run_with_db, ingest_calls):
+    async def scenario():
+        queue = IngestionQueue(batch_size=10, max_delay=0.2)
+        async with queue:
+            results = await asyncio.gather(
+                queue.submit(_items(1, 2)),
+                queue.submit(_items(3, bad=True)),
+                queue.submit(_items(4)),
+                return_exceptions=True,
+            )
+        return queue, results
+
+    queue, results = run_with_db(scenario)
+    assert results[0]["created"] == 2
+    assert isinstance(results[1], ValueError)
+    assert results[2]["created"] == 1
+    # Общая пачка упала на второй отправке, затем каждая записана своей транзакцией
+    assert [len(call) for call in ingest_calls] == [2, 1, 2, 1, 1]
+    stats = queue.stats()
+    assert (stats["failed_batches"], stats["batches"], stats["written"]) == (1, 2, 3)
+
+
+def test_single_submission_failure_is_not_retried(run_with_db, ingest_calls):
+    async def scenario():
+        queue = IngestionQueue(batch_size=10, max_delay=0.05)
+        async with queue:
+            with pytest.raises(ValueError):
+                await queue.submit(_items(1, 2, bad=True))
+            assert (await queue.submit(_items(3)))["created"] == 1
+        return queue
+
+    queue = run_with_db(scenario)
+    assert len(ingest_calls) == 2
+    assert queue.stats()["failed_batches"] == 1
+
+
+def test_batches_are_bounded_by_size(run_with_db, ingest_calls):
+    async def scenario():
+        queue = IngestionQueue(max_items=4, batch_size=3, max_delay=0.05)
+        async with queue:
+            result = await queue.submit(_items(*range(7)))
+        return queue, result
+
+    queue, result = run_with_db(scenario)
+    assert result["created"] == 7
+    assert [len(call) for call in ingest_calls] == [3, 3, 1]
+    assert queue.stats()["max_depth"] <= 4
@@ -0,0 +1,123 @@
+import pytest
+from sqlalchemy import text
+
+from app.core import migrations
+from app.core.database import AsyncSessionLocal, engine
+from app.core.migrations import run_migrations
+
+LEGACY_SCHEMA = """
+CREATE TABLE companies (
+    company_id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, website TEXT,
+    description VARCHAR, created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE skills (skill_id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, category VARCHAR(50));
+CREATE INDEX ix_skills_name ON skills (name);
+CREATE TABLE vacancies (
+    vacancy_id INTEGER PRIMARY KEY, title VARCHAR NOT NULL UNIQUE,
+    company_id INTEGER REFERENCES companies(company_id), experience_id INTEGER,
+    work_format_id INTEGER, work_schedule_id INTEGER, description TEXT,
+    salary_from NUMERIC, salary_to NUMERIC, currency VARCHAR(10),
+    location TEXT NOT NULL, raw_address TEXT NOT NULL, parsed_address VARCHAR(500),
+    source_url VARCHAR(500) NOT NULL UNIQUE, published_date DATETIME, is_active BOOLEAN,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP, updated_at DATETIME
+);
+CREATE TABLE vacancy_skills (
+    vacancy_id INTEGER REFERENCES vacancies(vacancy_id), skill_id INTEGER,
+    is_mandatory BOOLEAN, PRIMARY KEY (vacancy_id, skill_id)
+);
+INSERT INTO companies (company_id, name) VALUES (1, 'Сбер');
+INSERT INTO skills (skill_id, name) VALUES (1, 'Python');
+INSERT INTO vacancies (vacancy_id, title, company_id, location, raw_address, source_url) VALUES
+    (1, 'Python dev', 1, 'Москва', 'Москва', 'https://hh.ru/vacancy/1'),
+    (2, 'Python dev (Сбер)', 1, 'Москва', 'Москва', 'https://hh.ru/vacancy/2'),
+    (3, 'Python dev (Сбер-20250101120000)', 1, 'Москва', 'Москва', 'https://hh.ru/vacancy/3');
+INSERT INTO vacancy_skills VALUES (1, 1, 1), (2, 1, 1);
+"""
+
+
+async def _schema():
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY name")
+        )
+        return result.all()
+
+
+async def _rerun(times: int = 2):
+    for _ in range(times):
+        async with engine.begin() as conn:
+            await conn.run_sync(run_migrations)
+
+
+def test_rerun_on_current_schema_changes_nothing(run_with_db):
+    async def scenario():
+        before = await _schema()
+        await _rerun()
+        assert await _schema() == before
+
+    run_with_db(scenario)
+
+
+def test_rerun_on_legacy_schema_is_stable(run_with_db):
+    async def scenario():
+        migrated = await _schema()
+        await _rerun()
+        assert await _schema() == migrated
+
+        async with AsyncSessionLocal() as db:
+            vacancies = (
+                await db.execute(
+                    text("SELECT vacancy_id, title, external_source, external_id, change_seq "
+                         "FROM vacancies ORDER BY vacancy_id")
+                )
+            ).all()
+            links = (await db.execute(text("SELECT vacancy_id, skill_id FROM vacancy_skills"))).all()
+            violations = (await db.execute(text("PRAGMA foreign_key_check"))).all()
+        # Заголовки без суффикса компании, внешний ключ из URL hh.ru, номер изменения у всех
+        assert [(row.vacancy_id, row.title) for row in vacancies] == [
+            (1, "Python dev"), (2, "Python dev"), (3, "Python dev"),
+        ]
+        assert all(row.external_source == "hh" and row.external_id == str(row.vacancy_id) for row in vacancies)
+        assert all(row.change_seq is not None for row in vacancies)
+        assert sorted(links) == [(1, 1), (2, 1)]
+        assert violations == []
+
+    run_with_db(scenario, schema=LEGACY_SCHEMA)
+
+
+def test_existing_dangling_references_do_not_stop_rebuild(run_with_db):
+    # Ссылки на удалённую вакансию и несуществующую компанию были до миграции
+    schema = LEGACY_SCHEMA + """
+    INSERT INTO vacancy_skills VALUES (42, 1, 1);
+    UPDATE vacancies SET company_id = 7 WHERE vacancy_id = 3;
+    """
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            violations = (await db.execute(text("PRAGMA foreign_key_check"))).all()
+            titles = (await db.execute(text("SELECT title FROM vacancies ORDER BY vacancy_id"))).scalars().all()
+        assert sorted((row[0], row[2]) for row in violations) == [
+            ("vacancies", "companies"), ("vacancy_skills", "vacancies"),
+        ]
+        assert titles == ["Python dev", "Python dev", "Python dev (Сбер-20250101120000)"]
+
+    run_with_db(scenario, schema=schema)
+
+
+def test_failed_migration_rolls_back_schema_changes(run_with_db, monkeypatch):
+    def broken(conn):
+        raise RuntimeError("broken migration")
+
+    async def scenario():
+        monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [broken])
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP INDEX uq_vacancies_external"))
+            await conn.execute(text("DROP INDEX ix_vacancies_change_seq"))
+            await conn.execute(text("ALTER TABLE vacancies DROP COLUMN change_seq"))
+        before = await _schema()
+        with pytest.raises(RuntimeError, match="broken migration"):
+            await _rerun(times=1)
+        # ALTER TABLE и CREATE INDEX откатились вместе с заполнением
+        assert await _schema() == before
+
+    run_with_db(scenario)
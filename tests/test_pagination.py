@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.api.pagination import LATEST_VACANCIES, paginate
+from app.core.database import AsyncSessionLocal
+from app.models.vacancy import Vacancy
+
+DIALECTS = {"sqlite": sqlite.dialect(), "postgresql": postgresql.dialect()}
+
+
+def _rows(count: int):
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "vacancy_id": i,
+            "title": f"Вакансия {i}",
+            "location": "Москва",
+            "raw_address": "Москва",
+            "source_url": f"https://hh.ru/vacancy/{i}",
+            # Каждая третья без даты, у остальных даты повторяются
+            "published_date": None if i % 3 == 0 else start + timedelta(days=i % 4),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+async def _walk(db, dialect: str, limit: int):
+    """
+    Пройти выдачу страницами по курсору. Порядок NULL задаётся явно
+    (NULLS FIRST / LAST), поэтому правила PostgreSQL проверяются на SQLite.
+    """
+    keyset = LATEST_VACANCIES
+    seen, cursor = [], None
+    while True:
+        query = select(Vacancy.vacancy_id).add_columns(*keyset.columns())
+        if cursor is not None:
+            query = query.where(keyset.after(keyset.decode(cursor), dialect))
+        rows = (await db.execute(query.order_by(*keyset.order_by(dialect)).limit(limit))).all()
+        seen.extend(row[0] for row in rows)
+        if len(rows) < limit:
+            return seen
+        cursor = keyset.encode(tuple(rows[-1])[1:])
+
+
+@pytest.mark.parametrize("dialect", ["sqlite", "postgresql"])
+@pytest.mark.parametrize("limit", [1, 2, 5])
+def test_keyset_walk_matches_full_order_with_null_dates(run_with_db, dialect, limit):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Vacancy), _rows(20))
+            await db.commit()
+            full = (
+                await db.execute(
+                    select(Vacancy.vacancy_id).order_by(*LATEST_VACANCIES.order_by(dialect))
+                )
+            ).scalars().all()
+            walked = await _walk(db, dialect, limit)
+        assert walked == full
+        nulls = [vacancy_id for vacancy_id in full if vacancy_id % 3 == 0]
+        # NULL там, где их держит индекс: в PostgreSQL при DESC в начале, в SQLite в конце
+        if dialect == "postgresql":
+            assert full[:len(nulls)] == nulls
+        else:
+            assert full[-len(nulls):] == nulls
+
+    run_with_db(scenario)
+
+
+def test_paginate_continues_after_null_cursor(run_with_db):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Vacancy), _rows(9))
+            await db.commit()
+            ids, pages, cursor = [], 0, None
+            while True:
+                page, cursor = await paginate(db, select(Vacancy), LATEST_VACANCIES, 2, cursor)
+                ids.extend(vacancy.vacancy_id for vacancy in page)
+                pages += 1
+                if cursor is None:
+                    break
+        assert sorted(ids) == list(range(1, 10))
+        assert len(ids) == len(set(ids))
+        # Последние страницы - вакансии без даты (SQLite), по убыванию id
+        assert ids[-3:] == [9, 6, 3]
+        assert pages == 5
+
+    run_with_db(scenario)
+
+
+@pytest.mark.parametrize(
+    "dialect, expected",
+    [
+        # NULL в конце: после NULL - только NULL с меньшим id
+        ("sqlite", "vacancies.published_date IS NULL AND vacancies.vacancy_id < 5"),
+        # NULL в начале: после NULL - все с датой, затем NULL с меньшим id
+        ("postgresql", "vacancies.published_date IS NOT NULL OR vacancies.published_date IS NULL "
+                       "AND vacancies.vacancy_id < 5"),
+    ],
+)
+def test_keyset_after_null_compiles_per_dialect(dialect, expected):
+    condition = LATEST_VACANCIES.after([None, 5], dialect)
+    compiled = condition.compile(dialect=DIALECTS[dialect], compile_kwargs={"literal_binds": True})
+    assert str(compiled) == expected
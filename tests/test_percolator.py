@@ -0,0 +1,107 @@
+from collections import Counter
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.crud.saved_search import saved_search_crud
+from app.crud.vacancy import vacancy_crud
+from app.models.company import Company
+from app.models.saved_search import SavedSearchMatch
+from app.models.skill import Skill
+from app.models.user import User
+from app.models.vacancy import Vacancy
+from app.schemas.saved_search import SavedSearchCreate
+from app.schemas.vacancy import VacancyFilter
+from app.services.parsers.hh_parser import HHParser
+from app.services.percolator import percolator
+from app.services.skill_index import skill_index
+from benchmarks.hh_standin import VacancyStore
+
+FILTER_FIELDS = set(VacancyFilter.model_fields)
+
+
+def _items(count: int):
+    parser = HHParser()
+    return [parser._parse_from_list_item(item) for item in VacancyStore.synthetic(count).ordered()]
+
+
+async def _ingest(items) -> None:
+    async with AsyncSessionLocal() as db:
+        await vacancy_crud.ingest_batch(db, items)
+        await db.commit()
+
+
+def _most_common(values):
+    return Counter(values).most_common(1)[0][0]
+
+
+async def _specs(new_items):
+    """
+    Поиски всех видов якорей (навык, слово названия, компания, корзина
+    зарплаты), подобранные так, чтобы среди новых вакансий были совпадения
+    """
+    async with AsyncSessionLocal() as db:
+        skill_ids = dict((await db.execute(select(Skill.name, Skill.skill_id))).all())
+        company_ids = dict((await db.execute(select(Company.name, Company.company_id))).all())
+    skills = sorted(skill_index.postings, key=lambda skill_id: -len(skill_index.postings[skill_id]))
+    # Пара навыков, которая чаще всего встретится вместе в новых вакансиях
+    pair = _most_common(
+        tuple(sorted(skill_ids[name] for name in item["skills"][:2]))
+        for item in new_items
+        if len(item["skills"]) >= 2 and all(name in skill_ids for name in item["skills"][:2])
+    )
+    company = _most_common(
+        item["company"]["name"] for item in new_items if item["company"]["name"] in company_ids
+    )
+    return [
+        {"name": "skills all", "skill_ids": list(pair)},
+        {"name": "skills any", "skill_ids": skills[1:3], "skills_mode": "any"},
+        {"name": "title", "title": _most_common(item["title"].split()[0] for item in new_items)},
+        {"name": "company", "company_id": company_ids[company]},
+        {"name": "min salary", "min_salary": 150000},
+        {"name": "max salary", "max_salary": 90000},
+        {"name": "location", "location": _most_common(item["location"] for item in new_items)[:4]},
+        {"name": "combined", "title": "разработчик", "min_salary": 100000, "skill_ids": skills[:1]},
+    ]
+
+
+def test_percolator_matches_equal_sql_filter(run_with_db):
+    async def scenario():
+        items = _items(400)
+        await _ingest(items[:100])
+        async with AsyncSessionLocal() as db:
+            db.add(User(email="owner@example.com", username="owner", hashed_password="x"))
+            await db.commit()
+            await skill_index.load(db)
+            await percolator.load(db)
+        # Первый проход ставит отметку на текущий конец ленты
+        await percolator.run_once()
+        checkpoint = percolator.checkpoint
+
+        searches = []
+        async with AsyncSessionLocal() as db:
+            for spec in await _specs(items[100:]):
+                search = await saved_search_crud.create(db, user_id=1, obj_in=SavedSearchCreate(**spec))
+                searches.append((search.saved_search_id, spec))
+
+        await _ingest(items[100:])
+        while await percolator.run_once():
+            pass
+
+        async with AsyncSessionLocal() as db:
+            for saved_search_id, spec in searches:
+                filter = VacancyFilter(**{key: value for key, value in spec.items() if key in FILTER_FIELDS})
+                query = vacancy_crud.filter_query(filter).where(Vacancy.change_seq > checkpoint)
+                expected = {vacancy.vacancy_id for vacancy in (await db.execute(query)).scalars()}
+                matched = set(
+                    (
+                        await db.execute(
+                            select(SavedSearchMatch.vacancy_id)
+                            .where(SavedSearchMatch.saved_search_id == saved_search_id)
+                        )
+                    ).scalars()
+                )
+                assert expected, spec["name"]
+                assert matched == expected, spec["name"]
+
+    run_with_db(scenario)
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.core.config import settings
+from app.services.parsers.base_parser import BaseParser
+from app.services.parsers.rate_limiter import TokenBucket, backoff_delay, parse_retry_after
+
+
+async def _acquire_all(bucket: TokenBucket, count: int) -> float:
+    started = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(count)))
+    return time.monotonic() - started
+
+
+def test_burst_is_free_and_rest_follows_rate():
+    bucket = TokenBucket(rate=50, burst=5)
+    # 5 токенов сразу, остальные 10 - со скоростью 50 в секунду
+    elapsed = asyncio.run(_acquire_all(bucket, 15))
+    assert 0.18 <= elapsed < 1.0
+    assert bucket.acquired == 15
+    assert bucket.throttled == 10
+    assert bucket.throttled_seconds >= 0.18
+
+
+def test_pause_holds_every_consumer():
+    bucket = TokenBucket(rate=1000, burst=10)
+    bucket.pause(0.2)
+    elapsed = asyncio.run(_acquire_all(bucket, 3))
+    assert elapsed >= 0.19
+    assert bucket.rate_limited == 1
+
+
+def test_retry_after_accepts_seconds_and_http_date():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+@pytest.mark.parametrize("attempt", [0, 3, 20])
+def test_backoff_is_capped_and_respects_retry_after(attempt):
+    ceiling = min(settings.PARSER_BACKOFF_MAX_SECONDS, settings.PARSER_BACKOFF_BASE_SECONDS * 2 ** attempt)
+    for _ in range(50):
+        assert 0 <= backoff_delay(attempt) <= ceiling
+    assert backoff_delay(attempt, retry_after=ceiling + 5) == ceiling + 5
+
+
+class FakeResponse:
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return b"{}"
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def test_request_retries_429_and_pauses_shared_bucket(monkeypatch):
+    monkeypatch.setattr(settings, "PARSER_BACKOFF_BASE_SECONDS", 0.01)
+    parser = BaseParser()
+    parser.rate_limiter = TokenBucket(rate=1000, burst=10)
+    session = FakeSession([FakeResponse(429, {"Retry-After": "0"}), FakeResponse(503), FakeResponse(200)])
+
+    status, _, body = asyncio.run(parser._request(session, "https://api.hh.ru/vacancies"))
+    assert (status, body) == (200, b"{}")
+    assert session.calls == 3
+    assert parser.rate_limiter.retries == 2
+    # Пауза для всех потребителей - только на 429
+    assert parser.rate_limiter.rate_limited == 1
@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import func, insert, select, text
+
+from app.core.database import AsyncSessionLocal
+from app.crud.saved_search import saved_search_crud
+from app.models.saved_search import SavedSearchDelivery, SavedSearchMatch
+from app.models.user import User
+from app.models.vacancy import Vacancy
+from app.schemas.saved_search import SavedSearchCreate
+from app.services.webhook_dispatcher import webhook_secret
+
+LEGACY_SAVED_SEARCHES = """
+CREATE TABLE users (
+    user_id INTEGER PRIMARY KEY, email VARCHAR, username VARCHAR, hashed_password VARCHAR
+);
+CREATE TABLE saved_searches (
+    saved_search_id INTEGER NOT NULL, user_id INTEGER NOT NULL, name VARCHAR(100) NOT NULL,
+    title VARCHAR(255), company_id INTEGER, experience_id INTEGER, work_format_id INTEGER,
+    work_schedule_id INTEGER, location VARCHAR(255), min_salary NUMERIC(10, 2),
+    max_salary NUMERIC(10, 2), currency VARCHAR(10), skill_ids JSON,
+    skills_mode VARCHAR(3) NOT NULL, webhook_url VARCHAR(500), is_active BOOLEAN NOT NULL,
+    created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (saved_search_id),
+    FOREIGN KEY(user_id) REFERENCES users (user_id) ON DELETE CASCADE
+);
+CREATE TABLE saved_search_matches (
+    saved_search_id INTEGER, vacancy_id INTEGER, change_seq BIGINT NOT NULL,
+    is_read BOOLEAN NOT NULL, matched_at DATETIME, PRIMARY KEY (saved_search_id, vacancy_id)
+);
+INSERT INTO users (user_id, email, username, hashed_password) VALUES (1, 'a@example.com', 'a', 'x');
+INSERT INTO saved_searches (saved_search_id, user_id, name, skills_mode, is_active) VALUES
+    (1, 1, 'Python', 'all', 1), (3, 1, 'Go', 'all', 1);
+INSERT INTO saved_search_matches VALUES (1, 10, 1, 0, NULL), (2, 10, 1, 0, NULL), (3, 11, 2, 0, NULL);
+"""
+
+
+async def _add_user(db, username: str) -> int:
+    user = User(email=f"{username}@example.com", username=username, hashed_password="x")
+    db.add(user)
+    await db.commit()
+    return user.user_id
+
+
+async def _count(db, model, saved_search_id: int) -> int:
+    result = await db.execute(
+        select(func.count()).select_from(model).where(model.saved_search_id == saved_search_id)
+    )
+    return result.scalar()
+
+
+def test_removed_search_id_is_not_reused_and_leaves_no_rows(run_with_db):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            first_user, second_user = await _add_user(db, "first"), await _add_user(db, "second")
+            await db.execute(insert(Vacancy), [{
+                "vacancy_id": 1, "title": "Python dev", "location": "Москва",
+                "raw_address": "Москва", "source_url": "https://hh.ru/vacancy/1",
+            }])
+            search = await saved_search_crud.create(
+                db, user_id=first_user, obj_in=SavedSearchCreate(name="Python", title="python")
+            )
+            removed_id = search.saved_search_id
+            db.add(SavedSearchMatch(saved_search_id=removed_id, vacancy_id=1, change_seq=1))
+            db.add(SavedSearchDelivery(
+                saved_search_id=removed_id, vacancy_id=1, next_attempt_at=datetime.now(timezone.utc)
+            ))
+            await db.commit()
+
+            await saved_search_crud.remove(db, search)
+            assert await _count(db, SavedSearchMatch, removed_id) == 0
+            assert await _count(db, SavedSearchDelivery, removed_id) == 0
+
+            other = await saved_search_crud.create(
+                db, user_id=second_user, obj_in=SavedSearchCreate(name="Другой поиск")
+            )
+            assert other.saved_search_id != removed_id
+            assert webhook_secret(other.saved_search_id) != webhook_secret(removed_id)
+            assert await saved_search_crud.unread_counts(db, [other.saved_search_id]) == {}
+
+    run_with_db(scenario)
+
+
+def test_migration_adds_autoincrement_and_drops_orphaned_rows(run_with_db):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            sql = (await db.execute(
+                text("SELECT sql FROM sqlite_master WHERE name = 'saved_searches'")
+            )).scalar()
+            matches = (await db.execute(
+                text("SELECT saved_search_id, vacancy_id FROM saved_search_matches ORDER BY saved_search_id")
+            )).all()
+            searches = (await db.execute(
+                text("SELECT saved_search_id, name FROM saved_searches ORDER BY saved_search_id")
+            )).all()
+            # Поиск 3 удаляется, новый получает id больше всех выданных
+            await db.execute(text("DELETE FROM saved_searches WHERE saved_search_id = 3"))
+            await db.commit()
+            user_id = (await db.execute(text("SELECT user_id FROM users"))).scalar()
+            created = await saved_search_crud.create(db, user_id=user_id, obj_in=SavedSearchCreate(name="Новый"))
+        assert "AUTOINCREMENT" in sql
+        assert matches == [(1, 10), (3, 11)]
+        assert searches == [(1, "Python"), (3, "Go")]
+        assert created.saved_search_id == 4
+
+    run_with_db(scenario, schema=LEGACY_SAVED_SEARCHES)
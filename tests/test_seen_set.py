@@ -0,0 +1,62 @@
+from sqlalchemy import insert
+
+from app.core.database import AsyncSessionLocal
+from app.models.vacancy import Vacancy
+from app.services.seen_set import BloomFilter, SeenSet
+
+
+def _url(i: int) -> str:
+    return f"https://hh.ru/vacancy/{i}"
+
+
+def test_bloom_has_no_false_negatives_and_keeps_fp_rate():
+    bloom = BloomFilter(capacity=10000, fp_rate=0.01)
+    for i in range(10000):
+        bloom.add(_url(i))
+    assert all(_url(i) in bloom for i in range(10000))
+    false_positives = sum(_url(i) in bloom for i in range(10000, 30000))
+    assert false_positives / 20000 < 0.02
+    assert 0.005 < bloom.estimated_fp_rate() < 0.02
+
+
+def test_known_only_when_confirmed_by_lru():
+    seen = SeenSet(capacity=1000, fp_rate=0.01, lru_size=3)
+    seen.add_many(_url(i) for i in range(5))
+    # В LRU остались три последних; давние есть только в фильтре
+    assert [_url(i) in seen for i in range(5)] == [False, False, True, True, True]
+    assert _url(100) not in seen
+    stats = seen.stats()
+    assert (stats["confirmed"], stats["unconfirmed"], stats["bloom_negative"]) == (3, 2, 1)
+    assert stats["entries"] == 5 and stats["lru_entries"] == 3
+
+
+def test_lookup_refreshes_lru_position():
+    seen = SeenSet(capacity=1000, fp_rate=0.01, lru_size=2)
+    seen.add(_url(1))
+    seen.add(_url(2))
+    assert _url(1) in seen
+    seen.add(_url(3))
+    # Вытеснен 2: к 1 обращались позже
+    assert _url(1) in seen
+    assert _url(2) not in seen
+
+
+def test_rebuild_streams_urls_from_db(run_with_db):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Vacancy), [
+                {"title": f"Вакансия {i}", "location": "Москва", "raw_address": "Москва", "source_url": _url(i)}
+                for i in range(1, 51)
+            ])
+            await db.commit()
+            seen = SeenSet(capacity=10, fp_rate=0.01, lru_size=100)
+            await seen.rebuild(db)
+        return seen
+
+    seen = run_with_db(scenario)
+    assert seen.loaded
+    assert len(seen) == 50
+    # Ёмкость фильтра выросла под число строк в БД
+    assert seen.bloom.capacity >= 100
+    assert all(_url(i) in seen for i in range(1, 51))
+    assert _url(51) not in seen
@@ -0,0 +1,40 @@
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.api.serializers import VacancyListSerializer
+from app.schemas.vacancy import VacancyWithCompany
+
+
+def _row(vacancy_id: int, title: str, company_name=None):
+    return SimpleNamespace(
+        vacancy_id=vacancy_id, title=title, description="", salary_from=None, salary_to=None,
+        currency=None, location="Москва", raw_address="Москва", parsed_address=None,
+        source_url=f"https://hh.ru/vacancy/{vacancy_id}", published_date=None, is_active=True,
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc), updated_at=None,
+        company_id=vacancy_id if company_name else None, experience_id=1,
+        work_format_id=1, work_schedule_id=1,
+        company_name=company_name, experience_name=None,
+    )
+
+
+def test_company_is_added_only_to_colliding_titles():
+    rows = [
+        _row(1, "Python dev", "Сбер"),
+        _row(2, "Python dev", "Яндекс"),
+        _row(3, "Python dev"),
+        _row(4, "Go dev", "Сбер"),
+    ]
+    items = json.loads(VacancyListSerializer(None).render(rows))
+    assert [item["display_title"] for item in items] == [
+        "Python dev (Сбер)", "Python dev (Яндекс)", "Python dev", "Go dev",
+    ]
+    assert [item["title"] for item in items] == ["Python dev"] * 3 + ["Go dev"]
+
+
+def test_schema_keeps_display_title_of_list_and_defaults_to_title():
+    item = json.loads(VacancyListSerializer(None).render([_row(1, "Python dev", "Сбер")] * 2))[0]
+    # Проверка response_model не должна пересчитывать название списка
+    assert VacancyWithCompany.model_validate(item).display_title == "Python dev (Сбер)"
+    del item["display_title"]
+    assert VacancyWithCompany.model_validate(item).display_title == "Python dev"
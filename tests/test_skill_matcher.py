@@ -0,0 +1,49 @@
+import pytest
+
+from app.services.skill_matcher import DEFAULT_SKILLS, SkillMatcher
+
+SKILLS = DEFAULT_SKILLS + ["R", "C", "Go", "C#", "C++", "1С", "Qt", "TypeScript", "Machine Learning"]
+
+
+@pytest.fixture
+def matcher():
+    return SkillMatcher(SKILLS)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # Границы слова: Java не находится внутри JavaScript
+        ("Опыт с JavaScript", ["JavaScript"]),
+        ("Java или JavaScript", ["Java", "JavaScript"]),
+        ("Pythonista и SQLite", []),
+        # Короткие названия - только отдельным словом и в своём написании
+        ("Опыт R&D, go to market, C-level", []),
+        ("Знание R, Go и C#; JS/TS", ["R", "Go", "C#", "JavaScript", "TypeScript"]),
+        ("Python, C, GO.", ["Python", "C", "Go"]),
+        ("Разработка на C++ и Qt", ["C++", "Qt"]),
+        # Синонимы сводятся к каноническому названию, повторы убираются
+        ("javascript и js", ["JavaScript"]),
+        ("k8s, Kubernetes, питон", ["Kubernetes", "Python"]),
+        ("1C:Предприятие", ["1С"]),
+        ("ML и машинное обучение", ["Machine Learning"]),
+    ],
+)
+def test_extract(matcher, text, expected):
+    assert matcher.extract(text) == expected
+
+
+def test_added_skill_is_found_without_rebuilding_from_scratch(matcher):
+    assert matcher.extract("FastAPI и Python") == ["Python"]
+    matcher.add("FastAPI")
+    assert "fastapi" in matcher
+    assert matcher.extract("FastAPI и Python") == ["FastAPI", "Python"]
+    # Повторное добавление ничего не меняет
+    matcher.add("fastapi")
+    assert len(matcher) == len(SKILLS) + 1
+
+
+def test_overlapping_patterns_are_all_reported():
+    # "SQL" внутри "PostgreSQL" - не отдельное слово
+    matcher = SkillMatcher(["Node.js", "Vue", "Vue.js", "SQL", "PostgreSQL"])
+    assert matcher.extract("Vue.js, nodejs и PostgreSQL") == ["Vue", "Vue.js", "Node.js", "PostgreSQL"]